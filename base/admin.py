@@ -12,6 +12,7 @@ for app in custom_apps:
     app_name = app.split('.')[-1]
     app_models = apps.all_models[app_name]
     for model_name, model_class in app_models.items():
+        pk_name = model_class._meta.pk.name
         exclude_list = ["slug", "group", "permission"]
         filter_set = ['name', "title", 'full_name']
         exclude_list.extend(field.name for field in model_class._meta.fields if isinstance(field, models.ImageField))
@@ -20,11 +21,11 @@ for app in custom_apps:
         try:
             @admin.register(model_class)
             class ModelClassAdmin(admin.ModelAdmin):
-                list_display = ['id'] + [field.name for field in model_class._meta.fields if
-                                         field.name not in exclude_list and field.name != 'id']
+                list_display = [pk_name] + [field.name for field in model_class._meta.fields if
+                                            field.name not in exclude_list and field.name != pk_name]
                 search_fields = [field.name for field in model_class._meta.fields if field.name in filter_set]
                 list_filter = [field.name for field in model_class._meta.fields if field.name in filter_set]
-                list_display_links = ['id']  # Display links will use 'id'
+                list_display_links = [pk_name]  # Display links will use the primary key
                 readonly_fields = []
                 # if model_class == User:  # Check if the model is User
                 #     readonly_fields.extend(['password'])
@@ -32,7 +33,7 @@ for app in custom_apps:
                 # Set ordering based on existence of fields
                 ordering = ['-date_joined'] if 'date_joined' in [field.name for field in
                                                                  model_class._meta.fields] else [
-                    '-created_at'] if 'created_at' in [field.name for field in model_class._meta.fields] else ['id']
+                    '-created_at'] if 'created_at' in [field.name for field in model_class._meta.fields] else [pk_name]
 
         except admin.sites.AlreadyRegistered:
             pass
\ No newline at end of file
@@ -1,87 +1,176 @@
-# from django.utils.translation import gettext_lazy as _
-# from drf_spectacular.extensions import OpenApiAuthenticationExtension
-# from rest_framework.exceptions import AuthenticationFailed
-# from rest_framework_simplejwt.authentication import JWTAuthentication
-# from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-# from rest_framework_simplejwt.tokens import AuthUser, Token
-# from rest_framework_simplejwt.utils import get_md5_hash_password
-#
-# from rest_framework_simplejwt.settings import api_settings
-#
-#
-# class CustomJWTAuthentication(JWTAuthentication):
-#     """
-#     Custom authentication that extracts account_id and organization_id from JWT.
-#     Sets request.user with these attributes dynamically.
-#     """
-#
-#     def get_validated_token(self, raw_token: bytes) -> Token:
-#         """
-#         Validates an encoded JSON web token and returns a validated token
-#         wrapper object.
-#         """
-#         last_exception = None
-#         for AuthToken in api_settings.AUTH_TOKEN_CLASSES:
-#             try:
-#                 return AuthToken(raw_token)
-#             except TokenError as e:
-#                 last_exception = e  # Save the last error to raise later
-#
-#         # If no token class matched, raise the final error
-#         raise AuthenticationFailed(
-#             detail="Given token is invalid or expired.",
-#             code="token_not_valid",
-#         )
-#
-#     def get_user(self, validated_token: Token) -> AuthUser:
-#         """
-#         Attempts to find and return a user using the given validated token.
-#         """
-#         try:
-#             user_id = validated_token[api_settings.USER_ID_CLAIM]
-#         except KeyError:
-#             raise InvalidToken(_("Token contained no recognizable user identification"))
-#
-#         try:
-#             user = self.user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
-#         except self.user_model.DoesNotExist:
-#             raise AuthenticationFailed(_("User not found"), code="user_not_found")
-#
-#         if not user.is_active:
-#             raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
-#
-#         if api_settings.CHECK_REVOKE_TOKEN:
-#             if validated_token.get(
-#                     api_settings.REVOKE_TOKEN_CLAIM
-#             ) != get_md5_hash_password(user.password):
-#                 raise AuthenticationFailed(
-#                     _("The user's password has been changed."), code="password_changed"
-#                 )
-#         org_id = validated_token.get("org_id")
-#         user = self.set_organization(user, org_id)
-#
-#         return user
-#
-#     def set_organization(self, user, org_id):
-#         # Attach account_id & organization_id to user dynamically
-#         user.org_id = org_id
-#         if org_id:
-#             org_user = OrganizationUser.objects.filter(user=user, organization_id=org_id).first()
-#             user.org = org_user.organization or None
-#             user.org_user = org_user
-#         else:
-#             user.org = None
-#             user.org_user = None
-#         return user
-#
-#
-# class CustomJWTAuthenticationScheme(OpenApiAuthenticationExtension):
-#     target_class = "base.authentication.CustomJWTAuthentication"
-#     name = "CustomJWTAuth"
-#
-#     def get_security_definition(self, auto_schema):
-#         return {
-#             "type": "http",
-#             "scheme": "bearer",
-#             "bearerFormat": "JWT",
-#         }
\ No newline at end of file
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt import serializers
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from base.blacklist import blacklist_filter
+
+VERSION_CLAIM = "ver"
+
+
+class UserCache:
+    """
+    Bounded, per process LRU of `user_id -> (user, token version)` whose entries
+    expire after a TTL. A version bumped by another worker is seen here once the
+    entry expires; the worker that bumps it evicts its own entry at once.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[0], entry[1]
+
+    def set(self, user_id, user, version: int):
+        with self._lock:
+            self._entries[user_id] = (user, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(settings.JWT_USER_CACHE_SIZE, settings.JWT_USER_CACHE_TTL_SECONDS)
+
+
+def load_user(user_id):
+    """
+    `(user, token version)` from the database in a single query, cached. The user
+    is None when it does not exist.
+    """
+    user = (
+        get_user_model().objects.select_related("token_version")
+        .filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+    )
+    version = getattr(getattr(user, "token_version", None), "version", 0) if user is not None else 0
+    if user is not None:
+        user_cache.set(user_id, user, version)
+    return user, version
+
+
+def resolve_user(user_id, token_version: int):
+    """
+    The cached user a token of `token_version` stands for. Raises
+    AuthenticationFailed when the user is gone or inactive, or the token was
+    revoked by a version bump.
+    """
+    cached = user_cache.get(user_id)
+    # A newer version than cached means it was bumped since, by another worker.
+    if cached is None or token_version > cached[1]:
+        cached = load_user(user_id)
+    user, version = cached
+
+    if user is None:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    if not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if token_version != version:
+        raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+    return user
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's token version, which its access tokens copy.
+    Issue tokens through `VersionedRefreshToken.for_user(user)`.
+
+    The blacklist is only queried for JTIs that `blacklist_filter` may hold, and
+    blacklisting a token twice fails, so a rotated token replayed before this
+    worker's filter has caught up is still refused.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[VERSION_CLAIM] = load_user(user.pk)[1]
+        return token
+
+    def check_blacklist(self):
+        if self.payload[api_settings.JTI_CLAIM] in blacklist_filter:
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted, created = super().blacklist()
+        if not created:
+            raise TokenError(_("Token is blacklisted"))
+        blacklist_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted, created
+
+
+class TokenObtainPairSerializer(serializers.TokenObtainPairSerializer):
+    token_class = VersionedRefreshToken
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    """
+    Refuses refresh tokens revoked by a token version bump, which would otherwise
+    keep minting access tokens, if only ones that are refused in turn.
+    """
+    token_class = VersionedRefreshToken
+
+    def validate(self, attrs):
+        token = self.token_class(attrs["refresh"])
+        resolve_user(token.get(api_settings.USER_ID_CLAIM), token.get(VERSION_CLAIM, 0))
+        return super().validate(attrs)
+
+
+class TokenBlacklistSerializer(serializers.TokenBlacklistSerializer):
+    token_class = VersionedRefreshToken
+
+
+class CustomJWTAuthentication(JWTAuthentication):
+    """
+    Bearer JWT authentication that verifies the signature and expiry without the
+    database and resolves the user through `user_cache`, so a warm request makes
+    no queries. Tokens whose `ver` claim is older than the user's token version
+    are rejected.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        # Views may modify request.user; keep the cached instance pristine.
+        return copy.copy(resolve_user(user_id, validated_token.get(VERSION_CLAIM, 0)))
+
+
+class CustomJWTAuthenticationScheme(OpenApiAuthenticationExtension):
+    target_class = "base.authentication.CustomJWTAuthentication"
+    name = "BearerAuth"
+
+    def get_security_definition(self, auto_schema):
+        return {
+            "type": "http",
+            "scheme": "bearer",
+            "bearerFormat": "JWT",
+        }
@@ -0,0 +1,133 @@
+"""
+Keeps simplejwt's token blacklist cheap. `blacklist_filter` is a per-worker bloom
+filter of the blacklisted JTIs, so a token that is not blacklisted, the common
+case, is checked without a query. `prune_batch` deletes expired outstanding and
+blacklisted tokens, which expiry already rejects, so neither table grows forever.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from base.bloom import BloomFilter
+from base.middleware.query_budget import UNCOUNTED
+
+# A blacklist row younger than this may still have lower ids pending in other
+# transactions, so the filter reads from the first such row again on each refresh.
+SETTLE_SECONDS = 30
+
+NEW_ENTRIES_SQL = UNCOUNTED + """
+SELECT blacklisted.id, outstanding.jti,
+       blacklisted.blacklisted_at < clock_timestamp() - make_interval(secs => %(settle)s)
+FROM token_blacklist_blacklistedtoken blacklisted
+JOIN token_blacklist_outstandingtoken outstanding ON outstanding.id = blacklisted.token_id
+WHERE blacklisted.id > %(after)s
+ORDER BY blacklisted.id
+"""
+
+COUNT_SQL = UNCOUNTED + "SELECT count(*) FROM token_blacklist_blacklistedtoken"
+
+# Both deletes see the same `expired` rows; the foreign key is deferred to commit.
+PRUNE_SQL = """
+WITH expired AS (
+    SELECT id FROM token_blacklist_outstandingtoken
+    WHERE expires_at <= clock_timestamp()
+    ORDER BY expires_at
+    LIMIT %(limit)s
+), blacklisted AS (
+    DELETE FROM token_blacklist_blacklistedtoken WHERE token_id IN (SELECT id FROM expired)
+)
+DELETE FROM token_blacklist_outstandingtoken WHERE id IN (SELECT id FROM expired)
+"""
+
+EXPIRED_COUNT_SQL = "SELECT count(*) FROM token_blacklist_outstandingtoken WHERE expires_at <= clock_timestamp()"
+
+
+class BlacklistFilter:
+    """
+    Bloom filter of blacklisted JTIs. At most every BLACKLIST_FILTER_REFRESH_SECONDS
+    it reads the rows added since its last read, and every
+    BLACKLIST_FILTER_REBUILD_SECONDS (or once over capacity) it is rebuilt from
+    scratch, dropping the pruned JTIs.
+
+    A token blacklisted by another worker since the last refresh is missed here.
+    That only matters for reuse of a rotated refresh token, which
+    VersionedRefreshToken.blacklist() rejects on its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._after = 0
+        self._refreshed_at = self._built_at = 0.0
+
+    def __contains__(self, jti) -> bool:
+        self.refresh()
+        return jti in self._filter
+
+    def add(self, jti):
+        self.refresh()
+        self._filter.add(jti)
+
+    def clear(self):
+        with self._lock:
+            self._filter = None
+
+    def refresh(self):
+        if self._filter is not None and time.monotonic() - self._refreshed_at < settings.BLACKLIST_FILTER_REFRESH_SECONDS:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._filter is not None and now - self._refreshed_at < settings.BLACKLIST_FILTER_REFRESH_SECONDS:
+                return
+            if (
+                self._filter is None
+                or now - self._built_at >= settings.BLACKLIST_FILTER_REBUILD_SECONDS
+                or len(self._filter) > self._filter.capacity
+            ):
+                with connection.cursor() as cursor:
+                    cursor.execute(COUNT_SQL)
+                    count = cursor.fetchone()[0]
+                bloom = BloomFilter(max(settings.BLACKLIST_FILTER_CAPACITY, 2 * count), settings.BLACKLIST_FILTER_ERROR_RATE)
+                self._after = self.read(bloom, 0)
+                self._filter, self._built_at = bloom, now
+            else:
+                self._after = self.read(self._filter, self._after)
+            self._refreshed_at = now
+
+    @staticmethod
+    def read(bloom: BloomFilter, after: int) -> int:
+        """
+        Add the JTIs blacklisted after row `after` to `bloom`. Returns the id up to
+        which every row has settled, where the next read starts.
+        """
+        settled = True
+        with connection.cursor() as cursor:
+            cursor.execute(NEW_ENTRIES_SQL, {"after": after, "settle": SETTLE_SECONDS})
+            while rows := cursor.fetchmany(2000):
+                for row_id, jti, old in rows:
+                    bloom.add(jti)
+                    settled = settled and old
+                    if settled:
+                        after = row_id
+        return after
+
+
+blacklist_filter = BlacklistFilter()
+
+
+def prune_batch(batch_size: int) -> int:
+    """
+    Delete up to `batch_size` expired outstanding tokens with their blacklist
+    entries in one transaction. Returns how many were deleted.
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(PRUNE_SQL, {"limit": batch_size})
+        return cursor.rowcount
+
+
+def expired_count() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(EXPIRED_COUNT_SQL)
+        return cursor.fetchone()[0]
@@ -0,0 +1,40 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed size probabilistic set answering "definitely absent" or "maybe present".
+
+    A filter sized for `capacity` values at `error_rate` keeps about
+    -capacity * ln(error_rate) / ln(2)**2 bits (1.2 MB for a million values at 1%).
+    Adding more values than the capacity still works, the false positive rate just
+    climbs past `error_rate`. Values cannot be removed; rebuild the filter instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("A BloomFilter needs a positive capacity and an error rate between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, value):
+        # Double hashing: k indexes from the two halves of one digest.
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+    def __len__(self) -> int:
+        return self.count
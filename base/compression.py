@@ -0,0 +1,132 @@
+"""
+Content codings for responses: which one a client accepts, and compressing whole
+bodies or streams into it. Brotli is used when the `brotli` package is installed,
+otherwise gzip only.
+
+Against BREACH, gzip output can carry up to `max_random_bytes` of random padding
+in its header, as Django's GZipMiddleware does, so the compressed length no longer
+tells an attacker how well a guess matched a secret. Brotli has no such field.
+"""
+import gzip
+import secrets
+import struct
+import zlib
+from typing import Optional
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are gzipped only
+    brotli = None
+
+# In order of preference when a client accepts several equally.
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+FILE_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Quality of bodies compressed once and served many times (`payload()`).
+BEST_LEVELS = {"br": 11, "gzip": 9}
+
+
+def negotiate(accept_encoding: str, available=ENCODINGS) -> Optional[str]:
+    """
+    The coding of `available` the Accept-Encoding header prefers, honouring
+    q-values and "*". None when it accepts none of them.
+    """
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+    best, best_weight = None, 0.0
+    for coding in available:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def level(encoding: str) -> int:
+    return settings.COMPRESSION_BROTLI_QUALITY if encoding == "br" else settings.COMPRESSION_GZIP_LEVEL
+
+
+def gzip_header(max_random_bytes: int = 0) -> bytes:
+    """
+    Gzip member header with mtime=0 and, when `max_random_bytes` is set, a file
+    name of a random length below it.
+    """
+    padding = b"a" * secrets.randbelow(max_random_bytes) if max_random_bytes else b""
+    flags = gzip.FNAME if padding else 0
+    header = b"\x1f\x8b\x08" + bytes([flags]) + b"\x00\x00\x00\x00\x00\xff"
+    return header + padding + b"\x00" if padding else header
+
+
+def compress(content: bytes, encoding: str, best: bool = False, max_random_bytes: int = 0) -> bytes:
+    """
+    `content` in `encoding`, at the best quality when it is compressed once and
+    served many times, otherwise at the faster COMPRESSION_* levels. mtime=0 keeps
+    the gzipped bytes identical for identical content unless they are padded.
+    """
+    quality = BEST_LEVELS[encoding] if best else level(encoding)
+    if encoding == "br":
+        return brotli.compress(content, quality=quality)
+    compressed = gzip.compress(content, compresslevel=quality, mtime=0)
+    if not max_random_bytes:
+        return compressed
+    return gzip_header(max_random_bytes) + compressed[10:]
+
+
+class StreamCompressor:
+    """
+    Incremental compressor for streaming bodies. Every chunk is flushed, so
+    clients receive each one as soon as it is produced. Gzip streams are raw
+    deflate framed by our own header and trailer, so the header can be padded.
+    """
+
+    def __init__(self, encoding: str, max_random_bytes: int = 0):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=level(encoding))
+        else:
+            self._compressor = zlib.compressobj(level(encoding), zlib.DEFLATED, -zlib.MAX_WBITS)
+            self._header = gzip_header(max_random_bytes)
+            self._crc = self._size = 0
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        self._crc = zlib.crc32(data, self._crc)
+        self._size += len(data)
+        header, self._header = self._header, b""
+        return header + self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        trailer = struct.pack("<II", self._crc, self._size & 0xFFFFFFFF)
+        return self._header + self._compressor.flush() + trailer
+
+
+def compress_sequence(chunks, encoding: str, max_random_bytes: int = 0):
+    compressor = StreamCompressor(encoding, max_random_bytes)
+    for chunk in chunks:
+        if data := compressor.chunk(chunk):
+            yield data
+    yield compressor.finish()
+
+
+async def acompress_sequence(chunks, encoding: str, max_random_bytes: int = 0):
+    compressor = StreamCompressor(encoding, max_random_bytes)
+    async for chunk in chunks:
+        if data := compressor.chunk(chunk):
+            yield data
+    yield compressor.finish()
@@ -0,0 +1,96 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+
+# Seconds the replica is behind the primary; 0 once it has replayed everything it
+# received, so an idle primary does not look like lag.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+@contextmanager
+def pin_to_primary(pinned: bool = True):
+    """
+    Send every read in the block to the primary, e.g. right after a write.
+    """
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+class ReplicaLagGuard:
+    """
+    Per process cache of each replica's lag, refreshed at most every
+    DB_REPLICA_LAG_CHECK_SECONDS. Unreachable replicas count as lagging.
+    """
+    _checked = {}
+
+    @classmethod
+    def lag(cls, alias: str) -> float:
+        now = time.monotonic()
+        checked_at, lag = cls._checked.get(alias, (None, None))
+        if checked_at is not None and now - checked_at < settings.DB_REPLICA_LAG_CHECK_SECONDS:
+            return lag
+        connection = connections[alias]
+        try:
+            # The raw cursor skips execute wrappers, so the check is not billed to
+            # whichever request happened to trigger it.
+            connection.ensure_connection()
+            with connection.connection.cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except (DatabaseError, connection.Database.Error) as e:
+            logger.warning("Replica '%s' is unavailable: %s", alias, e)
+            lag = float("inf")
+        cls._checked[alias] = (now, lag)
+        return lag
+
+    @classmethod
+    def healthy(cls, alias: str) -> bool:
+        return cls.lag(alias) <= settings.DB_REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """
+    Sends reads to a random healthy replica and everything else to the primary.
+    Reads stay on the primary while the request is pinned to it, or inside a
+    transaction on the primary, so they see the transaction's own writes.
+    """
+
+    def __init__(self):
+        self.replicas = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or is_pinned_to_primary() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        healthy = [alias for alias in self.replicas if ReplicaLagGuard.healthy(alias)]
+        return random.choice(healthy) if healthy else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -1,6 +1,28 @@
 from enum import Enum
+from types import MappingProxyType
+from typing import Dict, NamedTuple
 
 
+class EnumEntry(NamedTuple):
+    """
+    Everything the helpers of one enum need, computed once per enum: choices, values
+    and names in definition order, the set of values, and value → member and
+    value → label maps. All of it is immutable; the helpers still return lists.
+    """
+    choices: tuple
+    values: tuple
+    keys: tuple
+    value_set: frozenset
+    members: MappingProxyType
+    labels: MappingProxyType
+
+
+def member_label(name: str) -> str:
+    return " ".join(portion.capitalize() for portion in name.split("_"))
+
+
+_entries: Dict[type, EnumEntry] = {}
+
 
 class BaseEnum(Enum):
     """
@@ -10,29 +32,42 @@ class BaseEnum(Enum):
     """
 
     def __init__(self, *args):
-        cls = self.__class__
-        if any(self.value == e.value for e in cls):
-            a = self.name
-            e = cls(self.value).name
+        # Earlier members are already in the value map, so duplicates are found in
+        # O(1) instead of scanning every member.
+        existing = self.__class__._value2member_map_.get(self.value)
+        if existing is not None:
+            raise ValueError("aliases not allowed in DuplicateFreeEnum:  %r --> %r" % (self.name, existing.name))
 
-            raise ValueError("aliases not allowed in DuplicateFreeEnum:  %r --> %r" % (a, e))
+    @classmethod
+    def entry(cls) -> EnumEntry:
+        entry = _entries.get(cls)
+        if entry is None:
+            entry = _entries[cls] = EnumEntry(
+                choices=tuple((key.value, key.name) for key in cls),
+                values=tuple(key.value for key in cls),
+                keys=tuple(key.name for key in cls),
+                value_set=frozenset(key.value for key in cls),
+                members=MappingProxyType({key.value: key for key in cls}),
+                labels=MappingProxyType({key.value: member_label(key.name) for key in cls}),
+            )
+        return entry
 
     @classmethod
     def choices(cls):
-        return [(key.value, key.name) for key in cls]
+        return list(cls.entry().choices)
 
     @classmethod
     def exclude(cls, values: list = None):
-        values = values or []
-        return [(key.value, key.name) for key in cls if key.value not in values]
+        values = frozenset(values or [])
+        return [choice for choice in cls.entry().choices if choice[0] not in values]
 
     @classmethod
     def values(cls):
-        return [key.value for key in cls]
+        return list(cls.entry().values)
 
     @classmethod
     def keys(cls):
-        return [key.name for key in cls]
+        return list(cls.entry().keys)
 
     @classmethod
     def has_value(cls, value):
@@ -40,22 +75,22 @@ class BaseEnum(Enum):
 
     @classmethod
     def get_key(cls, value):
-        return [key.name for key in cls if key.value == value]
+        key = cls.get_key_name(value)
+        return [key] if key is not None else []
 
     @classmethod
     def validate(cls, items):
+        value_set = cls.entry().value_set
         available_item = []
-        current_item = ''
-        try:
-            for item in items:
-                current_item = item
-                if cls.has_value(item):
-                    available_item.append(item)
-                else:
-                    raise Exception
-            return available_item
-        except Exception as e:
-            raise ValueError("Invalid choice:  %r for  %r" % (current_item, cls))
+        for item in items:
+            try:
+                valid = item in value_set
+            except TypeError:
+                valid = False
+            if not valid:
+                raise ValueError("Invalid choice:  %r for  %r" % (item, cls))
+            available_item.append(item)
+        return available_item
 
     @classmethod
     def make_json_compatible(cls):
@@ -63,29 +98,20 @@ class BaseEnum(Enum):
 
     @classmethod
     def exclude_values(cls, items):
-        return [key.value for key in cls if key.value not in items]
+        items = frozenset(items)
+        return [value for value in cls.entry().values if value not in items]
 
     @classmethod
     def get_key_name(cls, value):
-        for key in cls:
-            if key.value == value:
-                return key.name
+        try:
+            key = cls.entry().members.get(value)
+        except TypeError:
+            return None
+        return key.name if key is not None else None
 
     @classmethod
     def jsonify(cls):
-        enum_dict = dict()
-        for key in cls:
-            source_name = key.name.split('_')
-            full_source_name = ''
-            if len(source_name) < 2:
-                full_source_name = source_name[0].capitalize()
-            elif len(source_name) > 1:
-                for portion in source_name:
-                    if full_source_name != '':
-                        full_source_name += " "
-                    full_source_name += portion.capitalize()
-            enum_dict[key.value] = full_source_name
-        return enum_dict
+        return dict(cls.entry().labels)
 
 
 class UserStatus(BaseEnum):
@@ -114,6 +140,12 @@ class CompanySizeEnum(BaseEnum):
     ENTERPRISE ="201+"
 
 
+class ActiveUserPeriod(BaseEnum):
+    HOUR = "hour"
+    DAY = "day"
+    MONTH = "month"
+
+
 class UserRoleEnum(BaseEnum):
     INDIVIDUAL_OWNER = "individual_owner"
     REAL_ESTATE_BROKER = "real_estate_broker"
@@ -310,6 +342,11 @@ class EventType(BaseEnum):
     ONLINE = "online"
     OFFLINE = "offline"
 
+class RecurrenceFrequency(BaseEnum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+
 class EventStatus(BaseEnum):
     APPROVED = 'approved'
     REJECTED = 'rejected'
@@ -368,7 +405,7 @@ class EventSubCategoryEnum(BaseEnum):
         valid_sub_categories = set()  # Collect all valid sub-categories for given categories
 
         for category in categories:
-            valid_sub_categories.update(EVENT_CATEGORY_MAPPING.get(category, []))
+            valid_sub_categories.update(EVENT_SUB_CATEGORY_SETS.get(category, ()))
 
         # Find invalid sub-categories
         invalid_sub_categories = [sub for sub in sub_categories if sub not in valid_sub_categories]
@@ -414,6 +451,7 @@ EVENT_CATEGORY_MAPPING = {
         EventSubCategoryEnum.PROPADYA_COMMUNITY_MEETUP.value,
     ],
 }
+EVENT_SUB_CATEGORY_SETS = {category: frozenset(subs) for category, subs in EVENT_CATEGORY_MAPPING.items()}
 
 
 class UserAssignedRoleEnum(BaseEnum):
@@ -461,4 +499,45 @@ DURATION_DAYS_MAPPING = {
     SubscriptionDuration.THREE_MONTHS.value: 90,
     SubscriptionDuration.SIX_MONTHS.value: 180,
     SubscriptionDuration.TWELVE_MONTHS.value: 365
-}
\ No newline at end of file
+}
+
+# Value mappings published next to the enums by the /enums endpoint.
+MAPPINGS = {
+    "event_sub_categories": EVENT_CATEGORY_MAPPING,
+    "user_role_positions": USER_ROLE_POSITION_MAPPER,
+    "subscription_duration_days": DURATION_DAYS_MAPPING,
+}
+
+
+def registry() -> Dict[str, type]:
+    """
+    Every BaseEnum subclass imported so far, by class name.
+    """
+    enums, pending = {}, list(BaseEnum.__subclasses__())
+    while pending:
+        enum_class = pending.pop()
+        enums[enum_class.__name__] = enum_class
+        pending.extend(enum_class.__subclasses__())
+    return dict(sorted(enums.items()))
+
+
+def taxonomy() -> dict:
+    """
+    All enums as `[{"value", "name", "label"}]` lists plus MAPPINGS, for clients
+    that would otherwise hardcode them.
+    """
+    return {
+        "enums": {
+            name: [
+                {"value": value, "name": key, "label": enum_class.entry().labels[value]}
+                for value, key in enum_class.entry().choices
+            ]
+            for name, enum_class in registry().items()
+        },
+        "mappings": MAPPINGS,
+    }
+
+
+# Computed at import, so no request pays for building them.
+for _enum_class in registry().values():
+    _enum_class.entry()
@@ -0,0 +1,85 @@
+import math
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude: float, longitude: float, precision: int = MAX_PRECISION) -> str:
+    """
+    Geohash of a point. Points sharing a prefix lie in the same cell, so a b-tree
+    index on the hash answers "which points are in this cell" with a prefix scan.
+    """
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def cell_size(precision: int) -> tuple:
+    """
+    Height and width in degrees of a cell at `precision`.
+    """
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision - lng_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def wrap_longitude(longitude: float) -> float:
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """
+    `(min_lat, max_lat, min_lng, max_lng)` around a circle. Longitudes may fall
+    outside [-180, 180] when the box crosses the antimeridian; the box spans every
+    longitude when it reaches a pole.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(latitude - delta_lat, -90.0), min(latitude + delta_lat, 90.0)
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if cos_lat <= 0 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180:
+        return min_lat, max_lat, -180.0, 180.0
+    delta_lng = radius_km / (KM_PER_DEGREE * cos_lat)
+    return min_lat, max_lat, longitude - delta_lng, longitude + delta_lng
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> list:
+    """
+    Geohash prefixes whose cells cover the circle: the finest precision whose cells
+    are at least as large as the bounding box's half sides, so the box spans at most
+    3 x 3 cells. An empty list means the circle is too large to prune by prefix.
+    """
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    half_height, half_width = (max_lat - min_lat) / 2, (max_lng - min_lng) / 2
+    precision = 0
+    for candidate in range(1, MAX_PRECISION + 1):
+        height, width = cell_size(candidate)
+        if height < half_height or width < half_width:
+            break
+        precision = candidate
+    if precision == 0:
+        return []
+
+    # With cells no smaller than half the box, its edges and middle hit every cell.
+    latitudes = (min_lat, (min_lat + max_lat) / 2, max_lat)
+    longitudes = (min_lng, (min_lng + max_lng) / 2, max_lng)
+    return sorted({
+        encode(min(lat, 90.0 - 1e-9), wrap_longitude(lng), precision) for lat in latitudes for lng in longitudes
+    })
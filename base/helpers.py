@@ -1,10 +1,16 @@
+import hashlib
 import importlib
 import inspect
+from typing import Dict, NamedTuple
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from datetime import datetime, time
 from django.utils import timezone
 
+from base.compression import ENCODINGS, compress, negotiate
+
 # from properties.models.property import Property
 import random
 #
@@ -66,3 +72,67 @@ def convert_to_bool(value):
             return False
     return False
 
+
+def get_view_action(request):
+    """
+    Resolve the view class and action that handled a request, e.g.
+    `(EventViewSet, "calender_view")` or `(EventRegionalDataApiView, "get")`.
+    Function based views resolve to `(None, function name)`.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return None, None
+    view_class = getattr(match.func, "cls", None) or getattr(match.func, "view_class", None)
+    if view_class is None:
+        return None, getattr(match.func, "__name__", match.view_name or "unknown")
+    method = request.method.lower()
+    actions = getattr(match.func, "actions", None) or {}
+    return view_class, actions.get(method, method)
+
+
+def get_view_name(request):
+    """
+    Name of the view that handled a request as `ViewClass.action`, e.g.
+    `EventViewSet.calender_view` or `EventRegionalDataApiView.get`.
+    """
+    view_class, action = get_view_action(request)
+    if view_class is None:
+        return action or "unresolved"
+    return f"{view_class.__name__}.{action}"
+
+
+class Payload(NamedTuple):
+    content: bytes
+    etag: str
+    encoded: Dict[str, bytes]  # content coding -> compressed content
+
+
+def payload(content: bytes) -> Payload:
+    """
+    Response body computed once and served many times, with its ETag and a copy
+    compressed at the best quality in every coding we serve.
+    """
+    encoded = {encoding: compress(content, encoding, best=True) for encoding in ENCODINGS}
+    return Payload(content, hashlib.sha256(content).hexdigest()[:32], encoded)
+
+
+def prebuilt_response(request, built: Payload, content_type: str, headers: Dict[str, str] = None,
+                      cache_control: Dict[str, object] = None) -> HttpResponse:
+    """
+    Respond with a `Payload`, in its precompressed copy for the coding the client
+    prefers, or with a 304 when the client's If-None-Match already matches.
+    Clients revalidate on every use unless `cache_control` says otherwise.
+    """
+    encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), available=tuple(built.encoded))
+    etag = f'"{built.etag}-{encoding}"' if encoding else f'"{built.etag}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(built.encoded[encoding] if encoding else built.content, content_type=content_type)
+        if encoding:
+            response["Content-Encoding"] = encoding
+        for header, value in (headers or {}).items():
+            response[header] = value
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+    patch_cache_control(response, **(cache_control or {"no_cache": True}))
+    return response
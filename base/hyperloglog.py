@@ -0,0 +1,70 @@
+import hashlib
+import math
+
+DEFAULT_PRECISION = 14
+
+# 2 ** -rank for every possible register value, so estimates avoid float pow calls.
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+
+class HyperLogLog:
+    """
+    Fixed size probabilistic counter of distinct values.
+
+    A sketch with precision `p` keeps 2**p one byte registers (16 KiB for the default
+    p=14, ~0.8% standard error) no matter how many values are added. Sketches over the
+    same precision merge losslessly by taking the register wise maximum, which is how
+    hourly sketches roll up into days and months.
+    """
+
+    def __init__(self, registers: bytes = None, precision: int = DEFAULT_PRECISION):
+        if registers:
+            precision = int(math.log2(len(registers)))
+            if 2 ** precision != len(registers):
+                raise ValueError("Invalid HyperLogLog registers of length %r" % len(registers))
+        self.precision = precision
+        self.size = 2 ** precision
+        self.registers = bytearray(registers) if registers else bytearray(self.size)
+
+    @staticmethod
+    def hash(value) -> int:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def add(self, value):
+        hashed = self.hash(value)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, other: "HyperLogLog"):
+        if other.size != self.size:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(_INVERSE_POWERS[rank] for rank in self.registers)
+        if estimate <= 2.5 * size:
+            zeros = self.registers.count(0)
+            if zeros:
+                # Linear counting is far more accurate for small cardinalities.
+                estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def merge(cls, sketches) -> "HyperLogLog":
+        merged = None
+        for sketch in sketches:
+            if merged is None:
+                merged = cls(sketch.to_bytes())
+            else:
+                merged.update(sketch)
+        return merged if merged is not None else cls()
@@ -0,0 +1,43 @@
+import shutil
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.schema import build, build_dir, code_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the OpenAPI schema of the current code as JSON and YAML (plus compressed copies) "
+        "into SCHEMA_BUILD_DIR/<code version>/, where the docs views serve it from. Run on deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--code-version", help="Build for this code version instead of the current one.")
+        parser.add_argument(
+            "--lang", action="append", dest="languages",
+            help="Language to build; repeatable. Defaults to SCHEMA_LANGUAGES.",
+        )
+        parser.add_argument("--prune", action="store_true", help="Remove the builds of other code versions.")
+
+    def handle(self, *args, **options):
+        version = options["code_version"] or code_version()
+        started = time.perf_counter()
+        written = build(version, options["languages"])
+        for path in written:
+            self.stdout.write(f"  {path.stat().st_size:>9} B  {path}")
+
+        pruned = 0
+        if options["prune"]:
+            current = build_dir(version)
+            for directory in current.parent.iterdir():
+                if directory.is_dir() and directory != current:
+                    shutil.rmtree(directory)
+                    pruned += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Built schema {version} in {time.perf_counter() - started:.1f}s"
+            + (f", removed {pruned} older builds" if pruned else "")
+            + f" ({settings.SCHEMA_BUILD_DIR})"
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.blacklist import expired_count, prune_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired JWTs from the outstanding and blacklisted token tables in small "
+        "transactions. Expiry already rejects them, so this only bounds the tables. Run it "
+        "periodically, e.g. hourly; it is safe while serving traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to TOKEN_PRUNE_BATCH_SIZE.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the expired tokens.")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            self.stdout.write(f"{expired_count()} tokens have expired")
+            return
+
+        batch_size = options["batch_size"] or settings.TOKEN_PRUNE_BATCH_SIZE
+        started = time.perf_counter()
+        pruned = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            count = prune_batch(batch_size)
+            if not count:
+                break
+            pruned += count
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {pruned} tokens pruned")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {pruned} expired tokens in {batches} batches in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,90 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: what a gunicorn worker does before its first request.
+BOOT_SCRIPT = """
+import json, os, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+from config.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+if {warm}:
+    from base.warmup import warm_up_django
+    warm_up_django()
+print(json.dumps({{"ms": (time.perf_counter() - started) * 1000}}))
+"""
+
+
+def parse_importtime(output: str) -> list:
+    """
+    `(self_us, cumulative_us, module)` for each line of `python -X importtime`.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure how long a fresh worker takes to load Django and the URLconf, and which "
+        "imports that time goes to (from `python -X importtime`). Fails when the median "
+        "startup exceeds the budget, so it can gate CI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Timed startups; the median is reported.")
+        parser.add_argument("--top", type=int, default=20, help="Number of modules and packages to list.")
+        parser.add_argument("--warm", action="store_true", help="Include warm_up_django, as in preloaded masters.")
+        parser.add_argument(
+            "--budget-ms", type=float, default=settings.STARTUP_BUDGET_MS,
+            help="Fail when the median startup is slower. Defaults to STARTUP_BUDGET_MS; 0 disables it.",
+        )
+
+    def boot(self, *flags, warm=False):
+        result = subprocess.run(
+            [sys.executable, *flags, "-c", BOOT_SCRIPT.format(warm=warm)],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, "PYTHONDONTWRITEBYTECODE": "", "DJANGO_SETTINGS_MODULE": "config.settings"},
+        )
+        if result.returncode:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1])["ms"], result.stderr
+
+    def handle(self, *args, **options):
+        timings = [self.boot(warm=options["warm"])[0] for _ in range(max(1, options["runs"]))]
+        median = statistics.median(timings)
+        _, importtime = self.boot("-X", "importtime", warm=options["warm"])
+        rows = parse_importtime(importtime)
+
+        top = options["top"]
+        self.stdout.write(f"Slowest imports, cumulative ({len(rows)} modules):")
+        for self_us, cumulative_us, module in sorted(rows, key=lambda row: -row[1])[:top]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {self_us / 1000:6.1f} ms self  {module}")
+
+        packages = Counter()
+        for self_us, _, module in rows:
+            packages[module.split(".")[0]] += self_us
+        self.stdout.write("Import time by top level package:")
+        for package, self_us in packages.most_common(top):
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}")
+
+        summary = (
+            f"Startup median {median:.0f} ms over {len(timings)} runs "
+            f"(min {min(timings):.0f} ms, max {max(timings):.0f} ms)"
+        )
+        budget = options["budget_ms"]
+        if budget and median > budget:
+            raise CommandError(f"{summary}, over the {budget:.0f} ms budget")
+        self.stdout.write(self.style.SUCCESS(summary + (f", budget {budget:.0f} ms" if budget else "")))
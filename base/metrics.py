@@ -0,0 +1,77 @@
+import os
+
+from django.db import connections
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time spent handling a request", ["view"], buckets=LATENCY_BUCKETS
+)
+REQUESTS = Counter(
+    "http_requests", "Handled requests by view and response status", ["view", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Size of non streaming response bodies", ["view"], buckets=SIZE_BUCKETS
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request", "Number of SQL queries run by a request", ["view"], buckets=QUERY_COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    "db_query_duration_seconds", "Total SQL time spent by a request", ["view"], buckets=LATENCY_BUCKETS
+)
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_connections", "Connections held by the pool", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_AVAILABLE = Gauge(
+    "db_pool_available_connections", "Idle connections in the pool", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_requests_waiting", "Requests currently waiting for a connection", ["alias"], multiprocess_mode="livesum"
+)
+DB_POOL_QUEUED = Counter(
+    "db_pool_requests_queued", "Connection requests that had to wait for the pool", ["alias"]
+)
+DB_POOL_WAIT = Counter(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["alias"]
+)
+DB_POOL_ERRORS = Counter(
+    "db_pool_request_errors", "Connection requests that timed out or failed", ["alias"]
+)
+
+
+def record_pool_stats():
+    """
+    Move the counters accumulated by each connection pool of this process into the
+    pool metrics. Does nothing unless DB_POOL is enabled.
+    """
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        stats = pool.pop_stats()
+        alias = connection.alias
+        DB_POOL_SIZE.labels(alias).set(stats.get("pool_size", 0))
+        DB_POOL_AVAILABLE.labels(alias).set(stats.get("pool_available", 0))
+        DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+        DB_POOL_QUEUED.labels(alias).inc(stats.get("requests_queued", 0))
+        DB_POOL_WAIT.labels(alias).inc(stats.get("requests_wait_ms", 0) / 1000)
+        DB_POOL_ERRORS.labels(alias).inc(stats.get("requests_errors", 0))
+
+
+def render_metrics():
+    """
+    Serialize all metrics in the Prometheus text format. Under gunicorn every worker
+    writes its samples to PROMETHEUS_MULTIPROC_DIR, and they are aggregated here.
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
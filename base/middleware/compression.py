@@ -0,0 +1,94 @@
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from base.compression import ENCODINGS, acompress_sequence, compress, compress_sequence, negotiate
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/yaml",
+    "application/vnd.oai.openapi",
+    "application/vnd.oai.openapi+json",
+    "image/svg+xml",
+)
+
+re_strong_etag = re.compile(r'^"')
+
+
+class CompressionMiddleware:
+    """
+    Compresses text and JSON responses with the coding the client prefers (brotli
+    or gzip), streaming responses chunk by chunk. Bodies under
+    COMPRESSION_MIN_SIZE are left alone, and so are responses already encoded, such
+    as `prebuilt_response()`s, which carry compressed copies computed once.
+
+    Gzip bodies are padded with up to COMPRESSION_GZIP_MAX_RANDOM_BYTES against
+    BREACH. Brotli cannot be padded, so the responses a cross-site attacker can
+    have a browser fetch with its credentials, HTML pages and requests carrying
+    cookies, are only ever gzipped; bearer token requests cannot be forged that way.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    @staticmethod
+    def compressible(response) -> bool:
+        if response.has_header("Content-Encoding") or response.status_code in (204, 206, 304):
+            return False
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        if not (content_type.startswith("text/") or content_type in COMPRESSIBLE_TYPES):
+            return False
+        return response.streaming or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+    @staticmethod
+    def credentialed(request, response) -> bool:
+        content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+        return content_type == "text/html" or "HTTP_COOKIE" in request.META
+
+    def compress(self, request, response):
+        if not settings.COMPRESSION_ENABLED or not self.compressible(response):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        available = ("gzip",) if self.credentialed(request, response) else ENCODINGS
+        encoding = negotiate(request.META.get("HTTP_ACCEPT_ENCODING", ""), available)
+        if encoding is None:
+            return response
+
+        padding = settings.COMPRESSION_GZIP_MAX_RANDOM_BYTES
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_sequence(response.streaming_content, encoding, padding)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content, encoding, padding)
+            del response["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding, max_random_bytes=padding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The body differs from the uncompressed one byte for byte.
+        etag = response.get("ETag")
+        if etag and re_strong_etag.search(etag):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
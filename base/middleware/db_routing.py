@@ -0,0 +1,114 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from base.authentication import CustomJWTAuthentication
+from base.db_router import pin_to_primary
+
+PIN_COOKIE = "db_primary_until"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+# Caches that other workers cannot see.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+jwt_authentication = CustomJWTAuthentication()
+
+
+def pin_cache_key(user_id) -> str:
+    return f"db_primary_pin_{user_id}"
+
+
+def token_user_id(request):
+    """
+    Id of the user of the request's bearer token, or None. DRF authenticates the
+    request only once it reaches the view, after this middleware; the token is
+    verified here without the database.
+    """
+    header = jwt_authentication.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = jwt_authentication.get_raw_token(header)
+        if raw_token is None:
+            return None
+        return jwt_authentication.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except AuthenticationFailed:
+        return None
+
+
+class PrimaryPinningMiddleware:
+    """
+    Read-your-writes for replica routing. After a successful write, the client is
+    pinned to the primary for DB_PRIMARY_PIN_SECONDS through a cookie, and for
+    authenticated users, by JWT or session, also through a marker in the shared
+    DB_PRIMARY_PIN_CACHE, which covers their other devices and clients that keep
+    no cookies. Writes themselves always use the primary.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(settings.DB_REPLICA_HOSTS)
+        self.cache = caches[settings.DB_PRIMARY_PIN_CACHE]
+        if self.enabled and isinstance(self.cache, PROCESS_LOCAL_CACHES):
+            raise ImproperlyConfigured(
+                "Read replicas need DB_PRIMARY_PIN_CACHE to be a cache shared by every worker, "
+                f"not {type(self.cache).__name__}; see CACHE_BACKEND."
+            )
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        user_id = token_user_id(request)
+        if user_id is None and request.user.is_authenticated:
+            user_id = request.user.pk
+        with pin_to_primary(self.is_pinned(request, user_id)):
+            response = self.get_response(request)
+        self.pin(request, response, user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        user_id = token_user_id(request)
+        if user_id is None:
+            user = await request.auser()
+            user_id = user.pk if user.is_authenticated else None
+        with pin_to_primary(self.is_pinned(request, user_id)):
+            response = await self.get_response(request)
+        self.pin(request, response, user_id)
+        return response
+
+    def is_pinned(self, request, user_id) -> bool:
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+                return True
+        except ValueError:
+            pass
+        return user_id is not None and self.cache.get(pin_cache_key(user_id)) is not None
+
+    def pin(self, request, response, user_id):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return
+        seconds = settings.DB_PRIMARY_PIN_SECONDS
+        response.set_cookie(
+            PIN_COOKIE, str(int(time.time()) + seconds), max_age=seconds, httponly=True, samesite="Lax"
+        )
+        if user_id is not None:
+            self.cache.set(pin_cache_key(user_id), 1, seconds)
@@ -0,0 +1,75 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+from base.helpers import get_view_name
+from base.metrics import REQUEST_LATENCY, REQUESTS, RESPONSE_SIZE, DB_QUERIES, DB_DURATION, record_pool_stats
+
+
+class QueryStats:
+    """
+    `execute_wrapper` hook that counts queries and the time spent running them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status, response size and SQL usage of every request, labelled
+    with the resolved view and action. Keep it first in MIDDLEWARE so the latency
+    covers the whole middleware stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = await self.get_response(request)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, duration, stats):
+        view = get_view_name(request)
+        REQUEST_LATENCY.labels(view).observe(duration)
+        REQUESTS.labels(view, str(response.status_code)).inc()
+        DB_QUERIES.labels(view).observe(stats.count)
+        DB_DURATION.labels(view).observe(stats.duration)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(view).observe(len(response.content))
+        record_pool_stats()
@@ -1,55 +1,280 @@
-from django.contrib.auth import get_user_model
-from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
+import atexit
+import logging
+import math
 import threading
+import time
+from datetime import datetime, timedelta
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction, DatabaseError
+from django.db.models import Sum
+from django.utils import timezone
+
+from base.enum import ActiveUserPeriod
+from base.hyperloglog import HyperLogLog
+from base.models import OnlineUserPresence, OnlineUserBucket, ActiveUserSketch
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Moves the user into the current bucket and keeps the per bucket member counts in
+# step, in a single round trip. Concurrent workers marking the same user race on the
+# ON CONFLICT ... WHERE clause, so only one of them adjusts the counters.
+MARK_ONLINE_SQL = """
+WITH previous AS (
+    SELECT bucket FROM online_user_presence WHERE user_id = %(user_id)s
+), marked AS (
+    INSERT INTO online_user_presence (user_id, bucket, last_seen)
+    VALUES (%(user_id)s, %(bucket)s, now())
+    ON CONFLICT (user_id) DO UPDATE
+        SET bucket = EXCLUDED.bucket, last_seen = EXCLUDED.last_seen
+        WHERE online_user_presence.bucket < EXCLUDED.bucket
+    RETURNING user_id
+), released AS (
+    UPDATE online_user_bucket SET members = members - 1
+    WHERE bucket = (SELECT bucket FROM previous) AND EXISTS (SELECT 1 FROM marked)
+)
+INSERT INTO online_user_bucket (bucket, members)
+SELECT %(bucket)s, 1 FROM marked
+ON CONFLICT (bucket) DO UPDATE SET members = online_user_bucket.members + 1
+"""
 
-@dataclass
-class OnlineUser:
-    user_id: int
-    last_seen: datetime
 
 class OnlineUserTracker:
-    _users = {}
+    """
+    Presence shared by every worker through the `online_user_presence` table.
+
+    Time is cut into buckets of `ONLINE_USER_BUCKET_SECONDS`; a user is online while
+    their latest bucket is inside the TTL window. Each worker writes a user at most
+    once per bucket, and counts only sum the few bucket rows inside the window.
+    """
+    TTL = timedelta(seconds=getattr(settings, "ONLINE_USER_TTL_SECONDS", 300))
+    BUCKET_SIZE = timedelta(seconds=getattr(settings, "ONLINE_USER_BUCKET_SECONDS", 60))
+    _marked = set()
+    _marked_bucket = None
     _lock = threading.Lock()
-    TTL = timedelta(minutes=5)
+
+    @classmethod
+    def current_bucket(cls) -> int:
+        return int(time.time() // cls.BUCKET_SIZE.total_seconds())
+
+    @classmethod
+    def window_start(cls, bucket: int) -> int:
+        return bucket - math.ceil(cls.TTL / cls.BUCKET_SIZE) + 1
 
     @classmethod
     def mark_online(cls, user_id: int):
+        bucket = cls.current_bucket()
+        with cls._lock:
+            rolled_over = cls._marked_bucket != bucket
+            if rolled_over:
+                cls._marked.clear()
+                cls._marked_bucket = bucket
+            if user_id in cls._marked:
+                return
+
+        with connection.cursor() as cursor:
+            cursor.execute(MARK_ONLINE_SQL, {"user_id": user_id, "bucket": bucket})
+        # Only once written, so a failed write is retried by the next request.
         with cls._lock:
-            cls._users[user_id] = OnlineUser(user_id=user_id, last_seen=datetime.utcnow())
+            if cls._marked_bucket == bucket:
+                cls._marked.add(user_id)
+        if rolled_over:
+            cls.prune(bucket)
+
+    @classmethod
+    def prune(cls, bucket: int):
+        """
+        Drop presence rows and counters that fell out of the TTL window.
+        """
+        start = cls.window_start(bucket)
+        OnlineUserPresence.objects.filter(bucket__lt=start).delete()
+        OnlineUserBucket.objects.filter(bucket__lt=start).delete()
 
     @classmethod
     def is_online(cls, user_id: int) -> bool:
-        with cls._lock:
-            user = cls._users.get(user_id)
-            if user and datetime.utcnow() - user.last_seen < cls.TTL:
-                return True
-            else:
-                cls._users.pop(user_id, None)
-                return False
+        start = cls.window_start(cls.current_bucket())
+        return OnlineUserPresence.objects.filter(user_id=user_id, bucket__gte=start).exists()
 
     @classmethod
     def get_all_online_users(cls) -> list[int]:
-        now = datetime.utcnow()
-        with cls._lock:
-            expired = [uid for uid, user in cls._users.items() if now - user.last_seen >= cls.TTL]
-            for uid in expired:
-                del cls._users[uid]
-            return list(cls._users.keys())
+        start = cls.window_start(cls.current_bucket())
+        return list(OnlineUserPresence.objects.filter(bucket__gte=start).values_list("user_id", flat=True))
 
     @classmethod
     def get_online_user_count(cls):
-        return len(cls.get_all_online_users())
+        bucket = cls.current_bucket()
+        total = OnlineUserBucket.objects.filter(
+            bucket__gte=cls.window_start(bucket), bucket__lte=bucket
+        ).aggregate(total=Sum("members"))["total"]
+        return total or 0
+
+
+class ActiveUserCounter:
+    """
+    Hourly, daily and monthly unique active users backed by HyperLogLog sketches.
+
+    Each worker folds users into an in-memory sketch for the current hour and merges
+    it into the hour, day and month rows every `ACTIVE_USER_FLUSH_SECONDS`, so the
+    database cost is three fixed size row updates per flush regardless of traffic.
+    """
+    FLUSH_INTERVAL = getattr(settings, "ACTIVE_USER_FLUSH_SECONDS", 60)
+    _sketch = None
+    _hour = None
+    # Sketches whose flush failed, by hour, retried with the next flush.
+    _unflushed = {}
+    _last_flush = time.monotonic()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def period_starts(moment: datetime) -> dict:
+        hour = moment.replace(minute=0, second=0, microsecond=0)
+        return {
+            ActiveUserPeriod.HOUR.value: hour,
+            ActiveUserPeriod.DAY.value: hour.replace(hour=0),
+            ActiveUserPeriod.MONTH.value: hour.replace(day=1, hour=0),
+        }
+
+    @staticmethod
+    def merge_into(sketches: dict, hour: datetime, sketch: HyperLogLog):
+        if hour in sketches:
+            sketches[hour].update(sketch)
+        else:
+            sketches[hour] = sketch
+
+    @classmethod
+    def add(cls, user_id: int):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        pending = {}
+        with cls._lock:
+            if cls._hour != hour and cls._sketch is not None:
+                pending[cls._hour] = cls._sketch
+                cls._sketch = None
+            if cls._sketch is None:
+                cls._hour, cls._sketch = hour, HyperLogLog()
+            cls._sketch.add(user_id)
+            if not pending and time.monotonic() - cls._last_flush >= cls.FLUSH_INTERVAL:
+                pending[cls._hour] = cls._sketch
+                cls._sketch = None
+            if pending:
+                cls._last_flush = time.monotonic()
+                pending = cls.take_unflushed(pending)
+        if pending:
+            cls.persist_all(pending)
+
+    @classmethod
+    def flush(cls):
+        with cls._lock:
+            pending = {cls._hour: cls._sketch} if cls._sketch is not None else {}
+            cls._sketch = None
+            pending = cls.take_unflushed(pending)
+        if pending:
+            cls.persist_all(pending)
+
+    @classmethod
+    def take_unflushed(cls, pending: dict) -> dict:
+        """
+        `pending` with the sketches of failed flushes merged in. Holds the lock.
+        """
+        for hour, sketch in cls._unflushed.items():
+            cls.merge_into(pending, hour, sketch)
+        cls._unflushed = {}
+        return pending
+
+    @classmethod
+    def persist_all(cls, pending: dict):
+        """
+        Persist the sketches of `pending`, or keep them all for the next flush when
+        that fails. Merging is idempotent, so hours already stored are harmless to
+        merge again.
+        """
+        try:
+            for hour in sorted(pending):
+                cls.persist(hour, pending[hour])
+        except DatabaseError:
+            with cls._lock:
+                for hour, sketch in pending.items():
+                    cls.merge_into(cls._unflushed, hour, sketch)
+            raise
+
+    @staticmethod
+    def persist(hour: datetime, sketch: HyperLogLog):
+        """
+        Merge a sketch into the stored hour, day and month rows. Rows are locked in a
+        fixed order so concurrent workers cannot deadlock.
+        """
+        with transaction.atomic():
+            for period, period_start in ActiveUserCounter.period_starts(hour).items():
+                row, created = ActiveUserSketch.objects.select_for_update().get_or_create(
+                    period=period, period_start=period_start, defaults={"registers": sketch.to_bytes()}
+                )
+                if not created:
+                    merged = HyperLogLog(bytes(row.registers))
+                    merged.update(sketch)
+                    row.registers = merged.to_bytes()
+                    row.save(update_fields=["registers", "updated_at"])
+
+    @staticmethod
+    def count(period: str, period_start: datetime) -> int:
+        registers = ActiveUserSketch.objects.filter(
+            period=period, period_start=period_start
+        ).values_list("registers", flat=True).first()
+        return HyperLogLog(bytes(registers)).count() if registers else 0
+
+    @staticmethod
+    def hourly_counts(day_start: datetime) -> list[tuple[datetime, int]]:
+        rows = ActiveUserSketch.objects.filter(
+            period=ActiveUserPeriod.HOUR.value,
+            period_start__gte=day_start,
+            period_start__lt=day_start + timedelta(days=1),
+        ).order_by("period_start").values_list("period_start", "registers")
+        return [(period_start, HyperLogLog(bytes(registers)).count()) for period_start, registers in rows]
+
+
+def _flush_active_users():
+    try:
+        ActiveUserCounter.flush()
+    except Exception as e:
+        logger.warning("Unable to flush active user sketch: %s", e)
+
+
+atexit.register(_flush_active_users)
 
 
 class OnlineUserMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
         response = self.get_response(request)
         if request.user.is_authenticated:
-            OnlineUserTracker.mark_online(request.user.id)
-        return response
\ No newline at end of file
+            self.record(request.user.id)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        user = await request.auser()
+        if user.is_authenticated:
+            await sync_to_async(self.record)(user.id)
+        return response
+
+    @staticmethod
+    def record(user_id):
+        try:
+            OnlineUserTracker.mark_online(user_id)
+        except DatabaseError as e:
+            logger.warning("Unable to record online presence for user %s: %s", user_id, e)
+        try:
+            ActiveUserCounter.add(user_id)
+        except DatabaseError as e:
+            logger.warning("Unable to record activity of user %s: %s", user_id, e)
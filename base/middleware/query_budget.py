@@ -0,0 +1,160 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from base.helpers import get_view_action, get_view_name
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+# Statements starting with this comment are bookkeeping of the request rather than
+# its work (e.g. throttling), and are left out of query budgets.
+UNCOUNTED = "/* uncounted */"
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalize a statement so executions that only differ by their parameters, e.g. the
+    same lookup run once per row, share a fingerprint.
+    """
+    sql = _WHITESPACE.sub(" ", sql.strip())
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    return _PLACEHOLDER_LIST.sub("(?)", sql)
+
+
+class QueryInspector:
+    """
+    Context manager that captures every SQL statement run on any connection.
+
+        with QueryInspector() as inspector:
+            ...
+        inspector.count, inspector.repeated()
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.startswith(UNCOUNTED):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({"sql": sql, "duration": time.perf_counter() - start})
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def fingerprints(self) -> Counter:
+        return Counter(fingerprint(query["sql"]) for query in self.queries)
+
+    def repeated(self, threshold: int = None, reads_only: bool = True) -> dict:
+        """
+        Fingerprints executed at least `threshold` times, the signature of an N+1.
+        """
+        threshold = threshold or settings.QUERY_N_PLUS_ONE_THRESHOLD
+        return {
+            sql: count for sql, count in self.fingerprints().items()
+            if count >= threshold and (not reads_only or sql.upper().startswith("SELECT"))
+        }
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries"]
+        for sql, count in self.fingerprints().most_common():
+            lines.append(f"  {count}x {sql}")
+        return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks each request against the `query_budget` declared on its view, e.g.
+    `query_budget = {"list": 3}`, and flags repeated statements as N+1 queries.
+
+    Enabled by QUERY_BUDGET_ENABLED (DEBUG by default). Violations are logged, or
+    raised as QueryBudgetExceeded when QUERY_BUDGET_RAISE is set. Session and user
+    lookups made by the auth middleware are resolved first and not counted, nor are
+    statements marked UNCOUNTED.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.QUERY_BUDGET_ENABLED
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        user = getattr(request, "user", None)
+        if user is not None:
+            user.is_authenticated  # noqa: B018 - load the lazy user outside the budget
+
+        with QueryInspector() as inspector:
+            response = self.get_response(request)
+
+        self.check(request, inspector)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        if hasattr(request, "auser"):
+            await request.auser()
+
+        with QueryInspector() as inspector:
+            response = await self.get_response(request)
+
+        self.check(request, inspector)
+        return response
+
+    def check(self, request, inspector: QueryInspector):
+        view_class, action = get_view_action(request)
+        budget = (getattr(view_class, "query_budget", None) or {}).get(action)
+        problems = []
+        if budget is not None and inspector.count > budget:
+            problems.append(f"ran {inspector.count} queries, budget is {budget}")
+        for sql, count in inspector.repeated().items():
+            problems.append(f"possible N+1, {count}x {sql}")
+        if not problems:
+            return
+
+        message = f"{get_view_name(request)} {request.method} {request.path}: " + "; ".join(problems)
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(f"{message}\n{inspector.report()}")
+        logger.warning(message)
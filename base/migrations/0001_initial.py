@@ -0,0 +1,40 @@
+# Generated by Django 5.1 on 2026-10-19 16:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OnlineUserBucket',
+            fields=[
+                ('bucket', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('members', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'online_user_bucket',
+            },
+        ),
+        migrations.CreateModel(
+            name='OnlineUserPresence',
+            fields=[
+                ('user_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('bucket', models.BigIntegerField(db_index=True, help_text='Presence bucket the user was last seen in')),
+                ('last_seen', models.DateTimeField(help_text='First hit of the user within the bucket')),
+            ],
+            options={
+                'db_table': 'online_user_presence',
+            },
+        ),
+        # Presence is rebuilt from traffic, so skip the WAL for these hot tables.
+        migrations.RunSQL(
+            sql="ALTER TABLE online_user_bucket SET UNLOGGED; ALTER TABLE online_user_presence SET UNLOGGED;",
+            reverse_sql="ALTER TABLE online_user_bucket SET LOGGED; ALTER TABLE online_user_presence SET LOGGED;",
+        ),
+    ]
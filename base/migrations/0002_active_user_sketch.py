@@ -0,0 +1,27 @@
+# Generated by Django 5.1 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActiveUserSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('hour', 'HOUR'), ('day', 'DAY'), ('month', 'MONTH')], help_text='Length of the period', max_length=10)),
+                ('period_start', models.DateTimeField(help_text='Start of the period in UTC')),
+                ('registers', models.BinaryField(help_text='Serialized HyperLogLog registers')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'active_user_sketch',
+                'constraints': [models.UniqueConstraint(fields=('period', 'period_start'), name='active_user_sketch_period_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-19 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0002_active_user_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ThrottleBucket',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField(help_text='Tokens left as of updated_at')),
+                ('updated_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'throttle_bucket',
+            },
+        ),
+        # Buckets refill on their own, so skip the WAL for this hot table.
+        migrations.RunSQL(
+            sql="ALTER TABLE throttle_bucket SET UNLOGGED;",
+            reverse_sql="ALTER TABLE throttle_bucket SET LOGGED;",
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0004_user_token_version'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        # `prune_tokens` deletes expired tokens oldest first, in batches; the
+        # token_blacklist app does not index expires_at itself.
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS token_blacklist_outstandingtoken_expires_at_idx "
+                "ON token_blacklist_outstandingtoken (expires_at);",
+            reverse_sql="DROP INDEX IF EXISTS token_blacklist_outstandingtoken_expires_at_idx;",
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.conf import settings
+from django.db import connection, models
+from base.enum import ActiveUserPeriod
 from base.mixin import DeepDeleteMixin, ImageHandlerMixin
 
 
@@ -87,4 +89,87 @@ class BaseModel(DeepDeleteMixin, ImageHandlerMixin, models.Model):
                         print(f"Error deleting image '{image_field.name}': {e}")
 
         # Call the superclass delete method to delete the database record
-        super().delete(*args, **kwargs)
\ No newline at end of file
+        super().delete(*args, **kwargs)
+
+
+class OnlineUserPresence(models.Model):
+    """
+    Latest presence bucket of every user seen recently. Shared by all workers and
+    kept in an UNLOGGED table since it is rebuilt from live traffic after a crash.
+    """
+    user_id = models.BigIntegerField(primary_key=True)
+    bucket = models.BigIntegerField(db_index=True, help_text="Presence bucket the user was last seen in")
+    last_seen = models.DateTimeField(help_text="First hit of the user within the bucket")
+
+    class Meta:
+        db_table = "online_user_presence"
+
+
+class OnlineUserBucket(models.Model):
+    """
+    Number of users whose latest presence falls in a bucket, so the online count
+    is a sum over the handful of buckets inside the TTL window.
+    """
+    bucket = models.BigIntegerField(primary_key=True)
+    members = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "online_user_bucket"
+
+
+
+class ActiveUserSketch(models.Model):
+    """
+    HyperLogLog registers of the distinct users active in an hour, day or month.
+    Every row has the same fixed size however many users it counts.
+    """
+    period = models.CharField(max_length=10, choices=ActiveUserPeriod.choices(), help_text="Length of the period")
+    period_start = models.DateTimeField(help_text="Start of the period in UTC")
+    registers = models.BinaryField(help_text="Serialized HyperLogLog registers")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "active_user_sketch"
+        constraints = [
+            models.UniqueConstraint(fields=["period", "period_start"], name="active_user_sketch_period_unique"),
+        ]
+
+
+class ThrottleBucket(models.Model):
+    """
+    Token bucket of one client (a user, or an IP for anonymous requests), shared by
+    all workers. UNLOGGED like the presence tables: losing it only refills buckets.
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    tokens = models.FloatField(help_text="Tokens left as of updated_at")
+    updated_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "throttle_bucket"
+
+
+class UserTokenVersion(models.Model):
+    """
+    Version stamped into a user's JWTs as the `ver` claim. Bumping it revokes every
+    token issued before, which happens on password changes and deactivation.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, primary_key=True, on_delete=models.CASCADE, related_name="token_version"
+    )
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "user_token_version"
+
+    @classmethod
+    def bump(cls, user_id) -> int:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO user_token_version (user_id, version) VALUES (%s, 1)
+                ON CONFLICT (user_id) DO UPDATE SET version = user_token_version.version + 1
+                RETURNING version
+                """,
+                [user_id],
+            )
+            return cursor.fetchone()[0]
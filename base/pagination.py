@@ -1,5 +1,7 @@
 from math import ceil
 
+from django.core.paginator import InvalidPage
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
@@ -44,3 +46,21 @@ class CustomPagination(PageNumberPagination):
                 "results": data,
             }
         )
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async counterpart of `paginate_queryset` using `acount` and `aiterator`. The
+        paginator only works on the row count, so building the page runs no query.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        count = await queryset.acount()
+        paginator = self.django_paginator_class(range(count), page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        rows = self.page.object_list
+        return [obj async for obj in queryset[rows.start:rows.stop].aiterator()]
@@ -0,0 +1,36 @@
+import codecs
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from base.renderers import MessagePackRenderer, msgpack
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson. Like DRF's in strict mode it rejects NaN and
+    Infinity.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        content = stream.read() if stream is not None else b""
+        try:
+            if codecs.lookup(encoding).name != "utf-8":
+                content = content.decode(encoding)
+            return orjson.loads(content)
+        except (ValueError, LookupError) as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+class MessagePackParser(BaseParser):
+    media_type = MessagePackRenderer.media_type
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read() if stream is not None else b"", raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
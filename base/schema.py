@@ -0,0 +1,110 @@
+"""
+Prebuilt OpenAPI documents. `manage.py build_schema` renders the schema once per
+code version, as JSON and YAML with a compressed copy of each, and the docs views
+serve those bytes from memory instead of walking every view per request.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+
+from base.compression import FILE_SUFFIXES
+from base.helpers import Payload, payload
+
+FORMATS = ("json", "yaml")
+SOURCE_SUFFIXES = (".py", ".html")
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    `CODE_VERSION` when the deployment sets it (e.g. the release's git sha),
+    otherwise a hash of the project's sources and the installed DRF and
+    drf_spectacular versions, so any change that may alter the schema gets a new one.
+    """
+    if settings.CODE_VERSION:
+        return settings.CODE_VERSION
+    import drf_spectacular
+    import rest_framework
+
+    base_dir = Path(settings.BASE_DIR)
+    roots = {base_dir / "config", base_dir / "templates"}
+    roots.update(Path(app.path) for app in apps.get_app_configs() if Path(app.path).is_relative_to(base_dir))
+    digest = hashlib.sha256(f"{rest_framework.VERSION}:{drf_spectacular.__version__}".encode())
+    for root in sorted(roots):
+        for path in sorted(root.rglob("*")):
+            if path.suffix in SOURCE_SUFFIXES and "__pycache__" not in path.parts:
+                digest.update(str(path.relative_to(base_dir)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_dir(version: str = None) -> Path:
+    return Path(settings.SCHEMA_BUILD_DIR) / (version or code_version())
+
+
+def file_name(lang: str, fmt: str) -> str:
+    return f"schema.{lang}.{fmt}"
+
+
+def build(version: str = None, languages=None) -> list:
+    """
+    Generate the public schema for each language and write it under
+    `build_dir(version)`. Returns the paths written.
+    """
+    from django.utils import translation
+    from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    renderers = {"json": OpenApiJsonRenderer(), "yaml": OpenApiYamlRenderer()}
+    directory = build_dir(version)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for lang in languages or settings.SCHEMA_LANGUAGES:
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=spectacular_settings.SERVE_URLCONF)
+        with translation.override(lang):
+            schema = generator.get_schema(request=None, public=True)
+        for fmt in FORMATS:
+            built = payload(renderers[fmt].render(schema, renderer_context={}))
+            path = directory / file_name(lang, fmt)
+            copies = [(path, built.content)] + [
+                (path.with_name(path.name + FILE_SUFFIXES[encoding]), content) for encoding, content in built.encoded.items()
+            ]
+            for target, content in copies:
+                # Written aside and renamed, so a running worker never reads a partial file.
+                partial = target.with_name(target.name + ".partial")
+                partial.write_bytes(content)
+                os.replace(partial, target)
+                written.append(target)
+    return written
+
+
+_loaded = {}
+
+
+def load(fmt: str, lang: str = None) -> Optional[Payload]:
+    """
+    The built schema of the running code in `fmt` and `lang` (falling back to the
+    first of SCHEMA_LANGUAGES), read from disk once per process. None when it has
+    not been built.
+    """
+    if lang not in settings.SCHEMA_LANGUAGES:
+        lang = settings.SCHEMA_LANGUAGES[0]
+    key = (fmt, lang)
+    if key not in _loaded:
+        path = build_dir() / file_name(lang, fmt)
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        encoded = {}
+        for encoding, suffix in FILE_SUFFIXES.items():
+            copy = path.with_name(path.name + suffix)
+            if copy.exists():
+                encoded[encoding] = copy.read_bytes()
+        _loaded[key] = Payload(content, hashlib.sha256(content).hexdigest()[:32], encoded)
+    return _loaded[key]
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from base.authentication import user_cache
+from base.models import UserTokenVersion
+
+User = get_user_model()
+
+
+def token_state(instance):
+    # Read from __dict__ so deferred fields are not loaded.
+    return instance.__dict__.get("password"), instance.__dict__.get("is_active")
+
+
+@receiver(post_init, sender=User)
+def remember_credentials(sender, instance, **kwargs):
+    instance._token_state = token_state(instance)
+
+
+@receiver(post_save, sender=User)
+def revoke_tokens(sender, instance, created, **kwargs):
+    """
+    Revoke the user's JWTs when their password changes or they are deactivated.
+    Queryset `update()`s bypass this and must call UserTokenVersion.bump themselves.
+    """
+    state = token_state(instance)
+    previous, instance._token_state = instance._token_state, state
+    if created or previous == state:
+        return
+    if previous[0] != state[0] or state[1] is False:
+        UserTokenVersion.bump(instance.pk)
+    user_cache.evict(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    user_cache.evict(instance.pk)
@@ -0,0 +1,64 @@
+"""
+Query assertions for tests. Use the context managers directly, or enable the pytest
+fixtures with `pytest_plugins = ["base.testing"]` in a conftest.
+"""
+from contextlib import contextmanager
+
+from base.middleware.query_budget import QueryInspector
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """
+    Fail if the block runs more than `limit` SQL statements.
+    """
+    with QueryInspector() as inspector:
+        yield inspector
+    if inspector.count > limit:
+        raise AssertionError(f"Expected at most {limit} queries, got {inspector.report()}")
+
+
+@contextmanager
+def assert_no_n_plus_one(threshold: int = None):
+    """
+    Fail if any read statement is repeated `threshold` times or more.
+    """
+    with QueryInspector() as inspector:
+        yield inspector
+    repeated = inspector.repeated(threshold)
+    if repeated:
+        details = "\n".join(f"  {count}x {sql}" for sql, count in repeated.items())
+        raise AssertionError(f"Repeated queries detected:\n{details}")
+
+
+def assert_view_within_budget(view_class, action: str, inspector: QueryInspector):
+    """
+    Fail if a captured request exceeded the `query_budget` declared on its view.
+    """
+    budget = (getattr(view_class, "query_budget", None) or {}).get(action)
+    if budget is None:
+        raise AssertionError(f"{view_class.__name__} declares no query budget for '{action}'")
+    if inspector.count > budget:
+        raise AssertionError(
+            f"{view_class.__name__}.{action} exceeded its budget of {budget}: {inspector.report()}"
+        )
+
+
+try:
+    import pytest
+except ImportError:  # pytest is only installed in test environments
+    pytest = None
+
+if pytest is not None:
+    @pytest.fixture
+    def query_inspector():
+        with QueryInspector() as inspector:
+            yield inspector
+
+    @pytest.fixture
+    def max_queries():
+        return assert_max_queries
+
+    @pytest.fixture
+    def no_n_plus_one():
+        return assert_no_n_plus_one
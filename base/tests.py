@@ -0,0 +1,754 @@
+import gc
+import gzip
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import uuid
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from prometheus_client import REGISTRY
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from base.authentication import (
+    CustomJWTAuthentication, TokenRefreshSerializer, VersionedRefreshToken, user_cache,
+)
+from base.blacklist import BlacklistFilter, blacklist_filter, prune_batch
+from base.compression import negotiate
+from base.db_router import ReplicaLagGuard, ReplicaRouter, is_pinned_to_primary, pin_to_primary
+from base.enum import ActiveUserPeriod, BaseEnum, EventStatus, registry, taxonomy
+from base.hyperloglog import HyperLogLog
+from base.middleware.compression import CompressionMiddleware
+from base.middleware.db_routing import PIN_COOKIE, PrimaryPinningMiddleware
+from base.middleware.online_user import ActiveUserCounter, OnlineUserMiddleware, OnlineUserTracker
+from base.models import OnlineUserBucket, OnlineUserPresence
+from base.parsers import MessagePackParser, ORJSONParser
+from base.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from event.models import EventModel
+
+# A second connection to the local test database stands in for a replica.
+REPLICA = "replica_test"
+connections.settings.setdefault(REPLICA, {
+    **connections.settings[DEFAULT_DB_ALIAS],
+    "TEST": {**connections.settings[DEFAULT_DB_ALIAS]["TEST"], "MIRROR": DEFAULT_DB_ALIAS},
+})
+
+
+@override_settings(DATABASE_ROUTERS=["base.db_router.ReplicaRouter"])
+class ReplicaRouterTests(SimpleTestCase):
+    databases = {DEFAULT_DB_ALIAS, REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Let the test database be dropped at the end of the run.
+        cls.addClassCleanup(connections[REPLICA].close)
+
+    def setUp(self):
+        ReplicaLagGuard._checked.clear()
+        self.addCleanup(ReplicaLagGuard._checked.clear)
+
+    def test_reads_go_to_a_healthy_replica(self):
+        self.assertEqual(ReplicaRouter().replicas, [REPLICA])
+        queryset = EventModel.objects.all()
+        self.assertEqual(queryset.db, REPLICA)
+        queryset.count()
+        self.assertEqual(ReplicaLagGuard.lag(REPLICA), 0)
+
+    def test_writes_go_to_the_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_write(EventModel), DEFAULT_DB_ALIAS)
+
+    def test_pinned_reads_go_to_the_primary(self):
+        with pin_to_primary():
+            self.assertEqual(EventModel.objects.all().db, DEFAULT_DB_ALIAS)
+        self.assertEqual(EventModel.objects.all().db, REPLICA)
+
+    def test_reads_in_a_primary_transaction_go_to_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(EventModel.objects.all().db, DEFAULT_DB_ALIAS)
+
+    def test_lagging_replica_is_skipped(self):
+        ReplicaLagGuard._checked[REPLICA] = (time.monotonic(), float("inf"))
+        self.assertEqual(EventModel.objects.all().db, DEFAULT_DB_ALIAS)
+
+
+class PrimaryPinningMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.cache_dir, ignore_errors=True)
+
+    def setUp(self):
+        settings = override_settings(
+            DB_REPLICA_HOSTS=["replica"],
+            DB_PRIMARY_PIN_CACHE="pins",
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                "pins": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": self.cache_dir},
+            },
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.factory = RequestFactory()
+        self.user = get_user_model().objects.create_user(username="writer", password="Writer-p4ss!")
+        self.token = str(VersionedRefreshToken.for_user(self.user).access_token)
+        self.pinned = []
+        self.middleware = PrimaryPinningMiddleware(self.respond)
+
+    def respond(self, request):
+        self.pinned.append(is_pinned_to_primary())
+        return HttpResponse(status=request.status)
+
+    def request(self, method, token=None, status=200, **extra):
+        if token:
+            extra["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        request = getattr(self.factory, method)("/events/user/", **extra)
+        request.user = AnonymousUser()
+        request.status = status
+        return self.middleware(request)
+
+    def test_requires_a_shared_cache(self):
+        with override_settings(DB_PRIMARY_PIN_CACHE="default"):
+            with self.assertRaises(ImproperlyConfigured):
+                PrimaryPinningMiddleware(self.respond)
+
+    def test_jwt_write_pins_the_users_other_clients(self):
+        self.request("post", self.token, status=201)
+        # Another device of the user, without the cookie.
+        self.request("get", self.token)
+        other = get_user_model().objects.create_user(username="reader", password="Reader-p4ss!")
+        self.request("get", str(VersionedRefreshToken.for_user(other).access_token))
+        self.request("get")
+        self.assertEqual(self.pinned, [True, True, False, False])
+
+    def test_write_pins_the_client_by_cookie(self):
+        response = self.request("post", status=201)
+        self.request("get", HTTP_COOKIE=f"{PIN_COOKIE}={response.cookies[PIN_COOKIE].value}")
+        self.assertEqual(self.pinned, [True, True])
+
+    def test_failed_write_does_not_pin(self):
+        response = self.request("post", self.token, status=400)
+        self.request("get", self.token)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.pinned, [True, False])
+
+    def test_invalid_token_is_not_pinned(self):
+        self.request("post", self.token, status=201)
+        self.request("get", "not-a-token")
+        self.assertEqual(self.pinned, [True, False])
+
+
+class OnlineUserTrackerTests(TestCase):
+    def setUp(self):
+        OnlineUserTracker._marked.clear()
+        OnlineUserTracker._marked_bucket = None
+        self.addCleanup(OnlineUserTracker._marked.clear)
+        self.bucket = 1000
+
+    def mark(self, user_id, bucket=None):
+        with mock.patch.object(OnlineUserTracker, "current_bucket", return_value=bucket or self.bucket):
+            OnlineUserTracker.mark_online(user_id)
+
+    def online_count(self, bucket=None):
+        with mock.patch.object(OnlineUserTracker, "current_bucket", return_value=bucket or self.bucket):
+            return OnlineUserTracker.get_online_user_count()
+
+    def test_counts_each_user_once_across_calls(self):
+        for user_id in (1, 2, 3, 1):
+            self.mark(user_id)
+        self.mark(1, self.bucket + 1)
+        self.assertEqual(self.online_count(self.bucket + 1), 3)
+        self.assertEqual(OnlineUserPresence.objects.get(user_id=1).bucket, self.bucket + 1)
+
+    def test_writes_a_user_once_per_bucket(self):
+        self.mark(1)
+        with self.assertNumQueries(0):
+            self.mark(1)
+
+    def test_failed_write_is_retried(self):
+        with mock.patch("base.middleware.online_user.MARK_ONLINE_SQL", "SELECT * FROM missing_table"):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                self.mark(1)
+        self.mark(1)
+        self.assertEqual(self.online_count(), 1)
+
+    def test_rollover_prunes_buckets_outside_the_window(self):
+        self.mark(1)
+        self.mark(2, self.bucket + 10)
+        self.assertEqual(list(OnlineUserPresence.objects.values_list("user_id", flat=True)), [2])
+        self.assertEqual(list(OnlineUserBucket.objects.values_list("bucket", flat=True)), [self.bucket + 10])
+        self.assertEqual(self.online_count(self.bucket + 10), 1)
+
+    def test_record_counts_activity_when_presence_fails(self):
+        with mock.patch.object(OnlineUserTracker, "mark_online", side_effect=DatabaseError("down")), \
+                mock.patch.object(ActiveUserCounter, "add") as add:
+            OnlineUserMiddleware.record(7)
+        add.assert_called_once_with(7)
+
+
+class HyperLogLogTests(SimpleTestCase):
+    @staticmethod
+    def sketch(values):
+        sketch = HyperLogLog()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_counts_small_cardinalities_almost_exactly(self):
+        for distinct in (0, 1, 10, 1000):
+            with self.subTest(distinct=distinct):
+                count = self.sketch(list(range(distinct)) * 2).count()
+                self.assertLessEqual(abs(count - distinct), max(1, distinct * 0.01))
+
+    def test_counts_large_cardinalities_within_the_error(self):
+        count = self.sketch(range(200_000)).count()
+        # 0.8% standard error; 3% is well outside a flaky margin.
+        self.assertLess(abs(count - 200_000), 200_000 * 0.03)
+
+    def test_update_counts_the_union(self):
+        sketch = self.sketch(range(0, 5000))
+        sketch.update(self.sketch(range(2500, 7500)))
+        self.assertLess(abs(sketch.count() - 7500), 7500 * 0.03)
+        with self.assertRaises(ValueError):
+            sketch.update(HyperLogLog(precision=10))
+
+    def test_bytes_round_trip(self):
+        sketch = self.sketch(range(3000))
+        restored = HyperLogLog(sketch.to_bytes())
+        self.assertEqual(restored.precision, sketch.precision)
+        self.assertEqual(restored.registers, sketch.registers)
+        self.assertEqual(restored.count(), sketch.count())
+        with self.assertRaises(ValueError):
+            HyperLogLog(b"\x00" * 1000)
+
+
+class ActiveUserCounterTests(TestCase):
+    def setUp(self):
+        for state in ("_sketch", "_hour"):
+            setattr(ActiveUserCounter, state, None)
+        ActiveUserCounter._unflushed = {}
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def add(self, user_ids):
+        with mock.patch.object(ActiveUserCounter, "FLUSH_INTERVAL", 3600):
+            for user_id in user_ids:
+                ActiveUserCounter.add(user_id)
+
+    def test_flush_stores_hour_day_and_month(self):
+        self.add(range(40))
+        ActiveUserCounter.flush()
+        for period, period_start in ActiveUserCounter.period_starts(self.hour).items():
+            with self.subTest(period=period):
+                self.assertEqual(ActiveUserCounter.count(period, period_start), 40)
+
+    def test_failed_flush_is_merged_back(self):
+        self.add(range(40))
+        with mock.patch.object(ActiveUserCounter, "persist", side_effect=DatabaseError("down")):
+            with self.assertRaises(DatabaseError):
+                ActiveUserCounter.flush()
+        self.add(range(40, 50))
+        ActiveUserCounter.flush()
+        self.assertEqual(ActiveUserCounter.count(ActiveUserPeriod.HOUR.value, self.hour), 50)
+        self.assertEqual(ActiveUserCounter._unflushed, {})
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class ActiveUserStatsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_user(username="admin", password="Admin-p4ss!", is_staff=True)
+
+    def test_reports_the_stored_counts(self):
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        ActiveUserCounter.persist(hour, HyperLogLogTests.sketch(range(12)))
+        self.client.force_authenticate(self.admin)
+        response = self.client.get("/stats/active-users/", {"date": timezone.now().date().isoformat()})
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual((body["daily_active_users"], body["monthly_active_users"]), (12, 12))
+        self.assertEqual([hour["active_users"] for hour in body["hourly"]], [12])
+
+    def test_requires_staff_and_a_valid_date(self):
+        self.assertEqual(self.client.get("/stats/active-users/").status_code, 401)
+        self.client.force_authenticate(get_user_model().objects.create_user(username="member", password="Member-p4ss!"))
+        self.assertEqual(self.client.get("/stats/active-users/").status_code, 403)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get("/stats/active-users/", {"date": "yesterday"}).status_code, 400)
+
+
+@override_settings(THROTTLE_ENABLED=False, METRICS_TOKEN="scrape-token")
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    @staticmethod
+    def requests_count(view, status):
+        return REGISTRY.get_sample_value("http_requests_total", {"view": view, "status": status}) or 0
+
+    def test_requests_are_labelled_with_view_and_status(self):
+        labels = [
+            ("/enums/", "EnumsApiView.get", "200"),
+            ("/stats/active-users/", "ActiveUserStatsApiView.get", "401"),
+            ("/no-such-page/", "unresolved", "404"),
+        ]
+        before = [self.requests_count(view, status) for _, view, status in labels]
+        for url, _, _ in labels:
+            self.client.get(url)
+        after = [self.requests_count(view, status) for _, view, status in labels]
+        self.assertEqual([count - previous for count, previous in zip(after, before)], [1, 1, 1])
+        self.assertGreater(
+            REGISTRY.get_sample_value("db_queries_per_request_count", {"view": "ActiveUserStatsApiView.get"}), 0
+        )
+
+    def test_scrape_requires_the_token_or_staff(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_requests_total", response.content)
+
+        staff = get_user_model().objects.create_user(username="staff", password="Staff-p4ss!", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+        with override_settings(METRICS_TOKEN=""):
+            self.client.logout()
+            self.assertEqual(self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+
+
+# Imports config.urls in a fresh interpreter, as a worker does before its first request.
+LOADED_MODULES_SCRIPT = """
+import json, sys
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class StartupTests(SimpleTestCase):
+    def loaded_modules(self):
+        result = subprocess.run(
+            [sys.executable, "-c", LOADED_MODULES_SCRIPT], cwd=settings.BASE_DIR, capture_output=True, text=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings"},
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return set(json.loads(result.stdout.strip().splitlines()[-1]))
+
+    def test_urlconf_does_not_load_the_docs_stack(self):
+        modules = self.loaded_modules()
+        self.assertIn("config.urls", modules)
+        self.assertNotIn("base.docs", modules)
+        self.assertNotIn("drf_spectacular.generators", modules)
+
+    @unittest.skipUnless(os.environ.get("STARTUP_BUDGET_TEST"), "set STARTUP_BUDGET_TEST=1 to time the startup")
+    def test_startup_within_budget(self):
+        call_command("startup_profile", runs=3, top=0, stdout=io.StringIO())
+
+
+class BaseEnumTests(SimpleTestCase):
+    def test_duplicate_values_are_rejected(self):
+        with self.assertRaisesMessage(ValueError, "'SECOND' --> 'FIRST'"):
+            class Duplicated(BaseEnum):
+                FIRST = "same"
+                SECOND = "same"
+        # The half built class must not linger in the registry.
+        gc.collect()
+        self.assertNotIn("Duplicated", registry())
+
+    def test_helpers_return_fresh_lists(self):
+        choices = EventStatus.choices()
+        self.assertIsInstance(choices, list)
+        self.assertIn(("pending", "PENDING"), choices)
+        choices.clear()
+        self.assertTrue(EventStatus.choices())
+        self.assertEqual(EventStatus.values(), [value for value, _ in EventStatus.choices()])
+        self.assertEqual(EventStatus.keys(), [key for _, key in EventStatus.choices()])
+        self.assertEqual(EventStatus.exclude(EventStatus.values()[1:]), EventStatus.choices()[:1])
+
+    def test_lookups_by_value(self):
+        self.assertEqual(EventStatus.get_key_name("needs_revision"), "NEEDS_REVISION")
+        self.assertEqual(EventStatus.get_key("needs_revision"), ["NEEDS_REVISION"])
+        self.assertIsNone(EventStatus.get_key_name(["unhashable"]))
+        self.assertEqual(EventStatus.get_key("missing"), [])
+        self.assertTrue(EventStatus.has_value("approved"))
+        self.assertEqual(EventStatus.jsonify()["needs_revision"], "Needs Revision")
+        self.assertEqual(EventStatus.validate(["approved", "pending"]), ["approved", "pending"])
+        for items in (["approved", "missing"], [["unhashable"]]):
+            with self.assertRaises(ValueError):
+                EventStatus.validate(items)
+
+    def test_registry_and_taxonomy(self):
+        self.assertIs(registry()["EventStatus"], EventStatus)
+        data = taxonomy()
+        self.assertEqual(list(data), ["enums", "mappings"])
+        self.assertEqual(list(data["enums"]), list(registry()))
+        self.assertIn({"value": "needs_revision", "name": "NEEDS_REVISION", "label": "Needs Revision"},
+                      data["enums"]["EventStatus"])
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class EnumsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_revalidates_through_the_etag(self):
+        response = self.client.get("/enums/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["enums"], taxonomy()["enums"])
+        self.assertIn("no-cache", response["Cache-Control"])
+        etag = response["ETag"]
+
+        response = self.client.get("/enums/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(self.client.get("/enums/", HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+        # The gzip copy has its own tag.
+        self.assertEqual(
+            self.client.get("/enums/", HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING="gzip").status_code, 200
+        )
+
+    def test_versioned_payload_is_immutable(self):
+        version = self.client.get("/enums/").json()["version"]
+        response = self.client.get(f"/enums/{version}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("immutable", response["Cache-Control"])
+        response = self.client.get("/enums/outdated/")
+        self.assertEqual((response.status_code, response["Location"]), (302, f"/enums/{version}/"))
+
+
+def throttle_settings(anon="3/minute", user="5/minute", **rest_framework):
+    return override_settings(
+        THROTTLE_ENABLED=True,
+        THROTTLE_COSTS={},
+        REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {"anon": anon, "user": user}, **rest_framework,
+        },
+    )
+
+
+class TokenBucketThrottleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def remaining(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return int(response["RateLimit-Remaining"])
+
+    @throttle_settings()
+    def test_drained_bucket_returns_429_with_headers(self):
+        self.assertEqual([self.remaining("/enums/") for _ in range(3)], [2, 1, 0])
+        response = self.client.get("/enums/")
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response["Retry-After"]) <= 20, response["Retry-After"])
+        self.assertEqual(response["RateLimit-Limit"], "3")
+        self.assertEqual(response["RateLimit-Remaining"], "0")
+        self.assertEqual(response["RateLimit-Policy"], "3;w=60")
+        self.assertTrue(0 < int(response["RateLimit-Reset"]) <= 60)
+
+    @throttle_settings(anon="30/minute")
+    def test_costs_and_surcharges(self):
+        calendar = "/events/user/calender/"
+        self.assertEqual(self.remaining("/events/public/"), 29)
+        self.assertEqual(self.remaining("/events/public/", data={"search": "fair"}), 29 - 1 - 4)
+        self.assertEqual(self.remaining(calendar, data={"year": 2026, "month": 5}), 24 - 2)
+        # Not bounded to a month.
+        self.assertEqual(self.remaining(calendar, data={"year": 2026, "month": 0}), 22 - 2 - 9)
+        with override_settings(THROTTLE_COSTS={"EventViewSet.calender_view": 5}):
+            self.assertEqual(self.remaining(calendar, data={"year": 2026, "month": 0}), 11 - 5)
+        self.assertEqual(self.remaining("/events/user/", data={"near": "23.8,90.4"}), 6 - 1 - 4)
+        # A request costing more than the bucket holds is capped to the whole bucket.
+        with override_settings(THROTTLE_COSTS={"EnumsApiView.get": 100}):
+            self.assertEqual(self.client.get("/enums/").status_code, 429)
+
+    @throttle_settings(anon="2/minute", user="2/minute")
+    def test_users_have_their_own_buckets(self):
+        first, second = (
+            get_user_model().objects.create_user(username=name, password="Bucket-p4ss!") for name in ("one", "two")
+        )
+        self.client.force_authenticate(first)
+        self.assertEqual([self.remaining("/events/public/") for _ in range(2)], [1, 0])
+        self.assertEqual(self.client.get("/events/public/").status_code, 429)
+        self.client.force_authenticate(second)
+        self.assertEqual(self.remaining("/events/public/"), 1)
+        # The anonymous bucket of the same address is untouched too.
+        self.client.force_authenticate(None)
+        self.assertEqual(self.remaining("/events/public/"), 1)
+
+    @throttle_settings(anon="2/minute", NUM_PROXIES=1)
+    def test_anonymous_clients_are_keyed_by_the_proxied_address(self):
+        def forwarded(header):
+            return self.client.get("/enums/", HTTP_X_FORWARDED_FOR=header)
+
+        self.assertEqual(forwarded("1.1.1.1, 10.0.0.1").status_code, 200)
+        # Only the address the proxy appended counts; a client cannot pick another bucket.
+        self.assertEqual(forwarded("2.2.2.2, 10.0.0.1").status_code, 200)
+        self.assertEqual(forwarded("3.3.3.3, 10.0.0.1").status_code, 429)
+        self.assertEqual(forwarded("1.1.1.1, 10.0.0.2").status_code, 200)
+
+
+@override_settings(COMPRESSION_ENABLED=True, COMPRESSION_MIN_SIZE=1024, COMPRESSION_GZIP_MAX_RANDOM_BYTES=100)
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = b'{"title": "Open house"}' * 100
+
+    def respond(self, response, accept_encoding="gzip", **extra):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding, **extra)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json(self, body=None, **headers):
+        response = HttpResponse(body or self.body, content_type="application/json")
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def test_negotiates_q_values(self):
+        available = ("br", "gzip")
+        self.assertEqual(negotiate("gzip, br", available), "br")
+        self.assertEqual(negotiate("br;q=0.5, gzip", available), "gzip")
+        self.assertEqual(negotiate("br;q=0, gzip;q=0", available), None)
+        self.assertEqual(negotiate("*;q=0.1, br;q=0", available), "gzip")
+        self.assertEqual(negotiate("GZIP;q=bad, identity", available), None)
+        self.assertEqual(negotiate("", available), None)
+
+    def test_compresses_bodies_over_the_minimum_size(self):
+        response = self.respond(self.json())
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+        small = self.respond(self.json(b'{"title": "Open house"}'))
+        self.assertFalse(small.has_header("Content-Encoding"))
+        identity = self.respond(self.json(), accept_encoding="identity")
+        self.assertFalse(identity.has_header("Content-Encoding"))
+        self.assertEqual(identity["Vary"], "Accept-Encoding")
+        image = self.respond(HttpResponse(self.body, content_type="image/png"))
+        self.assertFalse(image.has_header("Content-Encoding"))
+
+    def test_streams_chunk_by_chunk(self):
+        chunks = [self.body[:10], b"", self.body[10:]]
+        response = self.respond(StreamingHttpResponse(iter(chunks), content_type="text/csv"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(response.has_header("Content-Length"))
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), self.body)
+
+    def test_weakens_strong_etags(self):
+        self.assertEqual(self.respond(self.json(ETag='"v1"'))["ETag"], 'W/"v1"')
+        self.assertEqual(self.respond(self.json(ETag='W/"v1"'))["ETag"], 'W/"v1"')
+        self.assertEqual(self.respond(self.json(ETag='"v1"'), accept_encoding="")["ETag"], '"v1"')
+
+    def test_gzip_is_padded_to_a_random_length(self):
+        lengths = {len(self.respond(self.json()).content) for _ in range(20)}
+        self.assertGreater(len(lengths), 1)
+        with override_settings(COMPRESSION_GZIP_MAX_RANDOM_BYTES=0):
+            lengths = {len(self.respond(self.json()).content) for _ in range(5)}
+        self.assertEqual(len(lengths), 1)
+
+    @mock.patch("base.middleware.compression.ENCODINGS", ("br", "gzip"))
+    def test_credentialed_responses_are_never_brotli(self):
+        html = HttpResponse(b"<p>csrf</p>" * 200, content_type="text/html")
+        self.assertEqual(self.respond(html, accept_encoding="br, gzip;q=0.5")["Content-Encoding"], "gzip")
+        response = self.respond(self.json(), accept_encoding="br, gzip;q=0.5", HTTP_COOKIE="sessionid=1")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertFalse(self.respond(self.json(), accept_encoding="br", HTTP_COOKIE="sessionid=1").has_header(
+            "Content-Encoding"
+        ))
+
+
+class JwtRevocationTests(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.user = get_user_model().objects.create_user(username="holder", password="Holder-p4ss!")
+        self.refresh = VersionedRefreshToken.for_user(self.user)
+
+    @staticmethod
+    def authenticate(token):
+        request = RequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        return CustomJWTAuthentication().authenticate(request)[0]
+
+    @staticmethod
+    def refreshed(refresh):
+        serializer = TokenRefreshSerializer(data={"refresh": str(refresh)})
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def assert_revoked(self, refresh):
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(refresh.access_token)
+        with self.assertRaises(AuthenticationFailed):
+            self.refreshed(refresh)
+
+    def test_cache_hits_return_a_copy(self):
+        first = self.authenticate(self.refresh.access_token)
+        with self.assertNumQueries(0):
+            second = self.authenticate(self.refresh.access_token)
+        cached, _ = user_cache.get(self.user.pk)
+        self.assertEqual(first.pk, self.user.pk)
+        self.assertIsNot(first, cached)
+        self.assertIsNot(second, cached)
+        second.first_name = "Changed by a view"
+        self.assertEqual(user_cache.get(self.user.pk)[0].first_name, "")
+
+    def test_password_change_revokes_earlier_tokens(self):
+        self.authenticate(self.refresh.access_token)
+        self.user.set_password("Changed-p4ss!")
+        self.user.save()
+        self.assert_revoked(self.refresh)
+        fresh = VersionedRefreshToken.for_user(self.user)
+        self.assertEqual(self.authenticate(self.refreshed(fresh)["access"]).pk, self.user.pk)
+
+    def test_deactivation_revokes_earlier_tokens(self):
+        self.authenticate(self.refresh.access_token)
+        self.user.is_active = False
+        self.user.save()
+        self.assert_revoked(self.refresh)
+
+    def test_unrelated_changes_keep_tokens(self):
+        self.user.first_name = "Renamed"
+        self.user.save()
+        self.assertEqual(self.authenticate(self.refresh.access_token).pk, self.user.pk)
+        self.assertIn("access", self.refreshed(self.refresh))
+
+
+@override_settings(BLACKLIST_FILTER_REFRESH_SECONDS=0, BLACKLIST_FILTER_REBUILD_SECONDS=3600)
+class TokenBlacklistTests(TestCase):
+    def setUp(self):
+        blacklist_filter.clear()
+        self.addCleanup(blacklist_filter.clear)
+        self.user = get_user_model().objects.create_user(username="holder", password="Holder-p4ss!")
+
+    def outstanding(self, jti, expires_in=timedelta(days=1), blacklisted=False, **fields):
+        token = OutstandingToken.objects.create(
+            user=self.user, jti=jti, token=jti, expires_at=timezone.now() + expires_in, **fields
+        )
+        if blacklisted:
+            BlacklistedToken.objects.create(token=token, **({"id": blacklisted} if blacklisted is not True else {}))
+        return token
+
+    def test_token_blacklisted_by_another_worker_is_rejected(self):
+        refresh = VersionedRefreshToken.for_user(self.user)
+        refresh.check_blacklist()
+        # Another worker blacklists it, without this worker's filter.add().
+        BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh["jti"]))
+        with self.assertRaises(TokenError):
+            VersionedRefreshToken(str(refresh))
+
+    def test_rows_committed_late_below_read_ids_are_still_read(self):
+        bloom = BlacklistFilter()
+        self.outstanding("recent", blacklisted=1000)
+        self.assertIn("recent", bloom)
+        # A transaction that drew a lower id commits within the settle window.
+        self.outstanding("late", blacklisted=500)
+        self.assertIn("late", bloom)
+
+        BlacklistedToken.objects.update(blacklisted_at=timezone.now() - timedelta(minutes=5))
+        bloom.refresh()
+        self.assertEqual(bloom._after, 1000)
+
+    def test_prune_deletes_only_expired_tokens(self):
+        for jti, expires_in, blacklisted in [
+            ("expired", timedelta(minutes=-5), False),
+            ("expired-blacklisted", timedelta(minutes=-1), True),
+            ("live", timedelta(days=1), False),
+            ("live-blacklisted", timedelta(days=1), True),
+        ]:
+            self.outstanding(jti, expires_in, blacklisted)
+        self.assertEqual(prune_batch(1), 1)
+        self.assertEqual(prune_batch(10), 1)
+        self.assertEqual(prune_batch(10), 0)
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        self.assertEqual(set(OutstandingToken.objects.values_list("jti", flat=True)), {"live", "live-blacklisted"})
+        self.assertEqual(list(BlacklistedToken.objects.values_list("token__jti", flat=True)), ["live-blacklisted"])
+
+    def test_prune_tokens_command(self):
+        for number in range(3):
+            self.outstanding(f"expired-{number}", timedelta(minutes=-1), blacklisted=number == 0)
+        self.outstanding("live")
+        output = io.StringIO()
+        call_command("prune_tokens", dry_run=True, stdout=output)
+        self.assertIn("3 tokens have expired", output.getvalue())
+        call_command("prune_tokens", batch_size=2, stdout=output)
+        self.assertIn("Deleted 3 expired tokens in 2 batches", output.getvalue())
+        self.assertEqual(list(OutstandingToken.objects.values_list("jti", flat=True)), ["live"])
+
+
+class RendererTests(SimpleTestCase):
+    data = {
+        "price": Decimal("12.50"),
+        "created_at": datetime(2026, 5, 1, 9, 30, 15, 250, tzinfo=dt_timezone.utc),
+        "local": datetime(2026, 5, 1, 9, 30, tzinfo=dt_timezone(timedelta(hours=6))),
+        "naive": datetime(2026, 5, 1, 9, 30),
+        "date": date(2026, 5, 1),
+        "time": dt_time(9, 30),
+        "duration": timedelta(hours=1, seconds=3),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "label": gettext_lazy("Open house"),
+        "separators": "line\u2028paragraph\u2029",
+        "nested": [{1: "int key", "items": (1, 2.5, None, True)}],
+    }
+
+    def render(self, renderer_class, data=None, media_type="application/json"):
+        return renderer_class().render(self.data if data is None else data, media_type, {})
+
+    def assert_same_as_drf(self, data=None):
+        drf = self.render(JSONRenderer, data)
+        ours = self.render(ORJSONRenderer, data)
+        self.assertEqual(JSONParser().parse(io.BytesIO(ours)), JSONParser().parse(io.BytesIO(drf)))
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(ours)), JSONParser().parse(io.BytesIO(drf)))
+        return ours
+
+    def test_renders_what_drf_renders(self):
+        content = self.assert_same_as_drf()
+        self.assertIn(b"\\u2028", content)
+        self.assertNotIn("\u2028".encode(), content)
+        self.assertEqual(self.render(ORJSONRenderer, [], "application/json"), b"[]")
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_raw_decimals_are_numbers_whatever_the_coercion(self):
+        # COERCE_DECIMAL_TO_STRING applies in serializers, not in the encoder.
+        for coerce in (True, False):
+            with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "COERCE_DECIMAL_TO_STRING": coerce}):
+                self.assertEqual(self.assert_same_as_drf({"price": Decimal("12.50")}), b'{"price":12.5}')
+
+    def test_indented_output_falls_back_to_drf(self):
+        media_type = "application/json; indent=4"
+        self.assertEqual(self.render(ORJSONRenderer, media_type=media_type), self.render(JSONRenderer, media_type=media_type))
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack_round_trip(self):
+        content = self.render(MessagePackRenderer, media_type=MessagePackRenderer.media_type)
+        parsed = MessagePackParser().parse(io.BytesIO(content))
+        self.assertEqual(parsed, ORJSONParser().parse(io.BytesIO(self.render(ORJSONRenderer))))
+
+    @unittest.skipIf(msgpack is not None, "msgpack is installed")
+    def test_msgpack_is_not_offered_without_the_package(self):
+        self.assertFalse(settings.MSGPACK_ENABLED)
+        self.assertNotIn("base.renderers.MessagePackRenderer", settings.REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"])
+        self.assertNotIn("base.parsers.MessagePackParser", settings.REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"])
@@ -0,0 +1,150 @@
+"""
+Token bucket throttling shared by every worker through the `throttle_bucket`
+table. Each client (the user, or the IP of anonymous requests) has one bucket
+holding up to the count of its rate in tokens, refilled continuously at that rate,
+and each request spends the cost of its view and action.
+"""
+import math
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from base.middleware.query_budget import UNCOUNTED
+
+# Refills the bucket for the time since its last update and spends `cost` when
+# enough tokens are left, in one atomic statement. No row comes back when the
+# request is denied, and the bucket is left as it was.
+SPEND_SQL = UNCOUNTED + """
+INSERT INTO throttle_bucket AS bucket (key, tokens, updated_at)
+VALUES (%(key)s, %(capacity)s - %(cost)s, clock_timestamp())
+ON CONFLICT (key) DO UPDATE
+    SET tokens = LEAST(%(capacity)s, bucket.tokens + EXTRACT(EPOCH FROM clock_timestamp() - bucket.updated_at) * %(rate)s) - %(cost)s,
+        updated_at = clock_timestamp()
+    WHERE LEAST(%(capacity)s, bucket.tokens + EXTRACT(EPOCH FROM clock_timestamp() - bucket.updated_at) * %(rate)s) >= %(cost)s
+RETURNING tokens
+"""
+
+AVAILABLE_SQL = UNCOUNTED + """
+SELECT LEAST(%(capacity)s, tokens + EXTRACT(EPOCH FROM clock_timestamp() - updated_at) * %(rate)s)
+FROM throttle_bucket WHERE key = %(key)s
+"""
+
+PRUNE_SQL = UNCOUNTED + """
+DELETE FROM throttle_bucket WHERE updated_at < clock_timestamp() - make_interval(secs => %(seconds)s)
+"""
+
+
+class RateLimit(NamedTuple):
+    limit: int
+    remaining: int
+    reset: int  # seconds until the bucket is full again
+    window: int  # seconds a full bucket takes to refill
+
+    def headers(self) -> dict:
+        return {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset),
+            "RateLimit-Policy": f"{self.limit};w={self.window}",
+        }
+
+
+def parse_rate(rate: str):
+    """
+    `(tokens, seconds)` of a DRF style rate such as "120/minute".
+    """
+    count, period = rate.split("/")
+    return int(count), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    DRF throttle spending `get_cost()` tokens per request from the client's bucket.
+
+    Views price their actions with `throttle_costs = {"<action>": <tokens>}` (1 by
+    default) and may add to it in `get_throttle_cost(request, cost)`. Searches cost
+    THROTTLE_SEARCH_COST more, and THROTTLE_COSTS overrides the cost of an action as
+    "<View>.<action>". The outcome is left on the request as `rate_limit`, which
+    RateLimitHeadersMiddleware turns into RateLimit-* headers.
+    """
+    _pruned_at = 0.0
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, request) -> str:
+        user = getattr(request, "user", None)
+        return "user" if user is not None and user.is_authenticated else "anon"
+
+    def get_key(self, request, scope: str) -> str:
+        if scope == "user":
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def get_cost(self, request, view) -> int:
+        action = getattr(view, "action", None) or request.method.lower()
+        cost = settings.THROTTLE_COSTS.get(f"{type(view).__name__}.{action}")
+        if cost is None:
+            cost = (getattr(view, "throttle_costs", None) or {}).get(action, 1)
+            if request.query_params.get(api_settings.SEARCH_PARAM):
+                cost += settings.THROTTLE_SEARCH_COST
+            if hasattr(view, "get_throttle_cost"):
+                cost = view.get_throttle_cost(request, cost)
+        return cost
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE_ENABLED:
+            return True
+        scope = self.get_scope(request)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        params = {
+            "key": self.get_key(request, scope),
+            "capacity": capacity,
+            "rate": capacity / period,
+            # A request costing more than the bucket holds could never pass.
+            "cost": min(self.get_cost(request, view), capacity),
+        }
+        with connection.cursor() as cursor:
+            cursor.execute(SPEND_SQL, params)
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(AVAILABLE_SQL, params)
+                available = cursor.fetchone()[0]
+                tokens = float(available) if available is not None else 0.0
+                self.wait_seconds = math.ceil((params["cost"] - tokens) / params["rate"])
+            else:
+                tokens = row[0]
+        self.prune(period)
+
+        getattr(request, "_request", request).rate_limit = RateLimit(
+            limit=capacity,
+            remaining=max(0, math.floor(tokens)),
+            reset=math.ceil((capacity - tokens) / params["rate"]),
+            window=period,
+        )
+        return row is not None
+
+    def wait(self):
+        return self.wait_seconds
+
+    @classmethod
+    def prune(cls, period: int):
+        """
+        Every THROTTLE_PRUNE_SECONDS per worker, drop the buckets untouched for
+        longer than a full refill. They are full by then, which is what a missing
+        bucket means anyway.
+        """
+        now = time.monotonic()
+        if now - cls._pruned_at < settings.THROTTLE_PRUNE_SECONDS:
+            return
+        cls._pruned_at = now
+        longest = max(parse_rate(rate)[1] for rate in api_settings.DEFAULT_THROTTLE_RATES.values() if rate)
+        with connection.cursor() as cursor:
+            cursor.execute(PRUNE_SQL, {"seconds": max(longest, period)})
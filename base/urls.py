@@ -0,0 +1,9 @@
+from django.urls import path
+from base import views
+
+
+urlpatterns = [
+    path("stats/active-users/", views.ActiveUserStatsApiView.as_view()),
+    path("enums/", views.EnumsApiView.as_view(), name="enums"),
+    path("enums/<str:version>/", views.EnumsApiView.as_view(), name="enums-version"),
+]
@@ -1,19 +1,40 @@
+import hmac
 import json
 import hashlib
-from typing import Dict, Any
+from functools import lru_cache
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Dict, Any, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import HttpResponse, HttpResponseForbidden
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+from django.views import View
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework.filters import SearchFilter
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
 from rest_framework.validators import ValidationError
 
 
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from rest_framework.request import Request
 
-from base.helpers import calculate_seconds_until_end_of_day
+from base.enum import ActiveUserPeriod, taxonomy
+from base.helpers import Payload, calculate_seconds_until_end_of_day, payload, prebuilt_response
+from base.metrics import render_metrics
+from base.renderers import ORJSONRenderer
+from base.middleware.online_user import ActiveUserCounter, OnlineUserTracker
+from utils.custom_exception_handler import custom_exception_handler
 
 
 class CustomViewSet(ModelViewSet):
@@ -70,14 +91,15 @@ class CustomViewSet(ModelViewSet):
             else:
                 raise ValidationError(filterset.errors)
 
-        return queryset.order_by("-created_at")
+        # Keep an ordering set by the filters, e.g. nearest first.
+        return queryset if queryset.query.order_by else queryset.order_by("-created_at")
 
     def get_base_queryset(self):
         obj_type = self.request.query_params.get("is_active", "true").lower()
         model = self.model_class
 
         if self.action == "retrieve":
-            return model.objects
+            return self.apply_retention(model.objects.all())
 
         if obj_type == "true":
             queryset = model.active_objects
@@ -87,7 +109,16 @@ class CustomViewSet(ModelViewSet):
             queryset = model.objects
 
         # Apply optimizations
-        return self.apply_relational_optimizations(queryset)
+        return self.apply_retention(self.apply_relational_optimizations(queryset))
+
+    def apply_retention(self, queryset):
+        """
+        Annotate `deletion_time`, the date the retention purge removes each row, on
+        models that define a `deletion_time_expression`.
+        """
+        if self.periodic_delete_enabled and hasattr(self.model_class, "deletion_time_expression"):
+            return queryset.annotate(deletion_time=self.model_class.deletion_time_expression())
+        return queryset
 
     def apply_relational_optimizations(self, queryset):
         # info = CacheManager.get_cache("model_info", {}).get(self.model_class.__name__.lower(), {})
@@ -170,3 +201,146 @@ class CustomViewSet(ModelViewSet):
             else:
                 return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+
+class AsyncReadView(View):
+    """
+    Base for native async, read only endpoints served under ASGI. Handlers return
+    plain data or a DRF `Response`, which is rendered with the API's JSON renderer, and
+    exceptions go through the same exception handler as the DRF views so both paths
+    answer alike.
+
+    DRF views run synchronously, so subclasses only reuse their querysets, filters
+    and serializers; every database call must go through the async ORM. Requests
+    are throttled like the DRF views, by the default throttle classes.
+    """
+    http_method_names = ["get", "head", "options"]
+    renderer = ORJSONRenderer()
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    async def dispatch(self, request, *args, **kwargs):
+        request = self.request = Request(request)
+        headers = {}
+        try:
+            await self.check_throttles(request)
+            data = await super().dispatch(request, *args, **kwargs)
+            response_status = status.HTTP_200_OK
+            if isinstance(data, Response):
+                data, response_status = data.data, data.status_code
+            elif isinstance(data, HttpResponse):
+                return data
+        except Exception as exc:
+            response = custom_exception_handler(exc, {"view": self, "request": request})
+            data, response_status = response.data, response.status_code
+            # e.g. the Retry-After of throttled requests
+            headers = {header: value for header, value in response.items() if header != "Content-Type"}
+        return HttpResponse(
+            self.renderer.render(data), status=response_status, content_type=self.renderer.media_type, headers=headers
+        )
+
+    async def check_throttles(self, request):
+        for throttle_class in self.throttle_classes:
+            throttle = throttle_class()
+            if not await sync_to_async(throttle.allow_request)(request, self):
+                raise Throttled(throttle.wait())
+
+
+@extend_schema(
+    tags=["Stats"],
+    parameters=[
+        OpenApiParameter(
+            name="date",
+            type=str,
+            required=False,
+            description="Day to report on as YYYY-MM-DD (UTC). Defaults to today.",
+        )
+    ]
+)
+class ActiveUserStatsApiView(APIView):
+    """
+    Approximate unique active users for a day, its hours and its month.
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        date = request.query_params.get("date")
+        try:
+            day = datetime.strptime(date, "%Y-%m-%d").date() if date else timezone.now().date()
+        except ValueError:
+            raise ValidationError({"date": "Date must be in YYYY-MM-DD format."})
+
+        day_start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+        month_start = day_start.replace(day=1)
+        return Response({
+            "date": day.isoformat(),
+            "online_users": OnlineUserTracker.get_online_user_count(),
+            "daily_active_users": ActiveUserCounter.count(ActiveUserPeriod.DAY.value, day_start),
+            "monthly_active_users": ActiveUserCounter.count(ActiveUserPeriod.MONTH.value, month_start),
+            "hourly": [
+                {"hour": hour.isoformat(), "active_users": count}
+                for hour, count in ActiveUserCounter.hourly_counts(day_start)
+            ],
+        }, status=status.HTTP_200_OK)
+
+
+@lru_cache(maxsize=None)
+def enums_payload() -> Tuple[Payload, str]:
+    """
+    The /enums body, built once per process. Its version is a hash of the content,
+    so it only changes when an enum or mapping does.
+    """
+    data = taxonomy()
+    version = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()[:12]
+    return payload(json.dumps({"version": version, **data}, separators=(",", ":")).encode()), version
+
+
+@extend_schema(tags=["Enums"], responses={200: OpenApiTypes.OBJECT})
+class EnumsApiView(APIView):
+    """
+    Every enum the API accepts, with labels, and the category, role and duration
+    mappings. `enums/` is revalidated through its ETag; `enums/<version>/` never
+    changes and may be cached indefinitely, and an outdated version redirects to the
+    current one.
+    """
+    permission_classes = (AllowAny,)
+    authentication_classes = ()
+
+    def get(self, request, version=None, *args, **kwargs):
+        built, current = enums_payload()
+        if version is None:
+            return prebuilt_response(request, built, "application/json")
+        if version != current:
+            return redirect("enums-version", version=current)
+        return prebuilt_response(
+            request, built, "application/json", cache_control={"public": True, "max_age": 31536000, "immutable": True}
+        )
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>` or a
+    staff session.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if not (token and hmac.compare_digest(authorization, f"Bearer {token}")) and not request.user.is_staff:
+        return HttpResponseForbidden()
+    content, content_type = render_metrics()
+    return HttpResponse(content, content_type=content_type)
+
+
+def lazy_view(view_path: str, **initkwargs):
+    """
+    URLconf view that imports `view_path` on its first request, so heavy modules
+    only used by a few endpoints (the schema and docs stack) stay out of worker
+    startup.
+    """
+    view = None
+
+    @csrf_exempt
+    def dispatch(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return dispatch
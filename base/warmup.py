@@ -0,0 +1,45 @@
+import logging
+
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+
+def iter_view_classes(patterns):
+    for pattern in patterns:
+        if hasattr(pattern, "url_patterns"):
+            yield from iter_view_classes(pattern.url_patterns)
+            continue
+        view_class = getattr(pattern.callback, "cls", None) or getattr(pattern.callback, "view_class", None)
+        if view_class is not None:
+            yield view_class
+
+
+def warm_up_django():
+    """
+    Populate the URL resolver and build every view's serializer once, so model meta
+    caches and lazily imported modules are ready before the first request. Runs in
+    the gunicorn master when the app is preloaded, and is shared copy-on-write.
+    """
+    resolver = get_resolver()
+    resolver.reverse_dict  # noqa: B018 - populates the resolver
+    for view_class in set(iter_view_classes(resolver.url_patterns)):
+        serializer_class = getattr(view_class, "serializer_class", None)
+        if serializer_class is None:
+            continue
+        try:
+            serializer_class().fields  # noqa: B018 - builds the serializer fields
+        except Exception as e:
+            logger.warning("Unable to warm up %s: %s", serializer_class.__name__, e)
+
+
+def warm_up_database():
+    """
+    Open this worker's database connections ahead of its first request.
+    """
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except Exception as e:
+            logger.warning("Unable to connect to database '%s' during warm up: %s", connection.alias, e)
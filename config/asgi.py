@@ -5,6 +5,16 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Launch profile, one event loop per worker process:
+
+    DB_POOL=true gunicorn config.asgi:application -k uvicorn_worker.UvicornWorker \
+        --workers 4 --bind 0.0.0.0:${WEB_PORT}
+
+or, for a single process, `uvicorn config.asgi:application --host 0.0.0.0 --port ${WEB_PORT}`.
+Enable DB_POOL: persistent connections (CONN_MAX_AGE) are not reused across async
+requests. The native async read endpoints are served under /events/async/public/;
+compare them with the WSGI setup using `manage.py benchmark_concurrency`.
 """
 
 import os
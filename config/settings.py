@@ -6,10 +6,12 @@ For more information, see:
 https://docs.djangoproject.com/en/5.1/topics/settings/
 """
 
+import copy
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
-from decouple import config
+from decouple import Csv, config
 
 # ======== Base Directories ========
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,8 +52,12 @@ THIRD_PARTY_APPS = [
     "rest_framework_simplejwt.token_blacklist",
 ]
 
+# The admin site is off unless ADMIN_ENABLED; SimpleAdminConfig skips importing every
+# app's admin module (base/admin.py registers all models) at startup.
+ADMIN_ENABLED = config("ADMIN_ENABLED", cast=bool, default=False)
+
 DJANGO_APPS = [
-    "django.contrib.admin",
+    "django.contrib.admin.apps.SimpleAdminConfig",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
@@ -66,16 +72,21 @@ CORS_ORIGIN_ALLOW_ALL = True
 
 # ======== Middleware ========
 MIDDLEWARE = [
+    "base.middleware.metrics.MetricsMiddleware",
+    "base.middleware.rate_limit.RateLimitHeadersMiddleware",
+    "base.middleware.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "base.middleware.static.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "base.middleware.db_routing.PrimaryPinningMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "base.middleware.online_user.OnlineUserMiddleware",
+    "base.middleware.query_budget.QueryBudgetMiddleware",
 ]
 
 # ======== URL and WSGI Config ========
@@ -99,7 +110,22 @@ TEMPLATES = [
     },
 ]
 
+# ======== Cache ========
+# Process-local by default. Point it at a cache shared by every worker, e.g.
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache and
+# CACHE_LOCATION=redis://cache:6379/0, for state that has to be seen across them.
+CACHES = {
+    "default": {
+        "BACKEND": config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": config("CACHE_LOCATION", default=""),
+    }
+}
+
 # ======== Database ========
+# Sync workers keep their connection for DB_CONN_MAX_AGE seconds and check it before
+# reuse. ASGI and threaded deployments should enable DB_POOL instead, which shares a
+# psycopg pool per process; Django requires CONN_MAX_AGE to be 0 when pooling.
+DB_POOL = config("DB_POOL", cast=bool, default=False)
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -108,12 +134,45 @@ DATABASES = {
         "PASSWORD": config("DB_PASSWORD", default=""),
         "HOST": config("DB_HOST", default="localhost"),
         "PORT": config("DB_PORT", cast=int, default=5432),
+        "CONN_MAX_AGE": 0 if DB_POOL else config("DB_CONN_MAX_AGE", cast=int, default=60),
+        "CONN_HEALTH_CHECKS": config("DB_CONN_HEALTH_CHECKS", cast=bool, default=True),
         "OPTIONS": {
             "sslmode": "verify-full" if config("SSL", cast=bool, default=False) else None,
             "sslrootcert": "/ssl/ca-certificate.crt" if config("SSL", cast=bool, default=False) else None,
         },
     }
 }
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": config("DB_POOL_MIN_SIZE", cast=int, default=2),
+        "max_size": config("DB_POOL_MAX_SIZE", cast=int, default=10),
+        "max_idle": config("DB_POOL_MAX_IDLE", cast=float, default=300),
+        "timeout": config("DB_POOL_TIMEOUT", cast=float, default=10),
+    }
+
+# Optional read replicas as "host[:port]" entries, e.g. "replica-1,replica-2:5433",
+# sharing the primary's credentials (DB_REPLICA_NAME overrides the database name).
+# Safe reads go to a replica unless the request is pinned to the primary after a
+# write, or every replica lags more than DB_REPLICA_MAX_LAG_SECONDS behind.
+DB_REPLICA_HOSTS = config("DB_REPLICA_HOSTS", cast=Csv(), default="")
+for index, replica in enumerate(DB_REPLICA_HOSTS):
+    host, _, port = replica.partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **copy.deepcopy(DATABASES["default"]),
+        "NAME": config("DB_REPLICA_NAME", default=DATABASES["default"]["NAME"]),
+        "HOST": host,
+        "PORT": int(port) if port else DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["base.db_router.ReplicaRouter"] if DB_REPLICA_HOSTS else []
+DB_REPLICA_MAX_LAG_SECONDS = config("DB_REPLICA_MAX_LAG_SECONDS", cast=float, default=5)
+DB_REPLICA_LAG_CHECK_SECONDS = config("DB_REPLICA_LAG_CHECK_SECONDS", cast=float, default=5)
+# How long a client stays on the primary after a successful write.
+DB_PRIMARY_PIN_SECONDS = config("DB_PRIMARY_PIN_SECONDS", cast=int, default=10)
+# Cache alias holding the per-user pins, which carry a write over to the user's other
+# devices and to clients without cookies. Every worker must see it, so replicas are
+# refused with a process-local cache.
+DB_PRIMARY_PIN_CACHE = config("DB_PRIMARY_PIN_CACHE", default="default")
 
 # ======== Authentication ========
 # AUTH_USER_MODEL = "users.User"
@@ -124,6 +183,11 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
     {"NAME": "base.validators.StrongPasswordValidator"},
 ]
+# JWTs are verified without the database; their users are cached per worker for
+# JWT_USER_CACHE_TTL_SECONDS, which bounds how long a token revoked on another
+# worker (password change, deactivation) may still be accepted.
+JWT_USER_CACHE_SIZE = config("JWT_USER_CACHE_SIZE", cast=int, default=10000)
+JWT_USER_CACHE_TTL_SECONDS = config("JWT_USER_CACHE_TTL_SECONDS", cast=float, default=30)
 
 # ======== Static and Media Files ========
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfolders")
@@ -136,18 +200,37 @@ if DEBUG:
 else:
     from config.storage_config import *  # Use external storage config for production
 
+# Uploads always stream to temporary files on disk (under FILE_UPLOAD_TEMP_DIR when
+# set) rather than being held in memory while the request is handled.
+FILE_UPLOAD_HANDLERS = ["django.core.files.uploadhandler.TemporaryFileUploadHandler"]
+FILE_UPLOAD_TEMP_DIR = config("FILE_UPLOAD_TEMP_DIR", default=None)
+
 
 # ======== REST Framework ========
+# MessagePack is offered to clients that ask for it, e.g. the mobile app, when the
+# optional msgpack package is installed.
+MSGPACK_ENABLED = config("MSGPACK_ENABLED", cast=bool, default=True) and find_spec("msgpack") is not None
+
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        # "rest_framework_simplejwt.authentication.JWTAuthentication",
-        # "base.authentication.CustomJWTAuthentication",
+        "base.authentication.CustomJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    "DEFAULT_RENDERER_CLASSES": (
+        "base.renderers.ORJSONRenderer",
+        *(("base.renderers.MessagePackRenderer",) if MSGPACK_ENABLED else ()),
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "base.parsers.ORJSONParser",
+        *(("base.parsers.MessagePackParser",) if MSGPACK_ENABLED else ()),
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_PAGINATION_CLASS": "base.pagination.CustomPagination",
     "PAGE_SIZE": 10,
     "EXCEPTION_HANDLER": "utils.custom_exception_handler.custom_exception_handler",
@@ -157,14 +240,17 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ),
     "COERCE_DECIMAL_TO_STRING": False,
-    # "DEFAULT_THROTTLE_CLASSES": [
-    #         "rest_framework.throttling.AnonRateThrottle",
-    #         "rest_framework.throttling.UserRateThrottle",
-    #     ],
-    # "DEFAULT_THROTTLE_RATES": {
-    #     "anon": "5/minute",
-    #     "user": "10/minute",
-    # }
+    "DEFAULT_THROTTLE_CLASSES": [
+        "base.throttling.TokenBucketThrottle",
+    ],
+    # Bucket size and refill rate per client, see Throttling below.
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": config("THROTTLE_ANON_RATE", default="120/minute"),
+        "user": config("THROTTLE_USER_RATE", default="600/minute"),
+    },
+    # Proxies in front of the app, so per IP buckets use the client's address from
+    # X-Forwarded-For rather than a value the client can set.
+    "NUM_PROXIES": config("NUM_PROXIES", default="", cast=lambda v: int(v) if v else None),
 }
 
 SIMPLE_JWT = {
@@ -189,6 +275,10 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Issue versioned tokens and check the blacklist through its bloom filter.
+    'TOKEN_OBTAIN_SERIALIZER': 'base.authentication.TokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'base.authentication.TokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'base.authentication.TokenBlacklistSerializer',
 
     # Secure cookies for better token storage
     # "AUTH_COOKIE_NAME": "access_token",
@@ -213,7 +303,8 @@ SPECTACULAR_SETTINGS = {
     # available SwaggerUI configuration parameters
     # https://swagger.io/docs/open-source-tools/swagger-ui/usage/configuration/
     "PARSER_WHITELIST": [
-        "rest_framework.parsers.JSONParser",
+        "base.parsers.ORJSONParser",
+        "base.parsers.MessagePackParser",
         "rest_framework.parsers.FormParser",
         "rest_framework.parsers.MultiPartParser",
         "rest_framework.parsers.FileUploadParser",
@@ -259,10 +350,128 @@ SPECTACULAR_SETTINGS = {
 
 }
 
+# ======== Prebuilt Schema ========
+# `manage.py build_schema` renders the schema into SCHEMA_BUILD_DIR/<code version>/
+# for each of SCHEMA_LANGUAGES, and the docs views serve it from memory. The code
+# version is CODE_VERSION when set (e.g. the release's git sha), otherwise a hash
+# of the sources. Without a build only DEBUG generates the schema per request.
+CODE_VERSION = config("CODE_VERSION", default="")
+SCHEMA_BUILD_DIR = config("SCHEMA_BUILD_DIR", default=os.path.join(BASE_DIR, "schema"))
+SCHEMA_LANGUAGES = config("SCHEMA_LANGUAGES", cast=Csv(), default="en-us")
+
+# ======== Query Budgets ========
+# Views declare `query_budget = {"<action>": <max queries>}`; requests going over it,
+# or repeating a read QUERY_N_PLUS_ONE_THRESHOLD times, are logged (or raised).
+QUERY_BUDGET_ENABLED = config("QUERY_BUDGET_ENABLED", cast=bool, default=DEBUG)
+QUERY_BUDGET_RAISE = config("QUERY_BUDGET_RAISE", cast=bool, default=False)
+QUERY_N_PLUS_ONE_THRESHOLD = config("QUERY_N_PLUS_ONE_THRESHOLD", cast=int, default=3)
+
+# ======== Moderation ========
+# Moderators claim queued events in batches; a claim lapses after the lease, so an
+# abandoned batch returns to the queue.
+MODERATION_BATCH_SIZE = config("MODERATION_BATCH_SIZE", cast=int, default=20)
+MODERATION_LEASE_SECONDS = config("MODERATION_LEASE_SECONDS", cast=int, default=900)
+
+# ======== Recurring events ========
+# Occurrences of recurring events are materialized from today up to this many days
+# ahead; `refresh_event_occurrences` rolls the window forward daily.
+EVENT_OCCURRENCE_HORIZON_DAYS = config("EVENT_OCCURRENCE_HORIZON_DAYS", cast=int, default=180)
+
+# ======== Geo search ========
+EVENT_NEAR_DEFAULT_RADIUS_KM = config("EVENT_NEAR_DEFAULT_RADIUS_KM", cast=float, default=25)
+EVENT_NEAR_MAX_RADIUS_KM = config("EVENT_NEAR_MAX_RADIUS_KM", cast=float, default=500)
+
+# ======== Retention ========
+# `purge_events` removes events this many days after they ended, either into the
+# event_archive table ("archive") or for good together with their media ("delete").
+EVENT_RETENTION_DAYS = config("EVENT_RETENTION_DAYS", cast=int, default=365)
+EVENT_RETENTION_MODE = config("EVENT_RETENTION_MODE", default="archive")
+EVENT_PURGE_BATCH_SIZE = config("EVENT_PURGE_BATCH_SIZE", cast=int, default=500)
+
+# ======== Change Feed ========
+# `/events/public/changes/` returns at most CHANGES_PAGE_SIZE changes per call and
+# holds back changes younger than CHANGES_SETTLE_SECONDS, which must outlast the
+# longest event write transaction. Deletions are kept as tombstones for
+# CHANGES_TOMBSTONE_RETENTION_DAYS; older cursors must resync. Schedule
+# `prune_tombstones` daily (`purge_events` runs it too), which deletes the expired
+# ones CHANGES_TOMBSTONE_PRUNE_BATCH_SIZE at a time.
+CHANGES_PAGE_SIZE = config("CHANGES_PAGE_SIZE", cast=int, default=500)
+CHANGES_SETTLE_SECONDS = config("CHANGES_SETTLE_SECONDS", cast=int, default=30)
+CHANGES_TOMBSTONE_RETENTION_DAYS = config("CHANGES_TOMBSTONE_RETENTION_DAYS", cast=int, default=30)
+CHANGES_TOMBSTONE_PRUNE_BATCH_SIZE = config("CHANGES_TOMBSTONE_PRUNE_BATCH_SIZE", cast=int, default=1000)
+
+# ======== Startup ========
+# `manage.py startup_profile` fails when a fresh worker takes longer than this to
+# load Django and the URLconf.
+STARTUP_BUDGET_MS = config("STARTUP_BUDGET_MS", cast=float, default=1000)
+
+# ======== Partitioning ========
+# `partition_events` partitions the event table by start_date per year or quarter and
+# keeps EVENT_PARTITION_PREMAKE partitions ready ahead of today. Events may last at
+# most EVENT_MAX_DURATION_DAYS, which bounds the start_date of date window queries
+# so they prune to the partitions of the window.
+EVENT_PARTITION_INTERVAL = config("EVENT_PARTITION_INTERVAL", default="year")
+EVENT_PARTITION_PREMAKE = config("EVENT_PARTITION_PREMAKE", cast=int, default=2)
+EVENT_MAX_DURATION_DAYS = config("EVENT_MAX_DURATION_DAYS", cast=int, default=366)
+
+# ======== Throttling ========
+# Requests spend tokens from a bucket per user (per IP when anonymous) kept in the
+# throttle_bucket table, so limits hold across workers. Views price their actions
+# with `throttle_costs`; searches cost THROTTLE_SEARCH_COST more and calendars not
+# bounded to a month or less THROTTLE_WIDE_CALENDAR_COST more. THROTTLE_COSTS
+# overrides actions, e.g. "EventViewSet.calender_view=5,CommonEventViewSet.list=2".
+THROTTLE_ENABLED = config("THROTTLE_ENABLED", cast=bool, default=True)
+THROTTLE_SEARCH_COST = config("THROTTLE_SEARCH_COST", cast=int, default=4)
+THROTTLE_WIDE_CALENDAR_COST = config("THROTTLE_WIDE_CALENDAR_COST", cast=int, default=9)
+THROTTLE_COSTS = config(
+    "THROTTLE_COSTS", default="",
+    cast=lambda v: {name.strip(): int(cost) for name, cost in (item.split("=") for item in Csv()(v))},
+)
+# Buckets idle longer than a full refill are deleted this often per worker.
+THROTTLE_PRUNE_SECONDS = config("THROTTLE_PRUNE_SECONDS", cast=int, default=300)
+
+# ======== Compression ========
+# Text and JSON responses of at least COMPRESSION_MIN_SIZE bytes are compressed with
+# brotli (when installed) or gzip at these levels. Prebuilt payloads are compressed
+# once at the best level instead. Gzip bodies get up to
+# COMPRESSION_GZIP_MAX_RANDOM_BYTES of random header padding against BREACH; 0
+# disables it.
+COMPRESSION_ENABLED = config("COMPRESSION_ENABLED", cast=bool, default=True)
+COMPRESSION_MIN_SIZE = config("COMPRESSION_MIN_SIZE", cast=int, default=1024)
+COMPRESSION_GZIP_LEVEL = config("COMPRESSION_GZIP_LEVEL", cast=int, default=6)
+COMPRESSION_BROTLI_QUALITY = config("COMPRESSION_BROTLI_QUALITY", cast=int, default=5)
+COMPRESSION_GZIP_MAX_RANDOM_BYTES = config("COMPRESSION_GZIP_MAX_RANDOM_BYTES", cast=int, default=100)
+
+# ======== Token Blacklist ========
+# `prune_tokens` deletes expired outstanding and blacklisted tokens in batches of
+# TOKEN_PRUNE_BATCH_SIZE; schedule it periodically. Each worker keeps a bloom filter
+# of blacklisted JTIs sized for at least BLACKLIST_FILTER_CAPACITY entries, reads the
+# new ones at most every BLACKLIST_FILTER_REFRESH_SECONDS and rebuilds it every
+# BLACKLIST_FILTER_REBUILD_SECONDS to drop the pruned ones.
+TOKEN_PRUNE_BATCH_SIZE = config("TOKEN_PRUNE_BATCH_SIZE", cast=int, default=1000)
+BLACKLIST_FILTER_CAPACITY = config("BLACKLIST_FILTER_CAPACITY", cast=int, default=100000)
+BLACKLIST_FILTER_ERROR_RATE = config("BLACKLIST_FILTER_ERROR_RATE", cast=float, default=0.01)
+BLACKLIST_FILTER_REFRESH_SECONDS = config("BLACKLIST_FILTER_REFRESH_SECONDS", cast=float, default=5)
+BLACKLIST_FILTER_REBUILD_SECONDS = config("BLACKLIST_FILTER_REBUILD_SECONDS", cast=int, default=3600)
+
+# ======== Online Users ========
+# Presence is shared across workers through the database; a user counts as online
+# while their last bucket is within the TTL, and is written at most once per bucket.
+ONLINE_USER_TTL_SECONDS = config("ONLINE_USER_TTL_SECONDS", cast=int, default=300)
+ONLINE_USER_BUCKET_SECONDS = config("ONLINE_USER_BUCKET_SECONDS", cast=int, default=60)
+# Active user sketches are merged into the database at most this often per worker.
+ACTIVE_USER_FLUSH_SECONDS = config("ACTIVE_USER_FLUSH_SECONDS", cast=int, default=60)
+
 # ======== Logging ========
 LOG_DIR = os.path.join(BASE_DIR, "logs")
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# ======== Metrics ========
+# Under gunicorn every worker writes its samples to the PROMETHEUS_MULTIPROC_DIR
+# exported by gunicorn.conf.py and /metrics merges them. Without that variable
+# (runserver, tests, management commands) the process keeps its own registry.
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
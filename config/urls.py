@@ -19,21 +19,28 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
-from base.swagger import SpectacularSwaggerView, SpectacularAPIView, SpectacularRedocView
+from base.views import lazy_view, metrics_view
 from .views import home
 
+# The schema and docs views pull in drf_spectacular's generators and renderers, so
+# they are only imported when first requested.
 spectacular_url = [
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('swagger', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger_ui'),
-    path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
+    path('api/schema/', lazy_view('base.docs.SpectacularAPIView'), name='schema'),
+    path('swagger', lazy_view('base.docs.SpectacularSwaggerView', url_name='schema'), name='swagger_ui'),
+    path('api/schema/redoc/', lazy_view('base.docs.SpectacularRedocView', url_name='schema'), name='redoc'),
 ]
 
 urlpatterns = [
-    # path("django-admin/", admin.site.urls),
     path("", home),
+    path("metrics", metrics_view),
     path("events/", include("event.urls")),
+    path("", include("base.urls")),
 ] + spectacular_url
 
+if settings.ADMIN_ENABLED:
+    admin.autodiscover()
+    urlpatterns.append(path("django-admin/", admin.site.urls))
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
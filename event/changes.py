@@ -0,0 +1,147 @@
+"""
+Change feed for sync clients. Instead of polling full lists, a client keeps the
+cursor of its last sync and asks for what changed since: the events created or
+updated (by `updated_at`) with their rows, and the ids of the events and contact
+persons deleted (from `EventTombstone`). The work is proportional to the changes,
+not to the catalogue.
+
+A cursor is a point in time, in microseconds since the epoch, with the id of the
+last event or tombstone read at that time when a page ended there; bulk writes
+stamp many rows alike, so pages are keyed on (time, id). Changes newer than
+CHANGES_SETTLE_SECONDS are held back until transactions that stamped an earlier
+time have committed, so a cursor never skips a change.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db.models import Q, prefetch_related_objects
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from event.models import EventModel, EventTombstone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = "The cursor is older than the kept deletions; sync the full list again and restart without one."
+    default_code = "cursor_expired"
+
+
+class Cursor(NamedTuple):
+    """
+    Everything before `moment` has been read, and at `moment` the events and
+    tombstones with ids up to `event_id` and `tombstone_id` (all of them when None).
+    """
+    moment: datetime
+    event_id: Optional[int] = None
+    tombstone_id: Optional[int] = None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    value = str((cursor.moment - EPOCH) // timedelta(microseconds=1))
+    if cursor.event_id is not None:
+        return f"{value}.e{cursor.event_id}"
+    if cursor.tombstone_id is not None:
+        return f"{value}.d{cursor.tombstone_id}"
+    return value
+
+
+def decode_cursor(value: str) -> Cursor:
+    moment, _, tie = (value or "").partition(".")
+    try:
+        cursor = Cursor(EPOCH + timedelta(microseconds=int(moment)))
+        if tie[:1] == "e":
+            return cursor._replace(event_id=int(tie[1:]), tombstone_id=0)
+        if tie[:1] == "d":
+            return cursor._replace(tombstone_id=int(tie[1:]))
+        if tie:
+            raise ValueError(tie)
+        return cursor
+    except (TypeError, ValueError, OverflowError):
+        raise ValidationError({"since": "Invalid cursor."})
+
+
+def tombstone_horizon() -> datetime:
+    return timezone.now() - timedelta(days=settings.CHANGES_TOMBSTONE_RETENTION_DAYS)
+
+
+def after(field: str, moment: datetime, last_id: Optional[int]) -> Q:
+    if last_id is None:
+        return Q(**{f"{field}__gt": moment})
+    return Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": last_id})
+
+
+def changes(since: Optional[Cursor], limit: int) -> dict:
+    """
+    At most `limit` changes after `since` (from the beginning when None), oldest
+    first, events before tombstones at the same time. `results` lists the created
+    and updated events with their contact persons.
+    """
+    if since is not None and since.moment < tombstone_horizon():
+        raise CursorExpired()
+    horizon = timezone.now() - timedelta(seconds=settings.CHANGES_SETTLE_SECONDS)
+    # Annotated like the list views, so rows report when the retention purge removes them.
+    events = EventModel.objects.filter(updated_at__lte=horizon).annotate(
+        deletion_time=EventModel.deletion_time_expression()
+    )
+    tombstones = EventTombstone.objects.filter(deleted_at__lte=horizon)
+    if since is not None:
+        events = events.filter(after("updated_at", since.moment, since.event_id))
+        tombstones = tombstones.filter(after("deleted_at", since.moment, since.tombstone_id))
+
+    # The page is the first `limit` of both streams merged, which lie within the
+    # first `limit` of each.
+    events = list(events.order_by("updated_at", "id")[:limit])
+    tombstones = list(tombstones.order_by("deleted_at", "id")[:limit])
+    page = sorted(
+        [(event.updated_at, 0, event.id, event) for event in events]
+        + [(tombstone.deleted_at, 1, tombstone.id, tombstone) for tombstone in tombstones],
+        key=lambda change: change[:3],
+    )
+    has_more = len(page) > limit or len(events) == limit or len(tombstones) == limit
+    page = page[:limit]
+
+    if has_more:
+        moment, kind, last_id, _ = page[-1]
+        cursor = Cursor(moment, event_id=last_id, tombstone_id=0) if kind == 0 else Cursor(moment, tombstone_id=last_id)
+    elif since is not None and since.moment >= horizon:
+        cursor = since
+    else:
+        cursor = Cursor(horizon)
+
+    results, created, updated = [], [], []
+    deleted = {EventTombstone.EVENT: [], EventTombstone.CONTACT_PERSON: []}
+    for _, kind, _, change in page:
+        if kind == 1:
+            deleted.setdefault(change.model, []).append(change.object_id)
+            continue
+        results.append(change)
+        (created if since is None or change.created_at > since.moment else updated).append(change.id)
+    prefetch_related_objects(results, "event_contact_person")
+
+    return {
+        "cursor": encode_cursor(cursor),
+        "has_more": has_more,
+        "created": created,
+        "updated": updated,
+        "deleted": deleted,
+        "results": results,
+    }
+
+
+def expired_tombstones():
+    return EventTombstone.objects.filter(deleted_at__lt=tombstone_horizon())
+
+
+def prune_tombstones(batch_size: int) -> int:
+    """
+    Delete up to `batch_size` tombstones older than CHANGES_TOMBSTONE_RETENTION_DAYS
+    in one statement. Returns how many were deleted.
+    """
+    batch = expired_tombstones().order_by("deleted_at", "id").values("id")[:batch_size]
+    deleted, _ = EventTombstone.objects.filter(id__in=batch).delete()
+    return deleted
@@ -0,0 +1,140 @@
+import random
+from datetime import date, time, timedelta
+
+from base import geohash
+from base.enum import EventType, EventStatus, EVENT_CATEGORY_MAPPING
+
+# (country, district, cities); earlier regions get far more events, like real traffic.
+REGIONS = [
+    ("Bangladesh", "Dhaka", ["Gulshan", "Banani", "Dhanmondi", "Uttara", "Bashundhara", "Mirpur"]),
+    ("United Arab Emirates", "Dubai", ["Downtown", "Dubai Marina", "Palm Jumeirah", "Business Bay"]),
+    ("Bangladesh", "Chattogram", ["Agrabad", "Khulshi", "Nasirabad"]),
+    ("United Kingdom", "Greater London", ["Westminster", "Kensington", "Canary Wharf"]),
+    ("Singapore", "Central Region", ["Marina Bay", "Orchard", "Sentosa"]),
+    ("United States", "New York", ["Manhattan", "Brooklyn", "Queens"]),
+    ("Bangladesh", "Sylhet", ["Zindabazar", "Amberkhana"]),
+    ("Malaysia", "Kuala Lumpur", ["Bukit Bintang", "Mont Kiara", "KLCC"]),
+    ("Saudi Arabia", "Riyadh", ["Olaya", "Al Malqa"]),
+    ("Qatar", "Doha", ["West Bay", "The Pearl"]),
+    ("Thailand", "Bangkok", ["Sukhumvit", "Silom"]),
+    ("Canada", "Ontario", ["Toronto", "Ottawa"]),
+]
+REGION_WEIGHTS = [1 / (rank + 1) ** 1.2 for rank in range(len(REGIONS))]
+# Approximate district centres; offline events are scattered ~10 km around them.
+DISTRICT_CENTRES = {
+    "Dhaka": (23.78, 90.41), "Dubai": (25.20, 55.27), "Chattogram": (22.36, 91.78),
+    "Greater London": (51.51, -0.13), "Central Region": (1.29, 103.85), "New York": (40.73, -73.99),
+    "Sylhet": (24.90, 91.87), "Kuala Lumpur": (3.14, 101.69), "Riyadh": (24.71, 46.68),
+    "Doha": (25.29, 51.53), "Bangkok": (13.75, 100.50), "Ontario": (43.65, -79.38),
+}
+
+TITLE_WORDS = [
+    "Luxury", "Property", "Investor", "Summit", "Expo", "Showcase", "Developer", "Meetup", "Webinar",
+    "Networking", "Masterclass", "Tour", "Launch", "Forum", "Gala", "Workshop", "Insight", "Panel",
+]
+FIRST_NAMES = ["Ayesha", "Rahim", "Nadia", "Omar", "Sara", "Karim", "Lina", "Tanvir", "Maya", "Imran"]
+LAST_NAMES = ["Rahman", "Hossain", "Chowdhury", "Khan", "Ahmed", "Islam", "Smith", "Lee", "Tan", "Ali"]
+POSITIONS = ["Sales Director", "Broker", "Marketing Lead", "Event Manager", "Consultant"]
+LANGUAGES = ["english", "bangla", "arabic", "english,bangla", "english,arabic"]
+COLORS = ["#1D3557", "#E63946", "#2A9D8F", "#F4A261", "#264653", "#FFFFFF", "#000000"]
+CATEGORIES = list(EVENT_CATEGORY_MAPPING.keys())
+STATUSES = [status.value for status in EventStatus]
+STATUS_WEIGHTS = [70, 5, 20, 5]
+
+
+class EventDataGenerator:
+    """
+    Deterministic generator of realistic event and contact person rows.
+
+    The same seed always yields the same rows. Categories and sub-categories are
+    valid per EVENT_CATEGORY_MAPPING, regions follow a Zipf-like skew and most
+    events last a single day, with a long tail of multi-day ones.
+    """
+
+    def __init__(self, seed: int = 0, today: date = None):
+        self.random = random.Random(seed)
+        self.today = today or date.today()
+
+    def event(self) -> dict:
+        rnd = self.random
+        categories = rnd.sample(CATEGORIES, rnd.choice((1, 1, 1, 2)))
+        sub_categories = [sub for category in categories for sub in EVENT_CATEGORY_MAPPING[category]]
+        sub_categories = rnd.sample(sub_categories, min(len(sub_categories), rnd.randint(1, 3)))
+
+        start_date = self.today + timedelta(days=rnd.randint(-730, 365))
+        span = rnd.choices((0, 1, 2, 3, 6, 13), weights=(60, 15, 10, 8, 5, 2))[0]
+        is_all_day = rnd.random() < 0.3
+        start_time = end_time = None
+        if not is_all_day:
+            start_hour = rnd.randint(8, 18)
+            start_time = time(start_hour, rnd.choice((0, 15, 30, 45)))
+            end_time = time(min(start_hour + rnd.randint(1, 4), 23), start_time.minute)
+
+        event_type = EventType.OFFLINE.value if rnd.random() < 0.7 else EventType.ONLINE.value
+        country = district = city = location = location_link = meeting_link = None
+        latitude = longitude = location_hash = None
+        if event_type == EventType.OFFLINE.value:
+            country, district, cities = rnd.choices(REGIONS, weights=REGION_WEIGHTS)[0]
+            city = rnd.choice(cities)
+            centre_lat, centre_lng = DISTRICT_CENTRES[district]
+            latitude = round(centre_lat + rnd.uniform(-0.1, 0.1), 6)
+            longitude = round(centre_lng + rnd.uniform(-0.1, 0.1), 6)
+            location_hash = geohash.encode(latitude, longitude)
+            location = f"{rnd.randint(1, 200)} {rnd.choice(TITLE_WORDS)} Avenue, {city}"
+            location_link = f"https://maps.example.com/?q={rnd.randint(1, 10 ** 9)}"
+        else:
+            meeting_link = f"https://meet.example.com/{rnd.getrandbits(48):012x}"
+
+        registration_available = rnd.random() < 0.4
+        return {
+            "title": " ".join(rnd.sample(TITLE_WORDS, rnd.randint(2, 4))),
+            "description": " ".join(rnd.choices(TITLE_WORDS, k=rnd.randint(10, 60))).lower(),
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=span),
+            "is_all_day": is_all_day,
+            "start_time": start_time,
+            "end_time": end_time,
+            "event_image": "",
+            "event_video": None,
+            "event_type": event_type,
+            "registration_available": registration_available,
+            "registration_last_date": start_date - timedelta(days=rnd.randint(1, 14)) if registration_available else None,
+            "registration_link": "https://register.example.com/" + str(rnd.randint(1, 10 ** 6)) if registration_available else None,
+            "category": categories,
+            "sub_category": sub_categories,
+            "meeting_link": meeting_link,
+            "country": country,
+            "district": district,
+            "city": city,
+            "location": location,
+            "location_link": location_link,
+            "latitude": latitude,
+            "longitude": longitude,
+            "geohash": location_hash,
+            "text_color": rnd.choice(COLORS),
+            "bg_color": rnd.choice(COLORS),
+            "status": rnd.choices(STATUSES, weights=STATUS_WEIGHTS)[0],
+            "admin_comment": None,
+            "is_active": rnd.random() < 0.95,
+        }
+
+    def contact_person(self) -> dict:
+        rnd = self.random
+        first_name, last_name = rnd.choice(FIRST_NAMES), rnd.choice(LAST_NAMES)
+        number = f"+8801{rnd.randint(300000000, 999999999)}"
+        whatsapp_available = rnd.random() < 0.6
+        return {
+            "name": f"{first_name} {last_name}",
+            "position": rnd.choice(POSITIONS),
+            "email": f"{first_name}.{last_name}{rnd.randint(1, 9999)}@example.com".lower(),
+            "contact_number": number,
+            "wa_number": number if whatsapp_available else None,
+            "company": f"{last_name} Properties",
+            "whatsapp_available": whatsapp_available,
+            "language": rnd.choice(LANGUAGES),
+            "photo": "",
+            "is_active": True,
+        }
+
+    def contact_person_count(self) -> int:
+        return self.random.choices((1, 2, 3), weights=(55, 35, 10))[0]
@@ -1,18 +1,35 @@
+import calendar
+import math
+from datetime import date as dt, timedelta
+from functools import reduce
+from operator import or_
+from typing import NamedTuple, Optional
+
 import django_filters
+from django.conf import settings
+from django.db.models import Exists, F, FloatField, OuterRef, Q, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+from django.utils.dateparse import parse_date
+from django.utils.timezone import now
+from rest_framework import serializers
+
 from base.filters import ArchiveFilter
-from event.models import EventModel
+from base.geohash import EARTH_RADIUS_KM, bounding_box, covering_cells
+from event.models import EventModel, EventOccurrence
 
 class EventFilterSet(ArchiveFilter):
     title = django_filters.CharFilter(field_name="title", lookup_expr='icontains')
     description = django_filters.CharFilter(field_name="description", lookup_expr='icontains')
 
 
-    start_date = django_filters.DateFilter(field_name="start_date",lookup_expr='gte')
+    start_date = django_filters.DateFilter(method='filter_start_date')
     end_date = django_filters.DateFilter(field_name="end_date", lookup_expr='lte')
     start_time = django_filters.TimeFilter(field_name="start_time", lookup_expr='gte')
     end_time = django_filters.TimeFilter(field_name="end_time", lookup_expr='lte')
     category = django_filters.CharFilter(method='filter_category')
     sub_category = django_filters.CharFilter(method='filter_sub_category')
+    near = django_filters.CharFilter(method='filter_near', help_text='Events around `lat,lng`, nearest first')
+    radius_km = django_filters.NumberFilter(method='filter_radius_km', help_text='Radius of the `near` search')
 
     class Meta:
         model = EventModel
@@ -26,8 +43,41 @@ class EventFilterSet(ArchiveFilter):
             "admin_comment",
             "registration_link",
             "event_video",
+            "claimed_by",
+            "claimed_until",
+            "recurrence_exceptions",
+            "occurrences_expanded_until",
+            "latitude",
+            "longitude",
+            "geohash",
         ]
 
+    def filter_start_date(self, queryset, name, value):
+        # Recurring series keep their first occurrence in start_date, so later ones
+        # come from the materialized occurrences.
+        upcoming = EventOccurrence.objects.filter(event=OuterRef("pk"), start_date__gte=value)
+        return queryset.filter(
+            Q(start_date__gte=value) | Q(recurrence_frequency__isnull=False) & Exists(upcoming)
+        )
+
+    def filter_near(self, queryset, name, value):
+        try:
+            latitude, longitude = (float(part) for part in value.split(","))
+            radius_km = float(self.data.get("radius_km") or settings.EVENT_NEAR_DEFAULT_RADIUS_KM)
+        except ValueError:
+            raise serializers.ValidationError({"near": "Expected `near=lat,lng` and a numeric `radius_km`."})
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise serializers.ValidationError({"near": "Latitude or longitude out of range."})
+        if not 0 < radius_km <= settings.EVENT_NEAR_MAX_RADIUS_KM:
+            raise serializers.ValidationError(
+                {"radius_km": f"Must be between 0 and {settings.EVENT_NEAR_MAX_RADIUS_KM} km."}
+            )
+        return near_events(queryset, latitude, longitude, radius_km)
+
+    def filter_radius_km(self, queryset, name, value):
+        # Read by filter_near.
+        return queryset
+
     def filter_category(self, queryset, name, value):
         categories = value.split(",")
         return queryset.filter(category__overlap=categories)
@@ -37,5 +87,153 @@ class EventFilterSet(ArchiveFilter):
         return queryset.filter(sub_category__overlap=sub_categories)
 
 
+def haversine_km(latitude: float, longitude: float):
+    """
+    Great circle distance in km from a point to each row's latitude/longitude.
+    """
+    lat, lng = Radians(F("latitude")), Radians(F("longitude"))
+    origin_lat, origin_lng = math.radians(latitude), math.radians(longitude)
+    a = (
+        Power(Sin((lat - Value(origin_lat)) / 2), 2)
+        + Value(math.cos(origin_lat)) * Cos(lat) * Power(Sin((lng - Value(origin_lng)) / 2), 2)
+    )
+    # Rounding can push `a` just past 1, outside ASIN's domain.
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(Least(a, Value(1.0))), output_field=FloatField())
+
+
+def near_events(queryset, latitude: float, longitude: float, radius_km: float):
+    """
+    Events within `radius_km`, nearest first, annotated with `distance_km`. The
+    geohash prefixes (index scan) and the bounding box prune the candidates before
+    the exact haversine distance is computed.
+    """
+    prefilter = Q(latitude__isnull=False, longitude__isnull=False)
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells:
+        prefilter &= reduce(or_, [Q(geohash__startswith=cell) for cell in cells])
+    min_lat, max_lat, min_lng, max_lng = bounding_box(latitude, longitude, radius_km)
+    prefilter &= Q(latitude__range=(min_lat, max_lat))
+    if min_lng < -180:
+        prefilter &= Q(longitude__gte=min_lng + 360) | Q(longitude__lte=max_lng)
+    elif max_lng > 180:
+        prefilter &= Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng - 360)
+    else:
+        prefilter &= Q(longitude__range=(min_lng, max_lng))
+    return (
+        queryset.filter(prefilter)
+        .annotate(distance_km=haversine_km(latitude, longitude))
+        .filter(distance_km__lte=radius_km)
+        .order_by("distance_km", "-created_at")
+    )
+
+
+class CalendarFilters(NamedTuple):
+    filters: Q
+    date_filters: Q
+    # First and last day the date filters cover, None when they are not bounded.
+    window: Optional[tuple]
+
+    def queryset(self, queryset):
+        """
+        One-off events matching the date filters, plus recurring series that may have
+        an occurrence in the window, which are expanded after the query. The two run
+        as a single UNION ALL so each half is planned, and partition pruned, on its own.
+        """
+        one_off = Q(self.date_filters, recurrence_frequency__isnull=True)
+        recurring = Q(recurrence_frequency__isnull=False)
+        if self.window:
+            first, last = self.window
+            # Implied by the date filters since no event lasts longer than
+            # EVENT_MAX_DURATION_DAYS; a start_date range lets Postgres prune partitions.
+            one_off &= Q(start_date__range=(first - timedelta(days=settings.EVENT_MAX_DURATION_DAYS), last))
+            recurring &= Q(start_date__lte=last) & (Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=first))
+        return queryset.filter(self.filters, one_off).union(queryset.filter(self.filters, recurring), all=True)
+
+
+def intersect_windows(windows):
+    first = max(window[0] for window in windows)
+    last = min(window[1] for window in windows)
+    return first, last
+
+
+def throttle_surcharge(query_params, calendar: bool = False) -> int:
+    """
+    Extra throttle tokens for event queries heavier than a page of the list: geo
+    searches, and calendars spanning more than a month or not bounded at all.
+    """
+    surcharge = settings.THROTTLE_SEARCH_COST if query_params.get("near") else 0
+    if calendar:
+        try:
+            window = calendar_filters(query_params).window
+        except ValueError:
+            return surcharge  # rejected by the view
+        if window is None or (window[1] - window[0]).days > 31:
+            surcharge += settings.THROTTLE_WIDE_CALENDAR_COST
+    return surcharge
+
+
+def calendar_filters(query_params) -> CalendarFilters:
+    """
+    Build the calendar filters from the query params shared by the sync and async
+    calendar views. Raises ValueError when `date`, `week` or `event_date`
+    is not a valid date.
+    """
+    today = now().date()
+    date = query_params.get("date", None)
+    week = query_params.get("week", None)
+    month = int(query_params.get("month", today.month))
+    year = int(query_params.get("year", today.year))
+    city = query_params.get("city", None)
+    district = query_params.get("district", None)
+    country = query_params.get("country", None)
+    category = query_params.get("category", None)
+    sub_category = query_params.get("sub_category", None)
+    event_date = query_params.get("event_date", None)
+    if event_date and (month or year):
+        month = None
+        year = None
+    status = query_params.get("status", None)
 
+    # Convert `date` to an actual date object if provided
+    if date:
+        date = dt(year, month, int(date))  # Convert integer day to a full date
 
+    # Build Query Filters
+    filters = Q()
+    date_filters = Q()
+    windows = []
+    if date:
+        date_filters &= Q(start_date=date) | Q(end_date=date)
+        windows.append((date, date))
+    # Weeks and months are compared as date ranges, which indexes and partition
+    # pruning can use, unlike extracting the week or month of every row.
+    if week and year:
+        monday = dt.fromisocalendar(year, int(week), 1)
+        window = (monday, monday + timedelta(days=6))
+        date_filters &= Q(start_date__range=window) | Q(end_date__range=window)
+        windows.append(window)
+    if month:
+        window = (dt(year, month, 1), dt(year, month, calendar.monthrange(year, month)[1]))
+        date_filters &= Q(start_date__range=window) | Q(end_date__range=window)
+        windows.append(window)
+    if city:
+        filters &= Q(city=city)
+    if district:
+        filters &= Q(district=district)
+    if country:
+        filters &= Q(country=country)
+    if status:
+        filters &= Q(status=status)
+    if event_date:
+        date_filters &= Q(start_date__lte=event_date, end_date__gte=event_date)
+        event_date = parse_date(event_date)
+        if event_date is None:
+            raise ValueError("Invalid event_date")
+        windows.append((event_date, event_date))
+    if category:
+        filters &= Q(category__contains=[category]) & ~Q(category=[]) & ~Q(category__isnull=True)
+    if sub_category:
+        sub_category_list = [item.strip() for item in sub_category.split(",")]  # Clean spaces
+        sub_category_filters = reduce(or_, [Q(sub_category__overlap=[q]) for q in sub_category_list])
+        filters &= sub_category_filters & ~Q(sub_category=[]) & ~Q(sub_category__isnull=True)
+    return CalendarFilters(filters, date_filters, intersect_windows(windows) if windows else None)
@@ -0,0 +1,136 @@
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = {
+    "wsgi": ["-m", "gunicorn", "config.wsgi:application"],
+    "asgi": ["-m", "gunicorn", "config.asgi:application", "-k", "uvicorn_worker.UvicornWorker"],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the sync WSGI and the async ASGI event endpoints under slow-client load. "
+        "Slow clients trickle their request headers while fast clients measure latency and "
+        "throughput; sync workers stay blocked on the slow clients, the event loop does not."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi-url", default=None, help="Benchmark a running WSGI server instead of starting one.")
+        parser.add_argument("--asgi-url", default=None, help="Benchmark a running ASGI server instead of starting one.")
+        parser.add_argument("--sync-path", default="/events/public/", help="Endpoint hit on the WSGI server.")
+        parser.add_argument("--async-path", default="/events/async/public/", help="Endpoint hit on the ASGI server.")
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes of each started server.")
+        parser.add_argument("--slow-clients", type=int, default=20, help="Concurrent slow clients.")
+        parser.add_argument("--slow-seconds", type=float, default=5.0, help="Time each slow client takes to send its request.")
+        parser.add_argument("--requests", type=int, default=200, help="Requests sent by the fast clients.")
+        parser.add_argument("--concurrency", type=int, default=10, help="Concurrent fast clients.")
+        parser.add_argument("--timeout", type=float, default=30.0, help="Fast request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        results = {}
+        for kind, path in (("wsgi", options["sync_path"]), ("asgi", options["async_path"])):
+            url = options[f"{kind}_url"]
+            server = None
+            if url is None:
+                server, url = self.start_server(kind, options["workers"])
+            try:
+                results[kind] = asyncio.run(self.load(url, path, options))
+            finally:
+                if server is not None:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+        self.stdout.write(
+            f"{'server':<8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}"
+        )
+        for kind, result in results.items():
+            self.stdout.write(
+                f"{kind:<8}{result['throughput']:>9.1f}{result['p50_ms']:>10.1f}"
+                f"{result['p95_ms']:>10.1f}{result['max_ms']:>10.1f}{result['errors']:>8}"
+            )
+
+    def start_server(self, kind, workers):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        command = [sys.executable, *SERVERS[kind], "--bind", f"127.0.0.1:{port}", "--workers", str(workers)]
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"The {kind} server exited with code {server.returncode}: {' '.join(command)}")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return server, f"http://127.0.0.1:{port}"
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"The {kind} server did not start listening on port {port}")
+
+    async def load(self, url, path, options):
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        request_head = f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\nConnection: close\r\n"
+
+        async def slow_client():
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(request_head.encode())
+                deadline = time.monotonic() + options["slow_seconds"]
+                while time.monotonic() < deadline:
+                    writer.write(b"X-Slow-Client: 1\r\n")
+                    await writer.drain()
+                    await asyncio.sleep(0.5)
+                writer.write(b"\r\n")
+                await writer.drain()
+                await reader.read()
+                writer.close()
+            except OSError:
+                pass
+
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        latencies, errors = [], 0
+
+        async def fast_request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), options["timeout"])
+                    writer.write((request_head + "\r\n").encode())
+                    response = await asyncio.wait_for(reader.read(), options["timeout"])
+                    writer.close()
+                except (OSError, asyncio.TimeoutError):
+                    errors += 1
+                    return
+                if not response.startswith(b"HTTP/1.1 200"):
+                    errors += 1
+                    return
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        slow = [asyncio.create_task(slow_client()) for _ in range(options["slow_clients"])]
+        await asyncio.sleep(0.5)  # let the slow clients occupy the server first
+        started = time.perf_counter()
+        await asyncio.gather(*(fast_request() for _ in range(options["requests"])))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*slow)
+
+        if not latencies:
+            raise CommandError(f"Every request to {url}{path} failed")
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        return {
+            "throughput": len(latencies) / elapsed,
+            "p50_ms": percentiles[49],
+            "p95_ms": percentiles[94],
+            "max_ms": max(latencies),
+            "errors": errors,
+        }
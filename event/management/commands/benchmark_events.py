@@ -0,0 +1,168 @@
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from base.middleware.query_budget import QueryInspector
+from event.models import EventModel
+from event.views.common import CommonEventViewSet, EventRegionalDataApiView
+from event.views.user import EventViewSet
+
+PAGE_DEPTHS = (1, 10, 100, 1000, 5000)
+DEFAULT_BASELINE = os.path.join(settings.BASE_DIR, "benchmarks", "event_read_path.json")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the event read path in-process against a seeded throwaway database. "
+        "Reports p50/p95 latency, query counts and peak allocations, and compares them "
+        "with a saved JSON baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=100_000, help="Number of events to seed.")
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the generated dataset.")
+        parser.add_argument("--iterations", type=int, default=30, help="Timed runs per scenario.")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per scenario.")
+        parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Path of the JSON baseline.")
+        parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Allowed p95 regression over the baseline as a fraction (0.2 = 20%%).",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Keep the benchmark database and its data between runs.",
+        )
+
+    def handle(self, *args, **options):
+        creation = connection.creation
+        old_name = connection.settings_dict["NAME"]
+        creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            self.seed(options["events"], options["seed"])
+            results = self.run(options["iterations"], options["warmup"])
+        finally:
+            if not options["keepdb"]:
+                creation.destroy_test_db(old_name, verbosity=0)
+
+        self.report(results)
+        if options["save_baseline"]:
+            self.save_baseline(options["baseline"], results, options)
+        else:
+            self.compare(options["baseline"], results, options["threshold"])
+
+    def seed(self, count, seed):
+        existing = EventModel.objects.count()
+        if existing >= count:
+            self.stdout.write(f"Reusing {existing} seeded events")
+            return
+        call_command("seed_events", events=count - existing, seed=seed + existing, stdout=self.stdout)
+
+    def scenarios(self):
+        today = date.today()
+        retrieve_id = EventModel.objects.order_by("id").values_list("id", flat=True)[EventModel.objects.count() // 2]
+        list_view = CommonEventViewSet.as_view({"get": "list"})
+        retrieve_view = CommonEventViewSet.as_view({"get": "retrieve"})
+        calender_view = EventViewSet.as_view({"get": "calender_view"})
+        regional_view = EventRegionalDataApiView.as_view()
+        month = {"month": today.month, "year": today.year}
+        last_page = EventModel.active_objects.count() // settings.REST_FRAMEWORK["PAGE_SIZE"]
+        scenarios = {
+            f"list_page_{page}": (list_view, "/events/public/", {"page": page}, {})
+            for page in PAGE_DEPTHS if page <= last_page
+        }
+        return {
+            **scenarios,
+            "search": (list_view, "/events/public/", {"search": "summit"}, {}),
+            "retrieve": (retrieve_view, f"/events/public/{retrieve_id}/", {}, {"pk": retrieve_id}),
+            "calender_day": (calender_view, "/events/user/calender/", {"date": today.day, **month}, {}),
+            "calender_week": (calender_view, "/events/user/calender/", {"week": today.isocalendar()[1], **month}, {}),
+            "calender_month": (calender_view, "/events/user/calender/", month, {}),
+            # `month=0` disables the month filter, so this covers every event of all years.
+            "calender_year": (calender_view, "/events/user/calender/", {"month": 0, "year": today.year}, {}),
+            "regional": (regional_view, "/events/public/regional/info/", {}, {}),
+        }
+
+    def run(self, iterations, warmup):
+        factory = APIRequestFactory()
+        results = {}
+        for name, (view, path, params, kwargs) in self.scenarios().items():
+            def call():
+                response = view(factory.get(path, params), **kwargs)
+                response.render()
+                if response.status_code != 200:
+                    raise CommandError(f"{name} returned {response.status_code}: {response.content[:200]}")
+
+            for _ in range(warmup):
+                call()
+
+            with QueryInspector() as inspector:
+                call()
+
+            tracemalloc.start()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                call()
+                timings.append((time.perf_counter() - start) * 1000)
+
+            percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+            results[name] = {
+                "p50_ms": round(percentiles[49], 3),
+                "p95_ms": round(percentiles[94], 3),
+                "queries": inspector.count,
+                "peak_kib": round(peak / 1024, 1),
+            }
+        return results
+
+    def report(self, results):
+        self.stdout.write(f"{'scenario':<18}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'peak KiB':>11}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<18}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['queries']:>9}{result['peak_kib']:>11.1f}"
+            )
+
+    def save_baseline(self, path, results, options):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "events": options["events"],
+                "seed": options["seed"],
+                "iterations": options["iterations"],
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        self.stdout.write(self.style.SUCCESS(f"Baseline saved to {path}"))
+
+    def compare(self, path, results, threshold):
+        if not os.path.exists(path):
+            self.stdout.write(f"No baseline at {path}; run with --save-baseline to create one.")
+            return
+
+        with open(path) as f:
+            baseline = json.load(f)["results"]
+        regressions = []
+        for name, result in results.items():
+            expected = baseline.get(name)
+            if not expected:
+                continue
+            if result["p95_ms"] > expected["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {expected['p95_ms']}ms")
+            if result["queries"] > expected["queries"]:
+                regressions.append(f"{name}: {result['queries']} queries vs baseline {expected['queries']}")
+        if regressions:
+            raise CommandError("Benchmark regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,93 @@
+import io
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from base.parsers import MessagePackParser, ORJSONParser
+from base.renderers import MessagePackRenderer, ORJSONRenderer, msgpack
+from event.models import EventModel
+from event.serializer import EventSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering and parsing a list of serialized events with DRF's JSON "
+        "renderer and parser, the orjson ones and MessagePack (when installed), in a "
+        "seeded throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=500, help="Events in the payload.")
+        parser.add_argument("--iterations", type=int, default=200, help="Timed runs per codec.")
+        parser.add_argument("--warmup", type=int, default=10, help="Untimed runs per codec.")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the benchmark database between runs.")
+
+    def handle(self, *args, **options):
+        creation = connection.creation
+        old_name = connection.settings_dict["NAME"]
+        creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            data = self.payload(options["events"])
+        finally:
+            if not options["keepdb"]:
+                creation.destroy_test_db(old_name, verbosity=0)
+        self.report(self.run(data, options["iterations"], options["warmup"]), len(data))
+
+    def payload(self, count):
+        missing = count - EventModel.objects.count()
+        if missing > 0:
+            call_command("seed_events", events=missing, workers=1, stdout=io.StringIO())
+        request = APIRequestFactory().get("/events/public/")
+        queryset = EventModel.objects.order_by("id")[:count]
+        return EventSerializer(queryset, many=True, context={"request": request}).data
+
+    def codecs(self):
+        codecs = {
+            "drf_json": (JSONRenderer(), JSONParser()),
+            "orjson": (ORJSONRenderer(), ORJSONParser()),
+        }
+        if msgpack is not None:
+            codecs["msgpack"] = (MessagePackRenderer(), MessagePackParser())
+        return codecs
+
+    def run(self, data, iterations, warmup):
+        results = {}
+        for name, (renderer, parser) in self.codecs().items():
+            content = renderer.render(data, renderer.media_type, {})
+            render_ms = self.time(lambda: renderer.render(data, renderer.media_type, {}), iterations, warmup)
+            parse_ms = self.time(lambda: parser.parse(io.BytesIO(content), parser.media_type, {}), iterations, warmup)
+            results[name] = {"render": render_ms, "parse": parse_ms, "bytes": len(content)}
+        return results
+
+    @staticmethod
+    def time(call, iterations, warmup):
+        for _ in range(warmup):
+            call()
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+        percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+        return round(percentiles[49], 3), round(percentiles[94], 3)
+
+    def report(self, results, events):
+        self.stdout.write(f"{events} events")
+        self.stdout.write(
+            f"{'codec':<10}{'render p50':>12}{'render p95':>12}{'parse p50':>11}{'parse p95':>11}{'bytes':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<10}{result['render'][0]:>12.3f}{result['render'][1]:>12.3f}"
+                f"{result['parse'][0]:>11.3f}{result['parse'][1]:>11.3f}{result['bytes']:>10}"
+            )
+        baseline = results["drf_json"]["render"][0]
+        self.stdout.write(self.style.SUCCESS(
+            f"orjson renders {baseline / results['orjson']['render'][0]:.1f}x faster than DRF's JSONRenderer"
+        ))
@@ -0,0 +1,83 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from event import partitioning
+from event.models import EventModel
+
+
+class Command(BaseCommand):
+    help = (
+        "Manage the range partitions of the event table by start_date: convert the table once, "
+        "then run --premake regularly to keep upcoming partitions ready and --detach-before "
+        "to take old ones out of the table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--convert", action="store_true",
+            help="Rebuild the event table as a partitioned table. Locks it while copying.",
+        )
+        parser.add_argument(
+            "--interval", choices=partitioning.INTERVALS, default=None,
+            help="Partition size. Defaults to EVENT_PARTITION_INTERVAL.",
+        )
+        parser.add_argument(
+            "--premake", type=int, default=None, metavar="N",
+            help="Create the current partition and the next N. Defaults to EVENT_PARTITION_PREMAKE.",
+        )
+        parser.add_argument(
+            "--detach-before", type=date.fromisoformat, default=None, metavar="YYYY-MM-DD",
+            help="Detach partitions that end on or before this date, unless they hold events still running then.",
+        )
+        parser.add_argument("--drop", action="store_true", help="Drop the partitions detached by --detach-before.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("partition_events requires PostgreSQL.")
+        interval = options["interval"] or settings.EVENT_PARTITION_INTERVAL
+        if interval not in partitioning.INTERVALS:
+            raise CommandError(f"EVENT_PARTITION_INTERVAL must be one of {', '.join(partitioning.INTERVALS)}.")
+
+        if options["convert"]:
+            self.check_durations()
+            try:
+                partitioning.convert(interval, options["premake"])
+            except ValueError as e:
+                raise CommandError(e)
+            self.stdout.write(self.style.SUCCESS(f"Partitioned '{partitioning.TABLE}' by {interval}"))
+        else:
+            with connection.cursor() as cursor:
+                if not partitioning.is_partitioned(cursor):
+                    raise CommandError(f"'{partitioning.TABLE}' is not partitioned yet, run with --convert first.")
+            premake_count = settings.EVENT_PARTITION_PREMAKE if options["premake"] is None else options["premake"]
+            created = partitioning.premake(premake_count, interval=interval)
+            self.stdout.write(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+
+        if options["detach_before"]:
+            detached, skipped = partitioning.detach_before(options["detach_before"], drop=options["drop"])
+            verb = "Dropped" if options["drop"] else "Detached"
+            self.stdout.write(f"{verb} {len(detached)} partitions: {', '.join(detached) or '-'}")
+            if skipped:
+                self.stderr.write(self.style.WARNING(
+                    f"Kept {len(skipped)} partitions holding events still running: {', '.join(skipped)}"
+                ))
+
+        with connection.cursor() as cursor:
+            for name, bound in partitioning.existing_partitions(cursor):
+                self.stdout.write(f"  {name}: {bound}")
+
+    def check_durations(self):
+        """
+        Calendar queries assume no event lasts longer than EVENT_MAX_DURATION_DAYS.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT MAX(end_date - start_date) FROM {connection.ops.quote_name(EventModel._meta.db_table)}")
+            longest = cursor.fetchone()[0] or 0
+        if longest > settings.EVENT_MAX_DURATION_DAYS:
+            self.stderr.write(self.style.WARNING(
+                f"The longest event lasts {longest} days, more than EVENT_MAX_DURATION_DAYS="
+                f"{settings.EVENT_MAX_DURATION_DAYS}; calendars may miss it."
+            ))
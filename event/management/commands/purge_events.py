@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from event.changes import expired_tombstones, prune_tombstones
+from event.models import EventModel
+from event.retention import RETENTION_MODES, purge_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove events older than EVENT_RETENTION_DAYS in small transactions, archiving them "
+        "into event_archive or deleting them with their media, and prune expired change feed "
+        "tombstones. Safe to run while serving traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=RETENTION_MODES, default=None, help="Defaults to EVENT_RETENTION_MODE.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Defaults to EVENT_PURGE_BATCH_SIZE.")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument("--sleep", type=float, default=0.0, help="Seconds to pause between batches.")
+        parser.add_argument("--dry-run", action="store_true", help="Only count the expired events.")
+
+    def handle(self, *args, **options):
+        mode = options["mode"] or settings.EVENT_RETENTION_MODE
+        if mode not in RETENTION_MODES:
+            raise CommandError(f"EVENT_RETENTION_MODE must be one of {', '.join(RETENTION_MODES)}.")
+        batch_size = options["batch_size"] or settings.EVENT_PURGE_BATCH_SIZE
+
+        if options["dry_run"]:
+            expired = EventModel.objects.filter(EventModel.expired_filter()).count()
+            self.stdout.write(f"{expired} events are past the {settings.EVENT_RETENTION_DAYS} day retention")
+            self.stdout.write(f"{expired_tombstones().count()} tombstones have expired")
+            return
+
+        started = time.perf_counter()
+        purged = batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            count = purge_batch(mode, batch_size)
+            if not count:
+                break
+            purged += count
+            batches += 1
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {purged} events purged")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        buried = 0
+        while True:
+            count = prune_tombstones(settings.CHANGES_TOMBSTONE_PRUNE_BATCH_SIZE)
+            if not count:
+                break
+            buried += count
+        verb = "Archived" if mode == "archive" else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {purged} events in {batches} batches and pruned {buried} tombstones "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
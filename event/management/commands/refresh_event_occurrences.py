@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from event.models import EventModel, EventOccurrence
+from event.recurrence import occurrence_horizon, occurrence_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll the materialized occurrences of recurring events forward: drop the ones that "
+        "ended before today and expand every series up to EVENT_OCCURRENCE_HORIZON_DAYS. Run daily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Series expanded per transaction.")
+        parser.add_argument("--rebuild", action="store_true", help="Recreate every occurrence from scratch.")
+
+    def handle(self, *args, **options):
+        horizon = occurrence_horizon()
+        rebuild = options["rebuild"]
+        batch_size = max(1, options["batch_size"])
+
+        pruned, _ = EventOccurrence.objects.filter(end_date__lt=now().date()).delete()
+        series = EventModel.objects.filter(recurrence_frequency__isnull=False)
+        if not rebuild:
+            series = series.exclude(occurrences_expanded_until__gte=horizon)
+
+        expanded = created = 0
+        ids = list(series.order_by("id").values_list("id", flat=True))
+        for offset in range(0, len(ids), batch_size):
+            batch = ids[offset:offset + batch_size]
+            with transaction.atomic():
+                events = list(EventModel.objects.filter(id__in=batch).select_for_update())
+                if rebuild:
+                    EventOccurrence.objects.filter(event_id__in=batch).delete()
+                rows = [row for event in events for row in occurrence_rows(event, horizon, rebuild)]
+                EventOccurrence.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+                EventModel.objects.filter(id__in=batch).update(occurrences_expanded_until=horizon)
+            expanded += len(events)
+            created += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Expanded {expanded} series up to {horizon}: {created} occurrences added, {pruned} past ones removed"
+        ))
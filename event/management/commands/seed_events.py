@@ -0,0 +1,197 @@
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, time as dt_time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from event.data_generator import EventDataGenerator
+from event.models import EventModel, EventContactPerson
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_value(value) -> str:
+    """
+    Format a Python value for Postgres' COPY text format.
+    """
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, (list, tuple)):
+        items = ",".join('"' + str(item).replace("\\", "\\\\").replace('"', '\\"') + '"' for item in value)
+        return ("{" + items + "}").translate(_COPY_ESCAPES)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class IteratorFile(io.TextIOBase):
+    """
+    File-like wrapper over an iterator of COPY lines, so rows are streamed to the
+    server instead of being buffered in memory.
+    """
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+
+def copy_rows(cursor, table: str, columns: list, lines):
+    """
+    Stream `lines` into `table` with COPY FROM STDIN on either psycopg 2 or 3.
+    """
+    sql = f"COPY {connection.ops.quote_name(table)} ({', '.join(map(connection.ops.quote_name, columns))}) FROM STDIN"
+    raw_cursor = cursor.cursor
+    if hasattr(raw_cursor, "copy"):  # psycopg 3
+        with raw_cursor.copy(sql) as copy:
+            for line in lines:
+                copy.write(line)
+    else:
+        raw_cursor.copy_expert(sql, IteratorFile(lines))
+
+
+def model_columns(model, exclude=()):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and field.name not in exclude
+    ]
+
+
+def seed_chunk(database: str, seed: int, chunk: int, first_id: int, size: int, today: date) -> tuple:
+    """
+    Generate and COPY one chunk of events and their contact persons. The rows only
+    depend on the seed and chunk number, never on how chunks are spread over workers.
+    """
+    settings_dict = connections["default"].settings_dict
+    settings_dict["NAME"] = database
+    # A pool inherited over fork has no worker threads; each worker needs one connection.
+    settings_dict["OPTIONS"].pop("pool", None)
+    generator = EventDataGenerator(seed=seed * 1_000_003 + chunk, today=today)
+    created_at = timezone.now()
+    event_fields = model_columns(EventModel, exclude=("created_at", "updated_at"))
+    contact_fields = model_columns(EventContactPerson, exclude=("event", "created_at", "updated_at"))
+    timestamps = copy_value(created_at) + "\t" + copy_value(created_at)
+    contacts = []
+
+    def event_lines():
+        for event_id in range(first_id, first_id + size):
+            row = generator.event()
+            for _ in range(generator.contact_person_count()):
+                contacts.append((event_id, generator.contact_person()))
+            yield "\t".join(
+                [str(event_id), timestamps] + [copy_value(row.get(field.name, field.get_default())) for field in event_fields]
+            ) + "\n"
+
+    def contact_lines():
+        for event_id, row in contacts:
+            yield "\t".join(
+                [str(event_id), timestamps] + [copy_value(row.get(field.name, field.get_default())) for field in contact_fields]
+            ) + "\n"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        copy_rows(
+            cursor, EventModel._meta.db_table,
+            ["id", "created_at", "updated_at"] + [field.column for field in event_fields], event_lines(),
+        )
+        copy_rows(
+            cursor, EventContactPerson._meta.db_table,
+            ["event_id", "created_at", "updated_at"] + [field.column for field in contact_fields], contact_lines(),
+        )
+    connection.close()
+    return size, len(contacts)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream synthetic events and contact persons into Postgres with COPY FROM STDIN. "
+        "Output is deterministic for a given --seed and --today, whatever the number of workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--events", type=int, default=1_000_000, help="Number of events to generate.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the generated dataset.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+        parser.add_argument("--chunk-size", type=int, default=20_000, help="Events per COPY transaction.")
+        parser.add_argument(
+            "--today", type=date.fromisoformat, default=None,
+            help="Date the generated event dates are relative to, as YYYY-MM-DD. Defaults to today.",
+        )
+        parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE after loading.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("seed_events requires PostgreSQL.")
+
+        total, chunk_size = options["events"], options["chunk_size"]
+        if total <= 0 or chunk_size <= 0:
+            raise CommandError("--events and --chunk-size must be positive.")
+
+        started = time.perf_counter()
+        first_id = self.reserve_ids(total)
+        database = connection.settings_dict["NAME"]
+        today = options["today"] or date.today()
+        chunks = [
+            (database, options["seed"], chunk, first_id + offset, min(chunk_size, total - offset), today)
+            for chunk, offset in enumerate(range(0, total, chunk_size))
+        ]
+
+        # Workers open their own connections; never share the parent's across a fork.
+        connections.close_all()
+        events = contacts = 0
+        with ProcessPoolExecutor(max_workers=max(1, options["workers"])) as executor:
+            for future in as_completed([executor.submit(seed_chunk, *chunk) for chunk in chunks]):
+                chunk_events, chunk_contacts = future.result()
+                events += chunk_events
+                contacts += chunk_contacts
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"  {events}/{total} events")
+
+        if not options["no_analyze"]:
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {EventModel._meta.db_table}, {EventContactPerson._meta.db_table}")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {events} events and {contacts} contact persons in {elapsed:.1f}s"
+        ))
+
+    def reserve_ids(self, count: int) -> int:
+        """
+        Advance the event id sequence past a block of `count` ids and return the first
+        one. The table lock keeps concurrent inserts from drawing ids inside the block.
+        """
+        table = EventModel._meta.db_table
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {table} IN EXCLUSIVE MODE")
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                f"GREATEST(nextval(pg_get_serial_sequence(%s, 'id')), (SELECT COALESCE(MAX(id), 0) + 1 FROM {table}))"
+                f" + %s - 1)",
+                [table, table, count],
+            )
+            last_id = cursor.fetchone()[0]
+        return last_id - count + 1
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-19 16:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventmodel',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, help_text='Moderator currently reviewing the event', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_events', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text='End of the moderator claim', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='eventmodel',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'needs_revision'])), fields=['created_at'], name='event_moderation_queue_idx'),
+        ),
+    ]
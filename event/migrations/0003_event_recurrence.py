@@ -0,0 +1,59 @@
+# Generated by Django 5.1 on 2026-10-19 16:28
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0002_moderation_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventmodel',
+            name='occurrences_expanded_until',
+            field=models.DateField(blank=True, editable=False, help_text='Last date of the materialized occurrences', null=True),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of occurrences', null=True),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='recurrence_exceptions',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.DateField(), blank=True, default=list, help_text='Start dates of skipped occurrences', size=None),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='recurrence_frequency',
+            field=models.CharField(blank=True, choices=[('daily', 'DAILY'), ('weekly', 'WEEKLY'), ('monthly', 'MONTHLY')], help_text='Repeat the event daily, weekly or monthly', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Repeat every n days, weeks or months'),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='recurrence_until',
+            field=models.DateField(blank=True, help_text='Last date an occurrence may start on', null=True),
+        ),
+        migrations.CreateModel(
+            name='EventOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField(help_text='Start date of the occurrence')),
+                ('end_date', models.DateField(help_text='End date of the occurrence')),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='event.eventmodel')),
+            ],
+            options={
+                'db_table': 'event_occurrence',
+                'indexes': [models.Index(fields=['start_date', 'end_date'], name='event_occurrence_dates_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event', 'start_date'), name='unique_event_occurrence')],
+            },
+        ),
+    ]
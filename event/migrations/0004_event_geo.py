@@ -0,0 +1,35 @@
+# Generated by Django 5.1 on 2026-10-19 16:30
+
+import django.core.validators
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0003_event_recurrence'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventmodel',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, help_text='Geohash of the event location, kept in sync on save', max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='latitude',
+            field=models.FloatField(blank=True, help_text='Latitude of the event location', null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='eventmodel',
+            name='longitude',
+            field=models.FloatField(blank=True, help_text='Longitude of the event location', null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddIndex(
+            model_name='eventmodel',
+            index=models.Index(fields=['geohash'], name='event_geohash_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1 on 2026-10-19 16:32
+
+import django.core.serializers.json
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0004_event_geo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.BigIntegerField(help_text='Id the event had in the event table', unique=True)),
+                ('title', models.CharField(help_text='Title of the event', max_length=255)),
+                ('end_date', models.DateField(blank=True, help_text='End date of the event', null=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Columns of the event and its contact persons')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'db_table': 'event_archive',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventmodel',
+            index=models.Index(fields=['end_date'], name='event_end_date_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-19 16:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0005_event_retention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='eventcontactperson',
+            name='event',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='event_contact_person', to='event.eventmodel'),
+        ),
+        migrations.AlterField(
+            model_name='eventoccurrence',
+            name='event',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='event.eventmodel'),
+        ),
+        migrations.AddIndex(
+            model_name='eventmodel',
+            index=models.Index(condition=models.Q(('recurrence_frequency__isnull', False)), fields=['start_date'], name='event_recurring_idx'),
+        ),
+    ]
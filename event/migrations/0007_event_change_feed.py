@@ -0,0 +1,37 @@
+# Generated by Django 5.1 on 2026-10-19 17:06
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0006_event_partitioning'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Kind of the deleted row: event or contact_person', max_length=20)),
+                ('object_id', models.BigIntegerField(help_text='Id the deleted row had')),
+                ('event_id', models.BigIntegerField(help_text='Id of the event the deleted row belonged to')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'event_tombstone',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventmodel',
+            index=models.Index(fields=['updated_at', 'id'], name='event_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventtombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='event_tombstone_deleted_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1 on 2026-10-19 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class AlterFieldUnlessPartitioned(migrations.AlterField):
+    """
+    Restores the foreign key constraints to `event` that 0006 dropped, except on
+    databases where `event` is already partitioned and cannot be referenced.
+    """
+
+    @staticmethod
+    def is_partitioned(schema_editor):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('event')")
+            row = cursor.fetchone()
+        return bool(row) and row[0] == "p"
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not self.is_partitioned(schema_editor):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not self.is_partitioned(schema_editor):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0007_event_change_feed'),
+    ]
+
+    operations = [
+        AlterFieldUnlessPartitioned(
+            model_name='eventcontactperson',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='event_contact_person', to='event.eventmodel'),
+        ),
+        AlterFieldUnlessPartitioned(
+            model_name='eventoccurrence',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='event.eventmodel'),
+        ),
+    ]
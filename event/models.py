@@ -1,8 +1,14 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
-from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db.models import Case, ExpressionWrapper, F, Q, Value, When
 
-from base.enum import EventType, EventStatus, EventCategoryEnum, EventSubCategoryEnum
+from base.geohash import MAX_PRECISION as GEOHASH_PRECISION, encode as encode_geohash
+from base.enum import EventType, EventStatus, EventCategoryEnum, EventSubCategoryEnum, RecurrenceFrequency
 from base.models import BaseModel
 from django.utils import timezone
 
@@ -11,6 +17,9 @@ from base.validators import CustomURLValidator
 
 # Create your models here.
 
+# Statuses of events waiting for a moderator.
+MODERATION_QUEUE_STATUSES = [EventStatus.PENDING.value, EventStatus.NEEDS_REVISION.value]
+
 class EventModel(BaseModel):
     title = models.CharField(max_length=255, blank=False, null=False, help_text='Title of the event')
     description = models.TextField(blank=True, null=True, help_text='Description of the event')
@@ -47,6 +56,18 @@ class EventModel(BaseModel):
         max_length=700, blank=True, null=True,
         help_text='Location MAP URL of the event'
     )
+    latitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        help_text='Latitude of the event location'
+    )
+    longitude = models.FloatField(
+        blank=True, null=True, validators=[MinValueValidator(-180), MaxValueValidator(180)],
+        help_text='Longitude of the event location'
+    )
+    geohash = models.CharField(
+        max_length=GEOHASH_PRECISION, blank=True, null=True, editable=False,
+        help_text='Geohash of the event location, kept in sync on save'
+    )
 
     # additional data
     text_color = models.CharField(max_length=10, blank=True, null=True, help_text='Text color code of the event')
@@ -55,13 +76,89 @@ class EventModel(BaseModel):
                               default=EventStatus.PENDING.value, blank=True, null=True, help_text='Status of the event')
     admin_comment = models.TextField(blank=True, null=True, help_text='Admin comment for the event')
 
+    # recurrence
+    recurrence_frequency = models.CharField(
+        max_length=20, choices=RecurrenceFrequency.choices(), blank=True, null=True,
+        help_text='Repeat the event daily, weekly or monthly'
+    )
+    recurrence_interval = models.PositiveSmallIntegerField(default=1, help_text='Repeat every n days, weeks or months')
+    recurrence_until = models.DateField(blank=True, null=True, help_text='Last date an occurrence may start on')
+    recurrence_count = models.PositiveIntegerField(blank=True, null=True, help_text='Number of occurrences')
+    recurrence_exceptions = ArrayField(
+        models.DateField(), default=list, blank=True, help_text='Start dates of skipped occurrences'
+    )
+    occurrences_expanded_until = models.DateField(
+        blank=True, null=True, editable=False, help_text='Last date of the materialized occurrences'
+    )
+
+    # moderation
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True, related_name="claimed_events",
+        help_text='Moderator currently reviewing the event'
+    )
+    claimed_until = models.DateTimeField(blank=True, null=True, help_text='End of the moderator claim')
+
     class Meta:
         db_table = 'event'
+        indexes = [
+            models.Index(
+                fields=["created_at"], name="event_moderation_queue_idx",
+                condition=Q(status__in=MODERATION_QUEUE_STATUSES),
+            ),
+            # varchar_pattern_ops serves the prefix (LIKE 'abc%') scans of the near filter.
+            models.Index(fields=["geohash"], name="event_geohash_idx", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["end_date"], name="event_end_date_idx"),
+            # Serves the change feed, which pages through events by (updated_at, id).
+            models.Index(fields=["updated_at", "id"], name="event_updated_at_idx"),
+            models.Index(
+                fields=["start_date"], name="event_recurring_idx", condition=Q(recurrence_frequency__isnull=False),
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode_geohash(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
 
     @property
     def get_image_name(self):
         return "event"
 
+    @property
+    def is_recurring(self):
+        return bool(self.recurrence_frequency)
+
+    @staticmethod
+    def deletion_time_expression():
+        """
+        Date the retention purge removes the event: EVENT_RETENTION_DAYS after it
+        ended, or after the until date of a recurring series. Count-bounded and
+        open-ended series are kept.
+        """
+        def plus_retention(field):
+            # date + integer is a date in Postgres
+            return ExpressionWrapper(F(field) + Value(settings.EVENT_RETENTION_DAYS), output_field=models.DateField())
+
+        return Case(
+            When(recurrence_frequency__isnull=True, then=plus_retention("end_date")),
+            When(recurrence_until__isnull=False, then=plus_retention("recurrence_until")),
+            default=None,
+            output_field=models.DateField(),
+        )
+
+    @staticmethod
+    def expired_filter(today=None) -> Q:
+        cutoff = (today or timezone.now().date()) - timedelta(days=settings.EVENT_RETENTION_DAYS)
+        return (
+            Q(recurrence_frequency__isnull=True, end_date__lt=cutoff)
+            | Q(recurrence_frequency__isnull=False, recurrence_until__lt=cutoff)
+        )
+
 
     def get_today_events(self):
         return self.active_objects.filter(
@@ -95,6 +192,8 @@ class EventModel(BaseModel):
         )
 
 class EventContactPerson(BaseModel):
+    # partition_events --convert drops the database constraint: a partitioned event
+    # table has no unique index on id alone.
     event = models.ForeignKey(EventModel, on_delete=models.CASCADE, related_name="event_contact_person")
     name = models.CharField(max_length=100, blank=False, null=False, help_text='Name of the person')
     position = models.CharField(max_length=100, blank=True, null=True, help_text='Position of the person')
@@ -112,4 +211,59 @@ class EventContactPerson(BaseModel):
 
     def get_languages(self):
         languages = self.language.split(",")
-        return [language.title() for language in languages]
\ No newline at end of file
+        return [language.title() for language in languages]
+
+
+class EventOccurrence(models.Model):
+    """
+    Materialized occurrence of a recurring event, kept from today up to the rolling
+    EVENT_OCCURRENCE_HORIZON_DAYS. Windows outside it are expanded on the fly.
+    """
+    event = models.ForeignKey(EventModel, on_delete=models.CASCADE, related_name="occurrences")
+    start_date = models.DateField(help_text='Start date of the occurrence')
+    end_date = models.DateField(help_text='End date of the occurrence')
+
+    class Meta:
+        db_table = 'event_occurrence'
+        constraints = [
+            models.UniqueConstraint(fields=["event", "start_date"], name="unique_event_occurrence"),
+        ]
+        indexes = [
+            models.Index(fields=["start_date", "end_date"], name="event_occurrence_dates_idx"),
+        ]
+
+
+class EventArchive(models.Model):
+    """
+    Snapshot of an event removed from the hot `event` table by the retention purge,
+    with its contact persons. Media files are kept and referenced by name.
+    """
+    event_id = models.BigIntegerField(unique=True, help_text='Id the event had in the event table')
+    title = models.CharField(max_length=255, help_text='Title of the event')
+    end_date = models.DateField(blank=True, null=True, help_text='End date of the event')
+    data = models.JSONField(encoder=DjangoJSONEncoder, help_text='Columns of the event and its contact persons')
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = 'event_archive'
+
+
+class EventTombstone(models.Model):
+    """
+    Record of a hard deleted event or contact person, so the change feed can report
+    deletions. Contact persons deleted along with their event get no tombstone of
+    their own. Tombstones are kept for CHANGES_TOMBSTONE_RETENTION_DAYS.
+    """
+    EVENT = "event"
+    CONTACT_PERSON = "contact_person"
+
+    model = models.CharField(max_length=20, help_text='Kind of the deleted row: event or contact_person')
+    object_id = models.BigIntegerField(help_text='Id the deleted row had')
+    event_id = models.BigIntegerField(help_text='Id of the event the deleted row belonged to')
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'event_tombstone'
+        indexes = [
+            models.Index(fields=["deleted_at", "id"], name="event_tombstone_deleted_idx"),
+        ]
@@ -0,0 +1,253 @@
+"""
+Range partitioning of the `event` table by `start_date`, one partition per year or
+quarter plus a default partition for rows without a start date or outside every
+range. The ORM is unaware of it: `id` stays unique through its sequence, and
+queries with start_date bounds only scan the matching partitions.
+
+Postgres requires unique constraints of a partitioned table to include the
+partition key, so `id` is enforced unique together with `start_date`, and the
+conversion drops the database constraints of the foreign keys to `event`, which
+then exist only at the Django level.
+"""
+from datetime import date
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from event.models import EventContactPerson, EventModel, EventOccurrence, EventTombstone
+
+TABLE = EventModel._meta.db_table
+CONTACT_PERSON_TABLE = EventContactPerson._meta.db_table
+OCCURRENCE_TABLE = EventOccurrence._meta.db_table
+TOMBSTONE_TABLE = EventTombstone._meta.db_table
+LEGACY_TABLE = f"{TABLE}_unpartitioned"
+DEFAULT_PARTITION = f"{TABLE}_default"
+SEQUENCE = f"{TABLE}_id_seq"
+YEAR = "year"
+QUARTER = "quarter"
+INTERVALS = (YEAR, QUARTER)
+
+
+class Partition(NamedTuple):
+    name: str
+    start: date
+    end: date  # exclusive
+
+
+def quote(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def period(day: date, interval: str = None) -> Partition:
+    """
+    Partition that holds `day`.
+    """
+    interval = interval or settings.EVENT_PARTITION_INTERVAL
+    if interval == YEAR:
+        return Partition(f"{TABLE}_y{day.year}", date(day.year, 1, 1), date(day.year + 1, 1, 1))
+    quarter = (day.month - 1) // 3
+    start = date(day.year, quarter * 3 + 1, 1)
+    end = date(day.year + 1, 1, 1) if quarter == 3 else date(day.year, quarter * 3 + 4, 1)
+    return Partition(f"{TABLE}_y{day.year}q{quarter + 1}", start, end)
+
+
+def periods(first: date, last: date, interval: str = None) -> list:
+    """
+    Consecutive partitions covering `first` to `last`.
+    """
+    partitions = [period(first, interval)]
+    while partitions[-1].end <= last:
+        partitions.append(period(partitions[-1].end, interval))
+    return partitions
+
+
+def is_partitioned(cursor) -> bool:
+    cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [TABLE])
+    row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def existing_partitions(cursor) -> list:
+    """
+    `(name, bound)` of every attached partition, e.g.
+    ("event_y2026", "FOR VALUES FROM ('2026-01-01') TO ('2027-01-01')").
+    """
+    cursor.execute(
+        """
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        ORDER BY child.relname
+        """,
+        [TABLE],
+    )
+    return cursor.fetchall()
+
+
+def create_partition(cursor, partition: Partition):
+    """
+    Attach a partition for `partition`'s range. Rows already in the default
+    partition for that range are moved into it first, which Postgres requires.
+    """
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [partition.name])
+    if cursor.fetchone()[0]:
+        return False
+    name = quote(partition.name)
+    cursor.execute(f"CREATE TABLE {name} (LIKE {quote(TABLE)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} WHERE start_date >= %s AND start_date < %s RETURNING *)"
+        f" INSERT INTO {name} SELECT * FROM moved",
+        [partition.start, partition.end],
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)",
+        [partition.start, partition.end],
+    )
+    return True
+
+
+def premake(count: int, today: date = None, interval: str = None) -> list:
+    """
+    Create the current partition and the next `count` ones. Returns the names of
+    the partitions that were created.
+    """
+    today = today or date.today()
+    created = []
+    partition = period(today, interval)
+    for _ in range(count + 1):
+        with transaction.atomic(), connection.cursor() as cursor:
+            if create_partition(cursor, partition):
+                created.append(partition.name)
+        partition = period(partition.end, interval)
+    return created
+
+
+def running_events(cursor, name: str, cutoff: date) -> int:
+    """
+    Events of partition `name` that still run on `cutoff`: ending on or after it,
+    or recurring without an until date before it.
+    """
+    cursor.execute(
+        f"SELECT COUNT(*) FROM {quote(name)} WHERE end_date >= %s"
+        f" OR (recurrence_frequency IS NOT NULL AND (recurrence_until IS NULL OR recurrence_until >= %s))",
+        [cutoff, cutoff],
+    )
+    return cursor.fetchone()[0]
+
+
+def retire_children(cursor, name: str, drop: bool):
+    """
+    Take the rows that belong to the events of partition `name` out of the live
+    tables, which no longer have database constraints to cascade from `event`.
+    Contact persons are kept next to a detached partition as `<name>_contact_person`
+    unless it is dropped; occurrences are derived and deleted. The events get a
+    tombstone so change feed clients drop them.
+    """
+    events = f"SELECT id FROM {quote(name)}"
+    if not drop:
+        cursor.execute(
+            f"CREATE TABLE {quote(name + '_contact_person')} AS"
+            f" SELECT * FROM {quote(CONTACT_PERSON_TABLE)} WHERE event_id IN ({events})"
+        )
+    cursor.execute(f"DELETE FROM {quote(CONTACT_PERSON_TABLE)} WHERE event_id IN ({events})")
+    cursor.execute(f"DELETE FROM {quote(OCCURRENCE_TABLE)} WHERE event_id IN ({events})")
+    cursor.execute(
+        f"INSERT INTO {quote(TOMBSTONE_TABLE)} (model, object_id, event_id, deleted_at)"
+        f" SELECT %s, id, id, %s FROM {quote(name)}",
+        [EventTombstone.EVENT, timezone.now()],
+    )
+
+
+def detach_before(cutoff: date, drop: bool = False) -> tuple:
+    """
+    Detach (and optionally drop) the partitions that end on or before `cutoff`,
+    with their events' contact persons and occurrences. A detached partition is an
+    ordinary table that can be archived or dropped later. Partitions holding events
+    that still run on `cutoff` are skipped. Returns the names of the detached and
+    of the skipped partitions.
+    """
+    detached, skipped = [], []
+    with connection.cursor() as cursor:
+        partitions = existing_partitions(cursor)
+    for name, bound in partitions:
+        if name == DEFAULT_PARTITION:
+            continue
+        end = date.fromisoformat(bound.rsplit("'", 2)[-2])
+        if end > cutoff:
+            continue
+        with transaction.atomic(), connection.cursor() as cursor:
+            # Detaching locks the table anyway; taking the lock first keeps events
+            # from being added to the partition after it was checked.
+            cursor.execute(f"LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE")
+            if running_events(cursor, name, cutoff):
+                skipped.append(name)
+                continue
+            retire_children(cursor, name, drop)
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+        detached.append(name)
+    return detached, skipped
+
+
+def convert(interval: str = None, premake_count: int = None, today: date = None):
+    """
+    Rebuild `event` as a partitioned table in one transaction. The table is locked
+    for the duration of the copy, so run it in a maintenance window.
+    """
+    premake_count = settings.EVENT_PARTITION_PREMAKE if premake_count is None else premake_count
+    today = today or date.today()
+    table, legacy = quote(TABLE), quote(LEGACY_TABLE)
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            raise ValueError(f"'{TABLE}' is already partitioned.")
+        cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+            [TABLE],
+        )
+        indexes = [(name, definition) for name, definition in cursor.fetchall() if name != f"{TABLE}_pkey"]
+        cursor.execute(f"SELECT MIN(start_date), MAX(start_date), COALESCE(MAX(id), 0) FROM {table}")
+        first, last, max_id = cursor.fetchone()
+
+        # A partitioned table has no unique index on id alone for them to reference.
+        # Deferred checks of earlier writes in the transaction would block dropping.
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint WHERE contype = 'f' AND confrelid = %s::regclass",
+            [TABLE],
+        )
+        for referencing, constraint in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {referencing} DROP CONSTRAINT {quote(constraint)}")
+
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {quote(name)} RENAME TO {quote(name + '_unpartitioned')}")
+
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+            f" PARTITION BY RANGE (start_date)"
+        )
+        cursor.execute(f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT")
+        for partition in periods(first or today, max(last or today, today), interval):
+            create_partition(cursor, partition)
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {legacy}")
+
+        # Indexes are built after the copy, which is faster than maintaining them row by row.
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {quote(TABLE + '_id_start_date_key')} UNIQUE (id, start_date)")
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        # Dropping the old table also drops its identity sequence.
+        cursor.execute(f"DROP TABLE {legacy}")
+        # Identity columns are not supported on partitioned tables before Postgres
+        # 17, so `id` draws from a plain sequence instead.
+        cursor.execute(f"CREATE SEQUENCE {quote(SEQUENCE)} AS bigint OWNED BY {table}.id")
+        cursor.execute("SELECT setval(%s, %s, %s)", [SEQUENCE, max(max_id, 1), max_id > 0])
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval(%s::regclass)", [SEQUENCE])
+    premake(premake_count, today, interval)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {table}")
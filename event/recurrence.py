@@ -0,0 +1,176 @@
+"""
+Expansion of recurring events, a subset of RFC 5545 RRULE: daily, weekly or monthly
+frequency with an interval, bounded by an until date or an occurrence count, minus
+exception dates. A series is stored as one EventModel row whose start and end dates
+are its first occurrence; later occurrences keep the same duration.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from base.enum import RecurrenceFrequency
+from event.models import EventModel, EventOccurrence
+
+
+def occurrence_horizon() -> date:
+    """
+    Last date covered by the materialized occurrences.
+    """
+    return now().date() + timedelta(days=settings.EVENT_OCCURRENCE_HORIZON_DAYS)
+
+
+def _candidate(event, index: int):
+    """
+    Start date of the `index`th repetition of the series, as `(anchor, start)`. The
+    anchor bounds the search; `start` is None for months without that day, which
+    RRULE skips (e.g. the 31st of a monthly series in April).
+    """
+    first = event.start_date
+    step = index * event.recurrence_interval
+    if event.recurrence_frequency == RecurrenceFrequency.DAILY.value:
+        start = first + timedelta(days=step)
+        return start, start
+    if event.recurrence_frequency == RecurrenceFrequency.WEEKLY.value:
+        start = first + timedelta(weeks=step)
+        return start, start
+    year, month = divmod(first.month - 1 + step, 12)
+    anchor = date(first.year + year, month + 1, 1)
+    try:
+        return anchor, anchor.replace(day=first.day)
+    except ValueError:
+        return anchor, None
+
+
+def _first_index(event, earliest: date) -> int:
+    """
+    Index of the first repetition that may start on or after `earliest`.
+    """
+    first, interval = event.start_date, event.recurrence_interval
+    if earliest <= first:
+        return 0
+    if event.recurrence_frequency == RecurrenceFrequency.DAILY.value:
+        return (earliest - first).days // interval
+    if event.recurrence_frequency == RecurrenceFrequency.WEEKLY.value:
+        return (earliest - first).days // (7 * interval)
+    return ((earliest.year - first.year) * 12 + earliest.month - first.month) // interval
+
+
+def iter_occurrences(event, start: date = None, end: date = None):
+    """
+    Yield `(start_date, end_date)` of every occurrence overlapping `[start, end]`.
+    Unbounded series need an `end`.
+    """
+    if not event.start_date:
+        return
+    span = (event.end_date or event.start_date) - event.start_date
+    if not event.is_recurring:
+        if (start is None or event.start_date + span >= start) and (end is None or event.start_date <= end):
+            yield event.start_date, event.start_date + span
+        return
+
+    until, count = event.recurrence_until, event.recurrence_count
+    if end is None and until is None and count is None:
+        raise ValueError("An end date is required to expand an unbounded series.")
+    exceptions = set(event.recurrence_exceptions or [])
+
+    # Occurrences are numbered from the first one when a count applies, otherwise
+    # the expansion jumps straight to the window.
+    index = _first_index(event, start - span) if start and count is None else 0
+    emitted = 0
+    while True:
+        anchor, occurrence = _candidate(event, index)
+        index += 1
+        if (until and anchor > until) or (end and anchor > end):
+            return
+        if occurrence is None or (until and occurrence > until):
+            continue
+        if count is not None:
+            if emitted >= count:
+                return
+            emitted += 1
+        if occurrence in exceptions or (start and occurrence + span < start):
+            continue
+        if end and occurrence > end:
+            return
+        yield occurrence, occurrence + span
+
+
+def expand_series(events, start: date = None, end: date = None) -> list:
+    """
+    Expand recurring events into `(event, start_date, end_date)` for the window.
+    Without a window the expansion stops at the occurrence horizon.
+    """
+    end = end or occurrence_horizon()
+    return [
+        (event, occurrence_start, occurrence_end)
+        for event in events
+        for occurrence_start, occurrence_end in iter_occurrences(event, start, end)
+    ]
+
+
+def serialize_occurrences(serializer_class, occurrences, context=None) -> list:
+    """
+    Serialize each series once and repeat it per occurrence with that occurrence's
+    dates, so calendars can place every occurrence.
+    """
+    serialized = {}
+    data = []
+    for event, start_date, end_date in occurrences:
+        if event.pk not in serialized:
+            serialized[event.pk] = serializer_class(event, context=context).data
+        data.append({
+            **serialized[event.pk],
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        })
+    return data
+
+
+def calendar_entries(serializer_class, events, window=None, context=None) -> list:
+    """
+    Calendar response for the events of a CalendarFilters query: one-off events as
+    they are, recurring series as one entry per occurrence in the window.
+    """
+    one_off = [event for event in events if not event.is_recurring]
+    series = [event for event in events if event.is_recurring]
+    start, end = window or (None, None)
+    return (
+        serializer_class(one_off, many=True, context=context).data
+        + serialize_occurrences(serializer_class, expand_series(series, start, end), context)
+    )
+
+
+def occurrence_rows(event, horizon: date, rebuild: bool = False) -> list:
+    """
+    EventOccurrence rows to add for one series: everything from today when
+    rebuilding, otherwise only what lies past its current expansion.
+    """
+    today = now().date()
+    if rebuild or event.occurrences_expanded_until is None:
+        occurrences = iter_occurrences(event, today, horizon)
+    else:
+        after = event.occurrences_expanded_until
+        occurrences = (
+            (start, end) for start, end in iter_occurrences(event, after + timedelta(days=1), horizon) if start > after
+        )
+    return [EventOccurrence(event=event, start_date=start, end_date=end) for start, end in occurrences]
+
+
+def refresh_occurrences(event, rebuild: bool = True):
+    """
+    Re-materialize the occurrences of one event, e.g. after it was saved.
+    """
+    if not event.is_recurring:
+        if event.occurrences_expanded_until is not None:
+            EventOccurrence.objects.filter(event=event).delete()
+            EventModel.objects.filter(pk=event.pk).update(occurrences_expanded_until=None)
+            event.occurrences_expanded_until = None
+        return
+
+    horizon = occurrence_horizon()
+    if rebuild:
+        EventOccurrence.objects.filter(event=event).delete()
+    EventOccurrence.objects.bulk_create(occurrence_rows(event, horizon, rebuild), ignore_conflicts=True)
+    EventModel.objects.filter(pk=event.pk).update(occurrences_expanded_until=horizon)
+    event.occurrences_expanded_until = horizon
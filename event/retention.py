@@ -0,0 +1,78 @@
+import logging
+
+from django.db import models, transaction
+
+from event.models import EventArchive, EventContactPerson, EventModel
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE = "archive"
+DELETE = "delete"
+RETENTION_MODES = (ARCHIVE, DELETE)
+
+
+def snapshot(event, contact_persons) -> dict:
+    """
+    Column values of an event and its contact persons, as stored in the archive.
+    """
+    def to_json(instance):
+        return {
+            field.attname: getattr(instance, field.attname).name if isinstance(field, models.FileField)
+            else getattr(instance, field.attname)
+            for field in instance._meta.concrete_fields
+        }
+
+    return {
+        **to_json(event),
+        "contact_person": [to_json(contact) for contact in contact_persons],
+    }
+
+
+def media_files(event, contact_persons) -> list:
+    files = [event.event_image] + [contact.photo for contact in contact_persons]
+    return [file for file in files if file and file.name]
+
+
+def purge_batch(mode: str, batch_size: int, today=None) -> int:
+    """
+    Remove one batch of expired events in a short transaction and return how many
+    went. Rows locked by a concurrent writer are skipped and picked up by a later
+    run. Media files are only deleted once the transaction committed.
+    """
+    with transaction.atomic():
+        events = list(
+            EventModel.objects.filter(EventModel.expired_filter(today))
+            .select_for_update(skip_locked=True)
+            .order_by("end_date", "id")[:batch_size]
+        )
+        if not events:
+            return 0
+        ids = [event.id for event in events]
+        contacts = {}
+        for contact in EventContactPerson.objects.filter(event_id__in=ids):
+            contacts.setdefault(contact.event_id, []).append(contact)
+
+        if mode == ARCHIVE:
+            EventArchive.objects.bulk_create([
+                EventArchive(
+                    event_id=event.id, title=event.title, end_date=event.end_date,
+                    data=snapshot(event, contacts.get(event.id, [])),
+                )
+                for event in events
+            ], ignore_conflicts=True)
+        else:
+            files = [file for event in events for file in media_files(event, contacts.get(event.id, []))]
+            transaction.on_commit(lambda: delete_files(files))
+
+        # A queryset delete cascades to contact persons and occurrences without
+        # DeepDeleteMixin, so archived media stays in storage.
+        EventModel.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+def delete_files(files):
+    for file in files:
+        try:
+            file.storage.delete(file.name)
+        except Exception as e:
+            logger.warning("Could not delete '%s': %s", file.name, e)
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from django.conf import settings
 from rest_framework import serializers
 
 from base.enum import EventStatus, EventType
@@ -18,8 +19,34 @@ class EventCreateSerializer(serializers.ModelSerializer):
         exclude = [
             "is_active",
             "status",
-            "admin_comment"
+            "admin_comment",
+            "claimed_by",
+            "claimed_until",
+            "occurrences_expanded_until",
+            "geohash",
         ]
+        extra_kwargs = {
+            "recurrence_interval": {"min_value": 1},
+        }
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        start_date, end_date = attrs.get("start_date"), attrs.get("end_date")
+        if start_date and end_date and (end_date - start_date).days > settings.EVENT_MAX_DURATION_DAYS:
+            # Calendar queries rely on this bound to prune by start_date.
+            raise serializers.ValidationError(
+                f"An event cannot last longer than {settings.EVENT_MAX_DURATION_DAYS} days."
+            )
+        if (attrs.get("latitude") is None) != (attrs.get("longitude") is None):
+            raise serializers.ValidationError("Provide both latitude and longitude, or neither.")
+        if not attrs.get("recurrence_frequency"):
+            return attrs
+        until = attrs.get("recurrence_until")
+        if until and attrs.get("recurrence_count"):
+            raise serializers.ValidationError("Set either recurrence_until or recurrence_count, not both.")
+        if until and until < attrs["start_date"]:
+            raise serializers.ValidationError("Recurrence until date cannot be before the start date.")
+        return attrs
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -28,9 +55,19 @@ class EventSerializer(serializers.ModelSerializer):
     def get_deletion_time(self, obj) -> Optional[str]:
         return obj.deletion_time if hasattr(obj, "deletion_time") else None
 
+    distance_km = serializers.SerializerMethodField(read_only=True)
+
+    def get_distance_km(self, obj) -> Optional[float]:
+        return round(obj.distance_km, 3) if hasattr(obj, "distance_km") else None
+
     class Meta:
         model = EventModel
-        fields = "__all__"
+        exclude = [
+            "claimed_by",
+            "claimed_until",
+            "occurrences_expanded_until",
+            "geohash",
+        ]
 
 
 class EventDetailsSerializer(EventSerializer):
@@ -42,7 +79,12 @@ class EventDetailsSerializer(EventSerializer):
 
     class Meta:
         model = EventModel
-        fields = "__all__"
+        exclude = [
+            "claimed_by",
+            "claimed_until",
+            "occurrences_expanded_until",
+            "geohash",
+        ]
 
 class EventUpdateAdminSerializer(serializers.ModelSerializer):
     class Meta:
@@ -50,4 +92,34 @@ class EventUpdateAdminSerializer(serializers.ModelSerializer):
         fields = [
             "status",
             "admin_comment"
-        ]
\ No newline at end of file
+        ]
+
+
+class EventModerationClaimSerializer(serializers.Serializer):
+    batch_size = serializers.IntegerField(min_value=1, max_value=100, required=False)
+
+
+class EventModerationTransitionSerializer(EventUpdateAdminSerializer):
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(
+        choices=[EventStatus.APPROVED.value, EventStatus.REJECTED.value, EventStatus.NEEDS_REVISION.value]
+    )
+
+    class Meta(EventUpdateAdminSerializer.Meta):
+        fields = [
+            "ids",
+            "status",
+            "admin_comment"
+        ]
+
+
+class EventChangesSerializer(serializers.Serializer):
+    cursor = serializers.CharField(help_text="Pass as `since` on the next sync")
+    has_more = serializers.BooleanField(help_text="More changes are waiting; sync again right away")
+    created = serializers.ListField(child=serializers.IntegerField(), help_text="Ids of the events created")
+    updated = serializers.ListField(child=serializers.IntegerField(), help_text="Ids of the events updated")
+    deleted = serializers.DictField(
+        child=serializers.ListField(child=serializers.IntegerField()),
+        help_text="Ids of the deleted rows by kind: event and contact_person",
+    )
+    results = EventDetailsSerializer(many=True, help_text="Rows of the created and updated events")
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from event.models import EventContactPerson, EventModel, EventTombstone
+
+
+@receiver(post_delete, sender=EventModel, dispatch_uid="event_tombstone")
+def bury_event(sender, instance, **kwargs):
+    EventTombstone.objects.create(model=EventTombstone.EVENT, object_id=instance.pk, event_id=instance.pk)
+
+
+@receiver(post_delete, sender=EventContactPerson, dispatch_uid="event_contact_person_tombstone")
+def bury_contact_person(sender, instance, origin=None, **kwargs):
+    # Clients drop the contact persons of a deleted event with the event itself.
+    origin_model = getattr(origin, "model", type(origin))
+    if origin_model is EventModel:
+        return
+    EventTombstone.objects.create(
+        model=EventTombstone.CONTACT_PERSON, object_id=instance.pk, event_id=instance.event_id
+    )
@@ -1,3 +1,644 @@
-from django.test import TestCase
+import io
+import threading
+from unittest import mock
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from base import geohash
+from base.enum import EventStatus, EventType, RecurrenceFrequency
+from base.testing import assert_max_queries, assert_no_n_plus_one
+from event import partitioning
+from event.changes import Cursor, encode_cursor
+from event.management.commands.seed_events import copy_rows, copy_value
+from event import retention
+from event.models import EventArchive, EventContactPerson, EventModel, EventOccurrence, EventTombstone
+from event.recurrence import iter_occurrences, occurrence_horizon
+from event.views.common import CommonEventViewSet
+
+
+def make_event(**fields):
+    fields = {
+        "title": "Open house",
+        "event_type": EventType.OFFLINE.value,
+        "status": EventStatus.APPROVED.value,
+        "start_date": date(2026, 5, 1),
+        "end_date": date(2026, 5, 2),
+        **fields,
+    }
+    return EventModel.objects.create(**fields)
+
+
+def event_payload(**fields):
+    """
+    Body of a valid event write through the JSON API.
+    """
+    return {
+        "title": "Open house",
+        "event_type": EventType.OFFLINE.value,
+        "start_date": "2026-05-01",
+        "end_date": "2026-05-01",
+        "is_all_day": True,
+        "location": "Main street 1",
+        "country": "Bangladesh",
+        "district": "Dhaka",
+        "city": "Dhaka",
+        "category": ["real_estate"],
+        "sub_category": ["property_showcase_launch"],
+        "contact_person": [{"name": "Agent", "email": "agent@example.com", "contact_number": "123"}],
+        **fields,
+    }
+
+
+def add_contact_person(event, **fields):
+    fields = {"name": "Agent", "email": "agent@example.com", "contact_number": "123", "company": "", **fields}
+    return EventContactPerson.objects.create(event=event, **fields)
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class PublicEventQueriesTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.events = [make_event(title=f"Open house {number}") for number in range(5)]
+        for event in self.events:
+            add_contact_person(event)
+            add_contact_person(event)
+
+    def test_list_within_budget(self):
+        with assert_max_queries(CommonEventViewSet.query_budget["list"]), assert_no_n_plus_one():
+            response = self.client.get("/events/public/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_retrieve_within_budget(self):
+        with assert_max_queries(CommonEventViewSet.query_budget["retrieve"]):
+            response = self.client.get(f"/events/public/{self.events[0].pk}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["contact_person"]), 2)
+
+    def test_assert_max_queries_fails_over_the_limit(self):
+        with self.assertRaises(AssertionError):
+            with assert_max_queries(0):
+                self.client.get("/events/public/")
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class EventJsonWriteTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, **fields):
+        return self.client.post("/events/user/", event_payload(**fields), format="json")
+
+    def test_create_from_json(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 201, response.content)
+        event = EventModel.objects.get()
+        self.assertEqual(event.category, ["real_estate"])
+        self.assertEqual(event.event_contact_person.count(), 1)
+
+    def test_rejects_malformed_shapes_by_field(self):
+        for field, value, error in [
+            ("contact_person", ["x"], "Contact person: Expected an object"),
+            ("category", [1], "Category: Expected a list of strings"),
+            ("sub_category", {"a": 1}, "Sub category: Expected a list of strings"),
+            ("start_date", 20260501, "Start date: Expected a string"),
+        ]:
+            with self.subTest(field=field):
+                response = self.post(**{field: value})
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(response.json()["data"][0].startswith(error), response.content)
+        self.assertFalse(EventModel.objects.exists())
+
+
+@override_settings(THROTTLE_ENABLED=False, CHANGES_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.since = encode_cursor(Cursor(timezone.now() - timedelta(seconds=1)))
+
+    def feed(self, since=None, **params):
+        response = self.client.get("/events/public/changes/", {"since": since or self.since, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_reports_created_events_with_their_rows(self):
+        event = make_event(end_date=date.today())
+        add_contact_person(event)
+        feed = self.feed()
+        self.assertEqual(feed["created"], [event.pk])
+        self.assertEqual(len(feed["results"][0]["contact_person"]), 1)
+        self.assertIsNotNone(feed["results"][0]["deletion_time"])
+        self.assertFalse(feed["has_more"])
+        self.assertEqual(self.feed(feed["cursor"])["created"], [])
+
+    def test_pages_through_events_stamped_alike(self):
+        events = [make_event() for _ in range(5)]
+        stamp = timezone.now()
+        EventModel.objects.filter(pk__in=[event.pk for event in events]).update(updated_at=stamp)
+        EventTombstone.objects.create(model=EventTombstone.EVENT, object_id=0, event_id=0, deleted_at=stamp)
+
+        seen, deleted, cursor, pages = [], [], self.since, 0
+        while True:
+            feed = self.feed(cursor, limit=2)
+            seen += feed["created"] + feed["updated"]
+            deleted += feed["deleted"]["event"]
+            cursor, pages = feed["cursor"], pages + 1
+            if not feed["has_more"]:
+                break
+        self.assertEqual(seen, [event.pk for event in events])
+        self.assertEqual(deleted, [0])
+        self.assertEqual(pages, 3)
+
+    def test_holds_back_unsettled_changes(self):
+        make_event()
+        with override_settings(CHANGES_SETTLE_SECONDS=60):
+            feed = self.feed()
+        self.assertEqual(feed["created"], [])
+        self.assertEqual(feed["cursor"], self.since)
+
+    def test_destroy_records_only_the_event(self):
+        event = make_event()
+        add_contact_person(event)
+        since = self.feed()["cursor"]
+        response = self.client.delete(f"/events/user/{event.pk}/")
+        self.assertEqual(response.status_code, 204, response.content)
+        feed = self.feed(since)
+        self.assertEqual(feed["deleted"], {"event": [event.pk], "contact_person": []})
+        self.assertEqual(feed["created"] + feed["updated"], [])
+
+    def test_removed_contact_person_is_recorded(self):
+        self.assertEqual(self.client.post("/events/user/", event_payload(), format="json").status_code, 201)
+        event = EventModel.objects.get()
+        kept = event.event_contact_person.get()
+        removed = add_contact_person(event, name="Former agent")
+        since = self.feed()["cursor"]
+
+        contact = {"id": kept.pk, "name": kept.name, "email": kept.email, "contact_number": kept.contact_number}
+        response = self.client.put(f"/events/user/{event.pk}/", event_payload(contact_person=[contact]), format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        feed = self.feed(since)
+        self.assertEqual(feed["updated"], [event.pk])
+        self.assertEqual(feed["deleted"], {"event": [], "contact_person": [removed.pk]})
+
+    def test_expired_and_invalid_cursors(self):
+        expired = encode_cursor(Cursor(timezone.now() - timedelta(days=31)))
+        with override_settings(CHANGES_TOMBSTONE_RETENTION_DAYS=30):
+            self.assertEqual(self.client.get("/events/public/changes/", {"since": expired}).status_code, 410)
+        self.assertEqual(self.client.get("/events/public/changes/", {"since": "soon"}).status_code, 400)
+
+    def test_prune_keeps_recent_tombstones(self):
+        EventTombstone.objects.create(
+            model=EventTombstone.EVENT, object_id=1, event_id=1, deleted_at=timezone.now() - timedelta(days=40)
+        )
+        recent = EventTombstone.objects.create(model=EventTombstone.EVENT, object_id=2, event_id=2)
+        with override_settings(CHANGES_TOMBSTONE_RETENTION_DAYS=30):
+            call_command("prune_tombstones", batch_size=1, stdout=io.StringIO())
+        self.assertEqual(list(EventTombstone.objects.values_list("pk", flat=True)), [recent.pk])
+
+
+class PartitioningTests(TestCase):
+    def setUp(self):
+        self.past = make_event(start_date=date(2022, 3, 1), end_date=date(2022, 3, 2))
+        self.contact = add_contact_person(self.past)
+        EventOccurrence.objects.create(event=self.past, start_date=date(2022, 3, 1), end_date=date(2022, 3, 2))
+        # Started in 2023 but repeats forever.
+        self.series = make_event(
+            start_date=date(2023, 6, 1), end_date=date(2023, 6, 1),
+            recurrence_frequency=RecurrenceFrequency.WEEKLY.value,
+        )
+        partitioning.convert(partitioning.YEAR, premake_count=0, today=date(2026, 5, 1))
+
+    def table_exists(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+            return cursor.fetchone()[0]
+
+    def test_convert_drops_the_foreign_key_constraints(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM pg_constraint WHERE contype = 'f' AND confrelid = %s::regclass", ["event"])
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_detach_retires_children_and_records_tombstones(self):
+        detached, skipped = partitioning.detach_before(date(2024, 1, 1))
+        self.assertEqual(detached, ["event_y2022"])
+        self.assertEqual(skipped, ["event_y2023"])
+        self.assertFalse(EventModel.objects.filter(pk=self.past.pk).exists())
+        self.assertTrue(EventModel.objects.filter(pk=self.series.pk).exists())
+        self.assertFalse(EventContactPerson.objects.filter(event_id=self.past.pk).exists())
+        self.assertFalse(EventOccurrence.objects.filter(event_id=self.past.pk).exists())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM event_y2022_contact_person")
+            self.assertEqual(cursor.fetchall(), [(self.contact.pk,)])
+        self.assertEqual(
+            list(EventTombstone.objects.values_list("model", "object_id")), [(EventTombstone.EVENT, self.past.pk)]
+        )
+
+    def test_detach_with_drop_keeps_nothing(self):
+        partitioning.detach_before(date(2024, 1, 1), drop=True)
+        self.assertFalse(self.table_exists("event_y2022"))
+        self.assertFalse(self.table_exists("event_y2022_contact_person"))
+        self.assertFalse(EventContactPerson.objects.filter(event_id=self.past.pk).exists())
+
+
+class CopyValueTests(SimpleTestCase):
+    def test_escapes_the_text_format(self):
+        self.assertEqual(copy_value("a\tb\nc\rd\\e"), "a\\tb\\nc\\rd\\\\e")
+        self.assertEqual([copy_value(value) for value in (None, True, False, 3)], ["\\N", "t", "f", "3"])
+        self.assertEqual(copy_value(date(2026, 5, 1)), "2026-05-01")
+
+    def test_quotes_array_items(self):
+        self.assertEqual(copy_value([]), "{}")
+        self.assertEqual(copy_value(["a", "b,c"]), '{"a","b,c"}')
+        self.assertEqual(copy_value(['say "hi"']), '{"say \\\\"hi\\\\""}')
+
+
+class CopyRowsTests(TestCase):
+    def test_values_survive_a_round_trip(self):
+        rows = [
+            ("tab\there", ["plain", "comma,item"]),
+            ("new\nline\r", ['quote"item', "back\\slash", "tab\titem", "{brace}"]),
+            ("back\\slash \\N", []),
+            (None, None),
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE copy_probe (id serial, text_value text, list_value varchar[])")
+            copy_rows(
+                cursor, "copy_probe", ["text_value", "list_value"],
+                (f"{copy_value(text)}\t{copy_value(items)}\n" for text, items in rows),
+            )
+            cursor.execute("SELECT text_value, list_value FROM copy_probe ORDER BY id")
+            self.assertEqual([tuple(row) for row in cursor.fetchall()], rows)
+
+
+class SeedEventsTests(TransactionTestCase):
+    def seed(self, workers):
+        call_command(
+            "seed_events", events=25, chunk_size=7, seed=3, workers=workers, today=date(2026, 5, 1),
+            no_analyze=True, stdout=io.StringIO(),
+        )
+        events = list(EventModel.objects.order_by("id").values())
+        first_id = events[0]["id"]
+        contacts = list(EventContactPerson.objects.order_by("event_id", "id").values())
+        for row in events + contacts:
+            row.pop("id"), row.pop("created_at"), row.pop("updated_at")
+        for row in contacts:
+            row["event_id"] -= first_id
+        EventModel.objects.all().delete()
+        return events, contacts
+
+    def test_rows_do_not_depend_on_the_workers(self):
+        events, contacts = self.seed(workers=1)
+        self.assertEqual(len(events), 25)
+        self.assertTrue(contacts)
+        self.assertEqual(self.seed(workers=2), (events, contacts))
+
+
+def make_moderator(username):
+    return get_user_model().objects.create_user(username=username, password="Moderator-p4ss!", is_staff=True)
+
+
+@override_settings(THROTTLE_ENABLED=False, MODERATION_LEASE_SECONDS=900)
+class ModerationQueueTests(TestCase):
+    def setUp(self):
+        self.events = [make_event(title=f"Queued {number}", status=EventStatus.PENDING.value) for number in range(4)]
+        self.first, self.second = APIClient(), APIClient()
+        self.first.force_authenticate(make_moderator("first"))
+        self.second.force_authenticate(make_moderator("second"))
+
+    def claim(self, client, batch_size=2):
+        response = client.post("/events/moderation/claim/", {"batch_size": batch_size}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return [event["id"] for event in response.json()["results"]]
+
+    def transition(self, client, ids, **fields):
+        response = client.post("/events/moderation/transition/", {"ids": ids, **fields}, format="json")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_moderators_claim_disjoint_batches(self):
+        first = self.claim(self.first)
+        self.assertEqual(first, [event.pk for event in self.events[:2]])
+        self.assertEqual(self.claim(self.second), [event.pk for event in self.events[2:]])
+        self.assertEqual(self.claim(self.second, batch_size=10), [event.pk for event in self.events[2:]])
+        # A moderator claiming again keeps their own batch.
+        self.assertEqual(self.claim(self.first), first)
+
+    def test_lapsed_claims_return_to_the_queue(self):
+        first = self.claim(self.first, batch_size=4)
+        EventModel.objects.filter(pk=first[0]).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.claim(self.second), [first[0]])
+
+    def test_transition_skips_events_claimed_by_another_moderator(self):
+        mine, theirs = self.claim(self.first), self.claim(self.second)
+        result = self.transition(self.first, mine + theirs, status=EventStatus.APPROVED.value)
+        self.assertEqual((result["updated"], result["skipped"]), (2, 2))
+        statuses = dict(EventModel.objects.values_list("id", "status"))
+        self.assertEqual({statuses[pk] for pk in mine}, {EventStatus.APPROVED.value})
+        self.assertEqual({statuses[pk] for pk in theirs}, {EventStatus.PENDING.value})
+        self.assertFalse(EventModel.objects.filter(pk__in=mine, claimed_by__isnull=False).exists())
+
+    def test_transition_keeps_the_comment_unless_given(self):
+        EventModel.objects.update(admin_comment="Add a venue")
+        self.transition(self.first, [self.events[0].pk], status=EventStatus.NEEDS_REVISION.value)
+        self.transition(self.first, [self.events[1].pk], status=EventStatus.REJECTED.value, admin_comment="Spam")
+        comments = dict(EventModel.objects.values_list("id", "admin_comment"))
+        self.assertEqual(comments[self.events[0].pk], "Add a venue")
+        self.assertEqual(comments[self.events[1].pk], "Spam")
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class ModerationClaimLockTests(TransactionTestCase):
+    def test_claim_skips_rows_locked_by_another_transaction(self):
+        locked, free = (make_event(title=title, status=EventStatus.PENDING.value) for title in ("Locked", "Free"))
+        is_locked, release = threading.Event(), threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    EventModel.objects.select_for_update().get(pk=locked.pk)
+                    is_locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        try:
+            self.assertTrue(is_locked.wait(10))
+            client = APIClient()
+            client.force_authenticate(make_moderator("moderator"))
+            response = client.post("/events/moderation/claim/", {"batch_size": 5}, format="json")
+        finally:
+            release.set()
+            holder.join()
+        self.assertEqual([event["id"] for event in response.json()["results"]], [free.pk])
+
+
+def make_series(frequency, start_date=date(2026, 5, 1), **fields):
+    return EventModel(
+        title="Series", start_date=start_date, end_date=fields.pop("end_date", start_date),
+        recurrence_frequency=frequency.value, **fields,
+    )
+
+
+def starts(event, start=None, end=None):
+    return [occurrence for occurrence, _ in iter_occurrences(event, start, end)]
+
+
+class RecurrenceTests(SimpleTestCase):
+    def test_frequencies_and_intervals(self):
+        daily = make_series(RecurrenceFrequency.DAILY, recurrence_interval=2, recurrence_count=3)
+        self.assertEqual(starts(daily), [date(2026, 5, 1), date(2026, 5, 3), date(2026, 5, 5)])
+        weekly = make_series(RecurrenceFrequency.WEEKLY, recurrence_until=date(2026, 5, 15))
+        self.assertEqual(starts(weekly), [date(2026, 5, 1), date(2026, 5, 8), date(2026, 5, 15)])
+        monthly = make_series(RecurrenceFrequency.MONTHLY, recurrence_interval=3, recurrence_count=3)
+        self.assertEqual(starts(monthly), [date(2026, 5, 1), date(2026, 8, 1), date(2026, 11, 1)])
+
+    def test_until_and_count_bound_the_series(self):
+        series = make_series(RecurrenceFrequency.DAILY, recurrence_until=date(2026, 5, 4), recurrence_count=10)
+        self.assertEqual(len(starts(series)), 4)
+        series = make_series(RecurrenceFrequency.DAILY, recurrence_until=date(2026, 6, 1), recurrence_count=2)
+        self.assertEqual(len(starts(series)), 2)
+        with self.assertRaises(ValueError):
+            starts(make_series(RecurrenceFrequency.DAILY))
+
+    def test_exceptions_still_use_up_the_count(self):
+        series = make_series(
+            RecurrenceFrequency.DAILY, recurrence_count=3, recurrence_exceptions=[date(2026, 5, 2)],
+        )
+        self.assertEqual(starts(series), [date(2026, 5, 1), date(2026, 5, 3)])
+
+    def test_monthly_on_the_31st_skips_shorter_months(self):
+        series = make_series(RecurrenceFrequency.MONTHLY, start_date=date(2026, 1, 31), recurrence_count=4)
+        self.assertEqual(starts(series), [date(2026, 1, 31), date(2026, 3, 31), date(2026, 5, 31), date(2026, 7, 31)])
+        # Jumping straight to a window keeps the day.
+        unbounded = make_series(RecurrenceFrequency.MONTHLY, start_date=date(2026, 1, 31))
+        self.assertEqual(
+            starts(unbounded, date(2026, 4, 1), date(2026, 8, 31)), [date(2026, 5, 31), date(2026, 7, 31), date(2026, 8, 31)]
+        )
+
+    def test_window_includes_occurrences_overlapping_its_start(self):
+        series = make_series(RecurrenceFrequency.DAILY, end_date=date(2026, 5, 2))
+        self.assertEqual(
+            list(iter_occurrences(series, date(2026, 5, 10), date(2026, 5, 11))),
+            [(date(2026, 5, 9), date(2026, 5, 10)), (date(2026, 5, 10), date(2026, 5, 11)),
+             (date(2026, 5, 11), date(2026, 5, 12))],
+        )
+        counted = make_series(RecurrenceFrequency.DAILY, recurrence_count=12)
+        self.assertEqual(starts(counted, date(2026, 5, 11), date(2026, 5, 20)), [date(2026, 5, 11), date(2026, 5, 12)])
+
+
+@override_settings(THROTTLE_ENABLED=False, EVENT_OCCURRENCE_HORIZON_DAYS=60)
+class CalendarTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Mondays from April 27th, 2026; May 11th starts ISO week 20.
+        make_event(
+            title="Standup", start_date=date(2026, 4, 27), end_date=date(2026, 4, 27),
+            recurrence_frequency=RecurrenceFrequency.WEEKLY.value,
+        )
+        make_event(title="Launch", start_date=date(2026, 5, 12), end_date=date(2026, 5, 12))
+
+    def calendar(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted((entry["start_date"], entry["title"]) for entry in response.json())
+
+    def test_windows_in_the_sync_and_async_views(self):
+        for url in ("/events/user/calender/", "/events/async/public/calender/"):
+            with self.subTest(url=url):
+                self.assertEqual(self.calendar(url, year=2026, month=5, date=11), [("2026-05-11", "Standup")])
+                self.assertEqual(
+                    self.calendar(url, year=2026, month=0, week=20),
+                    [("2026-05-11", "Standup"), ("2026-05-12", "Launch")],
+                )
+                self.assertEqual(self.calendar(url, year=2026, month=5), [
+                    ("2026-05-04", "Standup"), ("2026-05-11", "Standup"), ("2026-05-12", "Launch"),
+                    ("2026-05-18", "Standup"), ("2026-05-25", "Standup"),
+                ])
+
+    def test_unbounded_calendar_expands_up_to_the_horizon(self):
+        for url in ("/events/user/calender/", "/events/async/public/calender/"):
+            with self.subTest(url=url):
+                entries = self.calendar(url, year=2026, month=0)
+                standups = [start for start, title in entries if title == "Standup"]
+                self.assertIn(("2026-05-12", "Launch"), entries)
+                self.assertEqual(standups[0], "2026-04-27")
+                last = date.fromisoformat(standups[-1])
+                self.assertTrue(occurrence_horizon() - timedelta(days=7) < last <= occurrence_horizon())
+
+    def test_invalid_week_is_rejected(self):
+        for url in ("/events/user/calender/", "/events/async/public/calender/"):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {"year": 2026, "week": 60}).status_code, 400)
+
+
+class RefreshOccurrencesCommandTests(TestCase):
+    def refresh(self, *args):
+        call_command("refresh_event_occurrences", *args, stdout=io.StringIO())
+        return list(EventOccurrence.objects.filter(event=self.series).order_by("start_date").values_list(
+            "start_date", flat=True
+        ))
+
+    def setUp(self):
+        self.today = timezone.now().date()
+        self.series = make_event(
+            start_date=self.today, end_date=self.today,
+            recurrence_frequency=RecurrenceFrequency.WEEKLY.value, recurrence_count=3,
+        )
+        self.expected = [self.today + timedelta(weeks=week) for week in range(3)]
+
+    def test_expands_series_and_drops_past_occurrences(self):
+        past = make_event(start_date=date(2020, 1, 1), end_date=date(2020, 1, 1))
+        EventOccurrence.objects.create(event=past, start_date=date(2020, 1, 1), end_date=date(2020, 1, 1))
+        self.assertEqual(self.refresh(), self.expected)
+        self.assertFalse(EventOccurrence.objects.filter(event=past).exists())
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.occurrences_expanded_until, occurrence_horizon())
+
+    def test_extends_only_past_the_expansion(self):
+        self.refresh()
+        EventOccurrence.objects.filter(start_date__gt=self.today).delete()
+        EventModel.objects.filter(pk=self.series.pk).update(occurrences_expanded_until=self.today)
+        self.assertEqual(self.refresh(), self.expected)
+        EventOccurrence.objects.filter(start_date__gt=self.today).delete()
+        # Up to date series are left alone unless rebuilt.
+        self.assertEqual(self.refresh(), self.expected[:1])
+        self.assertEqual(self.refresh("--rebuild"), self.expected)
+
+
+class GeohashTests(SimpleTestCase):
+    def test_encodes_known_points(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash.encode(42.6, -5.6, 5), "ezs42")
+        self.assertEqual(geohash.encode(-25.382708, -49.265506), "6gkzwgjzn820")
+        self.assertEqual([geohash.encode(lat, lng, 1) for lat, lng in ((-90, -180), (0, 0), (89.9, 179.9))], ["0", "s", "z"])
+
+    def test_cells_cover_both_sides_of_the_antimeridian(self):
+        cells = geohash.covering_cells(0.0, 179.99, 10)
+        self.assertEqual({cell[0] for cell in cells}, {"2", "8", "r", "x"})
+        for lat, lng in ((0.05, 179.95), (0.05, -179.98), (-0.05, -179.98), (-0.05, 179.95)):
+            point = geohash.encode(lat, lng)
+            self.assertTrue(any(point.startswith(cell) for cell in cells), (lat, lng))
+
+    def test_circles_around_a_pole_are_not_pruned_by_prefix(self):
+        self.assertEqual(geohash.bounding_box(89.99, 0.0, 50)[2:], (-180.0, 180.0))
+        self.assertEqual(geohash.covering_cells(89.99, 0.0, 50), [])
+        self.assertEqual(geohash.covering_cells(-89.99, 10.0, 5), [])
+
+
+@override_settings(THROTTLE_ENABLED=False)
+class NearEventsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def near(self, near, radius_km=None):
+        params = {"near": near, **({"radius_km": radius_km} if radius_km is not None else {})}
+        return self.client.get("/events/public/", params)
+
+    def titles(self, near, radius_km):
+        response = self.near(near, radius_km)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [event["title"] for event in response.json()["results"]]
+
+    def test_radius_and_distance_order(self):
+        # Dhaka, Gazipur (~20 km) and Chittagong (~215 km).
+        make_event(title="Chittagong", latitude=22.3569, longitude=91.7832)
+        make_event(title="Gazipur", latitude=23.9999, longitude=90.4203)
+        make_event(title="Dhaka", latitude=23.8103, longitude=90.4125)
+        make_event(title="Nowhere")
+        self.assertEqual(self.titles("23.8103,90.4125", 10), ["Dhaka"])
+        self.assertEqual(self.titles("23.8103,90.4125", 50), ["Dhaka", "Gazipur"])
+        self.assertEqual(self.titles("23.9999,90.4203", 300), ["Gazipur", "Dhaka", "Chittagong"])
+
+    def test_finds_events_across_the_antimeridian_and_a_pole(self):
+        make_event(title="East", latitude=-16.5, longitude=179.95)
+        make_event(title="West", latitude=-16.5, longitude=-179.9)
+        make_event(title="Far side", latitude=89.9, longitude=-170.0)
+        self.assertEqual(self.titles("-16.5,179.99", 20), ["East", "West"])
+        self.assertEqual(self.titles("89.95,10", 20), ["Far side"])
+
+    def test_rejects_invalid_searches(self):
+        for near, radius_km, field in [
+            ("23.8", None, "Near"),
+            ("north,east", None, "Near"),
+            ("91,90", None, "Near"),
+            ("23.8,181", None, "Near"),
+            ("23.8,90.4", 0, "Radius km"),
+            ("23.8,90.4", 501, "Radius km"),
+        ]:
+            with self.subTest(near=near, radius_km=radius_km):
+                response = self.near(near, radius_km)
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(response.json()["data"][0].startswith(field), response.content)
+
+
+@override_settings(EVENT_RETENTION_DAYS=365)
+class RetentionPurgeTests(TestCase):
+    today = date(2026, 5, 1)
+
+    def setUp(self):
+        self.expired = make_event(title="Old fair", start_date=date(2024, 3, 1), end_date=date(2024, 3, 2))
+        self.contact = add_contact_person(self.expired)
+        # Named directly, saving would move the (missing) files.
+        EventModel.objects.filter(pk=self.expired.pk).update(event_image="events/fair.png")
+        EventContactPerson.objects.filter(pk=self.contact.pk).update(photo="contacts/agent.png")
+        self.ended_series = make_event(
+            title="Old series", start_date=date(2024, 1, 1), end_date=date(2024, 1, 1),
+            recurrence_frequency=RecurrenceFrequency.WEEKLY.value, recurrence_until=date(2024, 6, 1),
+        )
+        self.kept = [
+            make_event(title="Recent", start_date=date(2025, 6, 1), end_date=date(2025, 6, 1)),
+            make_event(
+                title="Open series", start_date=date(2020, 1, 1), end_date=date(2020, 1, 1),
+                recurrence_frequency=RecurrenceFrequency.MONTHLY.value,
+            ),
+        ]
+
+    def purge(self, mode, batch_size=10):
+        return retention.purge_batch(mode, batch_size, today=self.today)
+
+    def assert_only_kept_events_remain(self):
+        self.assertEqual(set(EventModel.objects.values_list("pk", flat=True)), {event.pk for event in self.kept})
+        self.assertFalse(EventContactPerson.objects.exists())
+        self.assertEqual(
+            set(EventTombstone.objects.values_list("model", "object_id")),
+            {(EventTombstone.EVENT, self.expired.pk), (EventTombstone.EVENT, self.ended_series.pk)},
+        )
+
+    def test_archive_keeps_a_snapshot_and_the_media(self):
+        with mock.patch.object(retention, "delete_files") as delete_files, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.purge(retention.ARCHIVE), 2)
+        delete_files.assert_not_called()
+        self.assert_only_kept_events_remain()
+        archive = EventArchive.objects.get(event_id=self.expired.pk)
+        self.assertEqual((archive.title, archive.end_date), ("Old fair", date(2024, 3, 2)))
+        self.assertEqual(archive.data["event_image"], "events/fair.png")
+        self.assertEqual([contact["id"] for contact in archive.data["contact_person"]], [self.contact.pk])
+        self.assertTrue(EventArchive.objects.filter(event_id=self.ended_series.pk).exists())
+
+    def test_delete_removes_the_media_once_committed(self):
+        with mock.patch.object(retention, "delete_files") as delete_files:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.assertEqual(self.purge(retention.DELETE), 2)
+            delete_files.assert_not_called()
+            for callback in callbacks:
+                callback()
+        (files,), _ = delete_files.call_args
+        self.assertEqual(sorted(file.name for file in files), ["contacts/agent.png", "events/fair.png"])
+        self.assertFalse(EventArchive.objects.exists())
+        self.assert_only_kept_events_remain()
+
+    def test_batches_until_nothing_is_left(self):
+        self.assertEqual([self.purge(retention.ARCHIVE, batch_size=1) for _ in range(3)], [1, 1, 0])
+        # Oldest end date first.
+        self.assertEqual(list(EventArchive.objects.values_list("event_id", flat=True).order_by("id")), [
+            self.ended_series.pk, self.expired.pk,
+        ])
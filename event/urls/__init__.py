@@ -4,4 +4,6 @@ from django.urls import path, include
 urlpatterns = [
     path("user/", include("event.urls.user")),
     path("public/", include("event.urls.common")),
+    path("async/public/", include("event.urls.asynchronous")),
+    path("moderation/", include("event.urls.moderation")),
 ]
@@ -0,0 +1,9 @@
+from django.urls import path
+from event.views import asynchronous as views
+
+urlpatterns = [
+    path("", views.AsyncEventListView.as_view()),
+    path("regional/info/", views.AsyncEventRegionalDataView.as_view()),
+    path("calender/", views.AsyncEventCalenderView.as_view()),
+    path("<int:pk>/", views.AsyncEventRetrieveView.as_view()),
+]
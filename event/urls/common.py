@@ -6,4 +6,5 @@ router = routers.DefaultRouter()
 router.register(r'', views.CommonEventViewSet, basename='events')
 urlpatterns = [
     path("regional/info/", views.EventRegionalDataApiView.as_view()),
+    path("changes/", views.EventChangesApiView.as_view()),
 ]+ router.urls
\ No newline at end of file
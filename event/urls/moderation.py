@@ -0,0 +1,7 @@
+from event.views import moderation as views
+from rest_framework import routers
+
+router = routers.DefaultRouter()
+router.register(r'', views.EventModerationViewSet, basename='event-moderation')
+urlpatterns = [
+]+ router.urls
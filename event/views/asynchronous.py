@@ -0,0 +1,74 @@
+from django.core.exceptions import ObjectDoesNotExist
+from rest_framework import status
+from rest_framework.response import Response
+
+from base.views import AsyncReadView
+from event.filters import calendar_filters, throttle_surcharge
+from event.models import EventModel
+from event.recurrence import calendar_entries
+from event.serializer import EventSerializer
+from event.views.common import CommonEventViewSet, EventRegionalDataApiView, regional_tree
+from event.views.user import EventViewSet
+
+
+# Native async versions of the public read endpoints, for ASGI deployments. They build
+# their querysets with the sync views' code, so filtering, search, pagination and the
+# response bodies stay identical, and only touch the database through the async ORM.
+
+
+def get_event_viewset(request, action, **kwargs):
+    return CommonEventViewSet(request=request, args=(), kwargs=kwargs, action=action, format_kwarg=None)
+
+
+class AsyncEventListView(AsyncReadView):
+    query_budget = {"get": 2}
+
+    def get_throttle_cost(self, request, cost):
+        return cost + throttle_surcharge(request.query_params)
+
+    async def get(self, request, *args, **kwargs):
+        view = get_event_viewset(request, "list")
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        page = await paginator.apaginate_queryset(queryset, request, view=view)
+        return paginator.get_paginated_response(view.get_serializer(page, many=True).data).data
+
+
+class AsyncEventRetrieveView(AsyncReadView):
+    query_budget = {"get": 2}
+
+    async def get(self, request, pk, *args, **kwargs):
+        view = get_event_viewset(request, "retrieve", pk=pk)
+        queryset = view.filter_queryset(view.get_queryset())
+        instance = await queryset.filter(pk=pk).prefetch_related("event_contact_person").afirst()
+        if instance is None:
+            raise ObjectDoesNotExist(f"No {EventModel._meta.object_name} matches the given query.")
+        return view.get_serializer(instance).data
+
+
+class AsyncEventRegionalDataView(AsyncReadView):
+    query_budget = {"get": 1}
+    throttle_costs = EventRegionalDataApiView.throttle_costs
+
+    async def get(self, request, *args, **kwargs):
+        view = EventRegionalDataApiView(request=request, args=(), kwargs={}, format_kwarg=None)
+        return regional_tree([row async for row in view.get_queryset().aiterator()])
+
+
+class AsyncEventCalenderView(AsyncReadView):
+    query_budget = {"get": 1}
+    throttle_costs = {"get": EventViewSet.throttle_costs["calender_view"]}
+
+    def get_throttle_cost(self, request, cost):
+        return cost + throttle_surcharge(request.query_params, calendar=True)
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            calendar = calendar_filters(request.query_params)
+        except ValueError:
+            return Response({"error": "Invalid date provided"}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = calendar.queryset(
+            EventModel.active_objects.annotate(deletion_time=EventModel.deletion_time_expression())
+        )
+        events = [event async for event in queryset.aiterator()]
+        return calendar_entries(EventSerializer, events, calendar.window, context={"request": request})
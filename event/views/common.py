@@ -1,15 +1,18 @@
 from collections import defaultdict
-from drf_spectacular.utils import extend_schema
+from django.conf import settings
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from base.swagger import set_query_params
 from rest_framework.generics import ListAPIView
 from base.views import CustomViewSet
-from event.filters import EventFilterSet
+from event.changes import changes, decode_cursor
+from event.filters import EventFilterSet, throttle_surcharge
 from event.models import EventModel
-from event.serializer import EventSerializer, EventDetailsSerializer
+from event.serializer import EventSerializer, EventDetailsSerializer, EventChangesSerializer
 
 
 @extend_schema(tags=['Public Event'])
@@ -23,6 +26,10 @@ class CommonEventViewSet(CustomViewSet):
     filterset_class = EventFilterSet
     search_fields = ["id", "title", "status", "district", "city", "country", "event_type"]
     serializer_class = EventSerializer
+    query_budget = {"list": 2, "retrieve": 2}
+
+    def get_throttle_cost(self, request, cost):
+        return cost + throttle_surcharge(request.query_params)
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -52,6 +59,9 @@ class EventRegionalDataApiView(ListAPIView):
     filterset_class = EventFilterSet
     search_fields = ["id", "title", "status", "district", "city", "country", "location", "event_type"]
     serializer_class = EventSerializer
+    query_budget = {"get": 1}
+    # Aggregates every active event.
+    throttle_costs = {"get": 3}
 
     def get_queryset(self):
         types = ["true", "false", "any"]
@@ -72,28 +82,68 @@ class EventRegionalDataApiView(ListAPIView):
         return qs.order_by("-created_at").values("country", "district", "city").distinct()
 
     def list(self, request, *args, **kwargs):
-        data = []
-        qs = self.get_queryset()
-        tree = defaultdict(lambda: defaultdict(set))
-
-        for row in qs:
-            country = row["country"]
-            district = row["district"]
-            city = row["city"]
-            if country and district and city:
-                tree[country][district].add(city)
-
-        for country, districts in tree.items():
-            district_data = []
-            for district, cities in districts.items():
-                district_data.append({
-                    "name": district,
-                    "cities": [{"name": city} for city in sorted(cities)]
-                })
-
-            data.append({
-                "country_name": country,
-                "district": district_data
+        return Response(regional_tree(self.get_queryset()), status=status.HTTP_200_OK)
+
+
+def regional_tree(rows):
+    """
+    Nest distinct (country, district, city) rows into countries, their districts and
+    their sorted cities, skipping rows with a missing part.
+    """
+    data = []
+    tree = defaultdict(lambda: defaultdict(set))
+
+    for row in rows:
+        country = row["country"]
+        district = row["district"]
+        city = row["city"]
+        if country and district and city:
+            tree[country][district].add(city)
+
+    for country, districts in tree.items():
+        district_data = []
+        for district, cities in districts.items():
+            district_data.append({
+                "name": district,
+                "cities": [{"name": city} for city in sorted(cities)]
             })
 
-        return Response(data, status=status.HTTP_200_OK)
+        data.append({
+            "country_name": country,
+            "district": district_data
+        })
+
+    return data
+
+
+@extend_schema(
+    tags=['Public Event'],
+    parameters=[
+        OpenApiParameter(
+            name="since", type=str, required=False,
+            description="`cursor` of the previous sync. Without it the feed starts from the first event.",
+        ),
+        OpenApiParameter(
+            name="limit", type=int, required=False,
+            description="Most changes to return, up to CHANGES_PAGE_SIZE.",
+        ),
+    ],
+    responses=EventChangesSerializer,
+)
+class EventChangesApiView(APIView):
+    """
+    Events created, updated and deleted since a cursor, for clients keeping a
+    local copy in sync. Answers 410 when the cursor is older than the kept
+    deletions, after which the client has to sync the full list again.
+    """
+    permission_classes = (AllowAny,)
+    query_budget = {"get": 3}
+
+    def get(self, request, *args, **kwargs):
+        since = request.query_params.get("since")
+        try:
+            limit = min(int(request.query_params.get("limit", settings.CHANGES_PAGE_SIZE)), settings.CHANGES_PAGE_SIZE)
+        except ValueError:
+            limit = settings.CHANGES_PAGE_SIZE
+        feed = changes(decode_cursor(since) if since else None, max(limit, 1))
+        return Response(EventChangesSerializer(feed, context={"request": request}).data, status=status.HTTP_200_OK)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from drf_spectacular.utils import extend_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from event.models import EventModel, MODERATION_QUEUE_STATUSES
+from event.serializer import EventSerializer, EventModerationClaimSerializer, EventModerationTransitionSerializer
+
+
+@extend_schema(tags=['Event Moderation'])
+class EventModerationViewSet(viewsets.GenericViewSet):
+    """
+    Moderation queue. Each moderator claims a batch of pending or needs-revision
+    events for MODERATION_LEASE_SECONDS; rows locked or claimed by another moderator
+    are skipped, so concurrent moderators never receive the same event.
+    """
+    permission_classes = (IsAdminUser,)
+    serializer_class = EventSerializer
+    query_budget = {"claim": 3, "transition": 1}
+
+    def get_queryset(self):
+        return EventModel.active_objects.filter(status__in=MODERATION_QUEUE_STATUSES)
+
+    def available(self, timestamp):
+        """
+        Queued events that are unclaimed, whose claim lapsed, or that the current
+        moderator already holds.
+        """
+        return self.get_queryset().filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lt=timestamp) | Q(claimed_by=self.request.user)
+        )
+
+    @extend_schema(request=EventModerationClaimSerializer, responses=EventSerializer(many=True))
+    @action(detail=False, methods=["POST"], url_path="claim")
+    def claim(self, request, *args, **kwargs):
+        serializer = EventModerationClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        batch_size = serializer.validated_data.get("batch_size", settings.MODERATION_BATCH_SIZE)
+
+        timestamp = now()
+        claimed_until = timestamp + timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+        with transaction.atomic():
+            ids = list(
+                self.available(timestamp)
+                .select_for_update(skip_locked=True)
+                .order_by("created_at")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            EventModel.objects.filter(id__in=ids).update(
+                claimed_by=request.user, claimed_until=claimed_until, updated_at=timestamp
+            )
+        events = EventModel.objects.filter(id__in=ids).order_by("created_at")
+        return Response({
+            "claimed_until": claimed_until,
+            "results": self.get_serializer(events, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+    @extend_schema(request=EventModerationTransitionSerializer)
+    @action(detail=False, methods=["POST"], url_path="transition")
+    def transition(self, request, *args, **kwargs):
+        serializer = EventModerationTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        # A single set based UPDATE; events claimed by another moderator are left alone.
+        timestamp = now()
+        ids = set(data["ids"])
+        fields = {"status": data["status"], "claimed_by": None, "claimed_until": None, "updated_at": timestamp}
+        if "admin_comment" in data:
+            fields["admin_comment"] = data["admin_comment"]
+        updated = self.available(timestamp).filter(id__in=ids).update(**fields)
+        return Response({
+            "message": f"{updated} events moved to {data['status']}",
+            "updated": updated,
+            "skipped": len(ids) - updated,
+        }, status=status.HTTP_200_OK)
@@ -1,12 +1,11 @@
-from datetime import timedelta, date as dt
-from functools import reduce
-from operator import or_
+from datetime import timedelta
 
+import orjson
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
-from django.db.models import Q, OuterRef, Subquery
-from django.utils.timezone import now
+from django.db.models import OuterRef, Subquery
+from django.http import QueryDict
 from drf_spectacular.utils import extend_schema, OpenApiExample
 from nested_multipart_parser import NestedParser
 from rest_framework import serializers, status
@@ -17,8 +16,9 @@ from rest_framework.response import Response
 from base.enum import EventType, EventStatus, EventSubCategoryEnum, UserRoleEnum, EventCategoryEnum
 from base.swagger import set_query_params
 from base.views import CustomViewSet
-from event.filters import EventFilterSet
+from event.filters import EventFilterSet, calendar_filters, throttle_surcharge
 from event.models import EventModel, EventContactPerson
+from event.recurrence import calendar_entries, refresh_occurrences
 from event.serializer import EventSerializer, EventCreateSerializer, EventDetailsSerializer, \
     EventContactPersonSerializer
 from rest_framework.permissions import AllowAny
@@ -38,7 +38,15 @@ class EventViewSet(CustomViewSet):
     filterset_class = EventFilterSet
     search_fields = ["id", "title", "status", "district", "city", "country", "event_type"]
     serializer_class = EventSerializer
+    query_budget = {"list": 2, "retrieve": 2, "calender_view": 1}
+    throttle_costs = {"create": 2, "update": 2, "calender_view": 2}
     # parser_classes = [MultiPartParser, FormParser]
+    # Multipart requests may carry the event as JSON in this field, with its images
+    # as file parts named by the JSON, e.g. {"event_image": "cover"} and a "cover" part.
+    payload_field = "payload"
+
+    def get_throttle_cost(self, request, cost):
+        return cost + throttle_surcharge(request.query_params, calendar=self.action == "calender_view")
 
     def get_serializer_class(self):
         if self.action in ["update", "partial_update", "create"]:
@@ -47,18 +55,55 @@ class EventViewSet(CustomViewSet):
             return EventDetailsSerializer
         return EventSerializer
 
-    def validate_data(self, requested_data):
+    def get_payload(self, request):
         """
-        Custom validation for event creation and updates.
+        The event of the request as a nested dict, without copying the parsed body:
+        a JSON body as it is, the JSON `payload_field` of a multipart request with
+        its image references resolved, or legacy flattened multipart fields such as
+        `contact_person[0].name` through NestedParser.
         """
-        parser = NestedParser(requested_data)
+        data = request.data
+        if not isinstance(data, QueryDict):
+            if not isinstance(data, dict):
+                raise ValidationError("Expected the event as an object.")
+            return data
 
-        # Validate incoming nested data
+        if self.payload_field in data:
+            try:
+                payload = orjson.loads(data[self.payload_field])
+            except orjson.JSONDecodeError as exc:
+                raise ValidationError({self.payload_field: f"Invalid JSON: {exc}"})
+            if not isinstance(payload, dict):
+                raise ValidationError({self.payload_field: "Expected the event as an object."})
+            return self.resolve_files(payload, request.FILES)
+
+        # Repeated fields, e.g. category=a&category=b, keep all their values.
+        parser = NestedParser({key: values if len(values) > 1 else values[0] for key, values in data.lists()})
         if not parser.is_valid():
             raise ValidationError(parser.errors)
+        return parser.validate_data
+
+    @staticmethod
+    def resolve_files(payload, files):
+        """
+        Replace the image fields of `payload` naming an uploaded part with its file.
+        Other strings are left to mean "keep the current image".
+        """
+        def resolve(value):
+            return files[value] if isinstance(value, str) and value in files else value
+
+        if "event_image" in payload:
+            payload["event_image"] = resolve(payload["event_image"])
+        for item in payload.get("contact_person") or []:
+            if isinstance(item, dict) and "photo" in item:
+                item["photo"] = resolve(item["photo"])
+        return payload
 
-        # Extract and prepare main data for the update
-        data = parser.validate_data
+    def validate_data(self, data):
+        """
+        Custom validation for event creation and updates.
+        """
+        self.validate_shape(data)
         start_date = data.get("start_date", None) or None
         end_date = data.get("end_date", None) or None
         start_time = data.get("start_time", None) or None
@@ -87,6 +132,8 @@ class EventViewSet(CustomViewSet):
             meeting_link = data.get("meeting_link")
             data["location"] = None
             data["location_link"] = None
+            data["latitude"] = None
+            data["longitude"] = None
             data["country"] = None
             data["district"] = None
             data["city"] = None
@@ -109,27 +156,20 @@ class EventViewSet(CustomViewSet):
         if isinstance(event_image, str) or event_image in ['null', 'None', 'undefined']:
             data.pop("event_image")
 
-        category_str = data.get("category", "")
-        sub_category_str = data.get("sub_category", "")
-
-        # Convert comma-separated strings to lists
-        category = category_str.split(",") if isinstance(category_str, str) else category_str
-        sub_category = sub_category_str.split(",") if isinstance(sub_category_str, str) else sub_category_str
-
-        # Ensure lists are properly formatted (no extra nesting)
-        category = [c.strip() for c in category] if isinstance(category, list) else []
-        sub_category = [sc.strip() for sc in sub_category] if isinstance(sub_category, list) else []
-
-        # Assign cleaned values back to data
-        data["category"] = category
-        data["sub_category"] = sub_category
+        # Comma-separated strings or lists, as validate_shape checked.
+        for field in ("category", "sub_category"):
+            tags = data.get(field) or []
+            data[field] = [tag.strip() for tag in (tags.split(",") if isinstance(tags, str) else tags)]
+        recurrence_exceptions = data.get("recurrence_exceptions")
+        if isinstance(recurrence_exceptions, str):
+            data["recurrence_exceptions"] = [d.strip() for d in recurrence_exceptions.split(",") if d.strip()]
         registration_available = data.get("registration_available", False)
         if registration_available:
             registration_last_date = data.get("registration_last_date")
-            if registration_last_date > start_date:
-                raise serializers.ValidationError("Registration date cannot be after start date.")
             if not registration_last_date:
                 raise serializers.ValidationError("Registration last date is required.")
+            if registration_last_date > start_date:
+                raise serializers.ValidationError("Registration date cannot be after start date.")
             registration_link = data.get("registration_link")
             if not registration_link:
                 raise serializers.ValidationError("Registration link is required.")
@@ -148,6 +188,30 @@ class EventViewSet(CustomViewSet):
                 item.pop("photo")
         return data
 
+    @staticmethod
+    def validate_shape(data):
+        """
+        Check the types a JSON body can get wrong, so that validate_data and
+        handle_contact_person can rely on them: dates and times are strings, tags
+        strings or lists of strings and contact persons objects.
+        """
+        for field in ("start_date", "end_date", "start_time", "end_time", "registration_last_date"):
+            if data.get(field) is not None and not isinstance(data[field], str):
+                raise serializers.ValidationError({field: "Expected a string."})
+        for field in ("category", "sub_category"):
+            tags = data.get(field)
+            if tags is None or isinstance(tags, str):
+                continue
+            if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+                raise serializers.ValidationError({field: "Expected a list of strings or a comma-separated string."})
+        contact_person = data.get("contact_person")
+        if isinstance(contact_person, list):
+            for index, item in enumerate(contact_person):
+                if not isinstance(item, dict):
+                    raise serializers.ValidationError(
+                        {"contact_person": f"Expected an object for contact person {index}."}
+                    )
+
     def handle_contact_person(self, contact_persons_data, event):
         """Handles adding, updating, and removing contact persons for an event."""
 
@@ -230,11 +294,12 @@ class EventViewSet(CustomViewSet):
     ], )
     @transaction.atomic()
     def create(self, request, *args, **kwargs):
-        validated_data = self.validate_data(request.data.copy())
+        validated_data = self.validate_data(self.get_payload(request))
         contact_person_data= validated_data.pop("contact_person")
         serializer = self.get_serializer(data=validated_data)
         serializer.is_valid(raise_exception=True)
         instance = serializer.save()
+        refresh_occurrences(instance)
 
         # store the contact person information
         self.handle_contact_person(contact_person_data, instance)
@@ -301,14 +366,12 @@ class EventViewSet(CustomViewSet):
                 raise ObjectDoesNotExist(e)
             else:
                 return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        validated_data = self.validate_data(request.data.dict())
+        validated_data = self.validate_data(self.get_payload(request))
         contact_person_data = validated_data.pop("contact_person")
         serializer = self.get_serializer(instance, data=validated_data)
         serializer.is_valid(raise_exception=True)
-        serializer.is_valid(raise_exception=True)
-        obj = serializer.save()
-        obj.status = EventStatus.PENDING.value
-        obj.save()
+        obj = serializer.save(status=EventStatus.PENDING.value)
+        refresh_occurrences(obj)
         self.handle_contact_person(contact_person_data, obj)
         return Response({"message": "Event updated successfully"}, status.HTTP_200_OK)
 
@@ -332,55 +395,12 @@ class EventViewSet(CustomViewSet):
         ]))
     @action(detail=False, methods=["GET"], url_path="calender")
     def calender_view(self, request, *args, **kwargs):
-        today = now().date()
-        date = request.query_params.get("date", None)
-        week = request.query_params.get("week", None)
-        month = int(request.query_params.get("month", today.month))
-        year = int(request.query_params.get("year", today.year))
-        city = request.query_params.get("city", None)
-        district = request.query_params.get("district", None)
-        country = request.query_params.get("country",None)
-        category = request.query_params.get("category",None)
-        sub_category = request.query_params.get("sub_category",None)
-        event_date = request.query_params.get("event_date",None)
-        if event_date and (month or year):
-            month = None
-            year = None
-        status = request.query_params.get("status",None)
-
-        # Convert `date` to an actual date object if provided
-        if date:
-            try:
-                date = dt(year, month, int(date))  # Convert integer day to a full date
-            except ValueError:
-                return Response({"error": "Invalid date provided"}, status=400)
-
-        # Build Query Filters
-        filters = Q()
-        if date:
-            filters &= Q(start_date=date) | Q(end_date=date)
-        if week:
-            filters &= Q(start_date__week=week, start_date__year=year) | Q(end_date__week=week, end_date__year=year)
-        if month:
-            filters &= Q(start_date__month=month, start_date__year=year) | Q(end_date__month=month, end_date__year=year)
-        if city:
-            filters &= Q(city=city)
-        if district:
-            filters &= Q(district=district)
-        if country:
-            filters &= Q(country=country)
-        if status:
-            filters &= Q(status=status)
-        if event_date:
-            filters &= Q(start_date__lte=event_date, end_date__gte=event_date)
-        if category:
-            filters &= Q(category__contains=[category]) & ~Q(category=[]) & ~Q(category__isnull=True)
-        if sub_category:
-            sub_category_list = [item.strip() for item in sub_category.split(",")]  # Clean spaces
-            sub_category_filters = reduce(or_, [Q(sub_category__overlap=[q]) for q in sub_category_list])
-            filters &= sub_category_filters & ~Q(sub_category=[]) & ~Q(sub_category__isnull=True)
-
-        # Fetch filtered events
-        qs = self.model_class.active_objects.filter(filters)
-
-        return Response( self.serializer_class(qs, many=True, context={"request": request}).data)
+        try:
+            calendar = calendar_filters(request.query_params)
+        except ValueError:
+            return Response({"error": "Invalid date provided"}, status=400)
+
+        # Fetch filtered events, recurring series are expanded to their occurrences
+        qs = calendar.queryset(self.apply_retention(self.model_class.active_objects.all()))
+
+        return Response(calendar_entries(self.serializer_class, qs, calendar.window, context={"request": request}))
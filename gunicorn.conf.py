@@ -0,0 +1,100 @@
+"""
+Gunicorn settings, loaded automatically from the working directory:
+
+    gunicorn config.wsgi:application
+
+Every value can be overridden from the environment (or .env) through `decouple`.
+"""
+import multiprocessing
+import os
+import shutil
+
+# `config` is itself a gunicorn setting, so decouple's reader is imported as `env`.
+from decouple import config as env
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ======== Workers ========
+bind = env("GUNICORN_BIND", default=f"0.0.0.0:{env('WEB_PORT', default=8000)}")
+workers = env("GUNICORN_WORKERS", cast=int, default=multiprocessing.cpu_count() * 2 + 1)
+threads = env("GUNICORN_THREADS", cast=int, default=1)
+worker_class = env("GUNICORN_WORKER_CLASS", default="gthread" if threads > 1 else "sync")
+# Load Django once in the master so workers share its memory copy-on-write.
+preload_app = env("GUNICORN_PRELOAD", cast=bool, default=True)
+
+# ======== Timeouts ========
+timeout = env("GUNICORN_TIMEOUT", cast=int, default=30)
+graceful_timeout = env("GUNICORN_GRACEFUL_TIMEOUT", cast=int, default=30)
+keepalive = env("GUNICORN_KEEPALIVE", cast=int, default=5)
+
+# ======== Recycling ========
+# Workers restart after a jittered number of requests, or as soon as their resident
+# memory goes over GUNICORN_MAX_WORKER_RSS_MB, so they cannot grow unbounded.
+max_requests = env("GUNICORN_MAX_REQUESTS", cast=int, default=1000)
+max_requests_jitter = env("GUNICORN_MAX_REQUESTS_JITTER", cast=int, default=100)
+MAX_WORKER_RSS_MB = env("GUNICORN_MAX_WORKER_RSS_MB", cast=int, default=512)
+
+# ======== Logging ========
+accesslog = env("GUNICORN_ACCESS_LOG", default=None)
+errorlog = env("GUNICORN_ERROR_LOG", default="-")
+loglevel = env("GUNICORN_LOG_LEVEL", default="info")
+
+# ======== Metrics ========
+# prometheus_client picks multiprocess mode when it is imported, so the directory
+# is exported before the app is loaded; the workers inherit it.
+PROMETHEUS_MULTIPROC_DIR = env(
+    "PROMETHEUS_MULTIPROC_DIR", default=os.path.join(BASE_DIR, "logs", "prometheus")
+)
+os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+os.environ["PROMETHEUS_MULTIPROC_DIR"] = PROMETHEUS_MULTIPROC_DIR
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def worker_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE / (1024 * 1024)
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def on_starting(server):
+    # Samples left over by the previous run's workers would be merged into /metrics.
+    shutil.rmtree(PROMETHEUS_MULTIPROC_DIR, ignore_errors=True)
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    if preload_app:
+        from base.warmup import warm_up_django
+
+        warm_up_django()
+        # Connections must not be shared with the forked workers.
+        from django.db import connections
+
+        connections.close_all()
+    server.log.info("Django warmed up, accepting connections")
+
+
+def post_worker_init(worker):
+    from base.warmup import warm_up_database, warm_up_django
+
+    if not preload_app:
+        warm_up_django()
+    warm_up_database()
+
+
+def post_request(worker, req, environ, resp):
+    rss = worker_rss_mb()
+    if rss > MAX_WORKER_RSS_MB:
+        worker.log.info("Worker %s uses %.0f MB, over %s MB; recycling", worker.pid, rss, MAX_WORKER_RSS_MB)
+        worker.alive = False
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid, PROMETHEUS_MULTIPROC_DIR)